@@ -1,16 +1,23 @@
 import streamlit as st
+import functools
 import os
+import threading
+import time
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from dotenv import load_dotenv
 
 # Import with error handling
 try:
-    from src.parser.pdf_parser import extract_pdf_text
-    from src.parser.youtube_parser import extract_youtube_transcript
-    from src.parser.news_parser import extract_news_content
+    from src.jobs import JobQueue, JobWorkerPool, content_key, spool_upload, DONE, FAILED
+    from src.utils.doc_store import DocumentStore
+    from src.utils.corpus_index import CorpusIndex
+    from src.llm.answer_followup import answer_followup_question, get_cached_answer, prefetch_answers
+    from src.llm.backends import BACKENDS, DEFAULT_BACKEND
     from src.llm.summarizer import summarize_text
-    from src.llm.ner_sentiment import analyze_text
-    from src.llm.insight_gen import generate_insights
-    from src.llm.answer_followup import answer_followup_question
+    from src.llm.pipeline import iter_analysis, is_summary_error, SUMMARY, ANALYSIS, INSIGHTS
+    from src.llm.nlp_pool import NLPWorkerPool
+    from src.llm.insight_gen import classify_topics
+    from src.utils.tracing import METRICS, start_trace, start_metrics_server
 except ImportError as e:
     st.error(f"Import error: {str(e)}")
     st.stop()
@@ -30,10 +37,334 @@ if 'sentiment' not in st.session_state:
     st.session_state.sentiment = None
 if 'insights' not in st.session_state:
     st.session_state.insights = None
-if 'raw_text' not in st.session_state:
-    st.session_state.raw_text = ""
+# Only the document id is kept per session; the text lives in the document store
+if 'doc_id' not in st.session_state:
+    st.session_state.doc_id = None
 if 'answers' not in st.session_state:
     st.session_state.answers = {}
+if 'source_key' not in st.session_state:
+    st.session_state.source_key = None
+if 'answer_prefetch' not in st.session_state:
+    st.session_state.answer_prefetch = None
+# Extraction job id per source key, polled on reruns until the job finishes
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = {}
+# Spans and token counts of the extraction job, added to the next analysis trace
+if 'extraction_telemetry' not in st.session_state:
+    st.session_state.extraction_telemetry = None
+
+
+@st.cache_resource
+def get_job_queue():
+    """Create the job queue and start its worker processes once per server."""
+    job_queue = JobQueue()
+    JobWorkerPool(job_queue.db_path, num_workers=int(os.getenv("SCOPEAI_JOB_WORKERS", "2"))).start()
+    return job_queue
+
+
+@st.cache_resource
+def get_doc_store():
+    """Open the shared on-disk document store (location set by SCOPEAI_DOC_DIR)."""
+    return DocumentStore()
+
+
+@st.cache_resource
+def get_corpus_index():
+    """Open the shared cross-document entity/topic index (location set by SCOPEAI_INDEX_PATH)."""
+    return CorpusIndex()
+
+
+@st.cache_resource
+def get_nlp_pool():
+    """Start the shared NLP worker processes (size set by SCOPEAI_NLP_WORKERS) once per server."""
+    return NLPWorkerPool()
+
+
+@st.cache_resource
+def init_metrics_server():
+    """Serve Prometheus metrics on SCOPEAI_METRICS_PORT, if set."""
+    port = os.getenv("SCOPEAI_METRICS_PORT")
+    return start_metrics_server(int(port)) if port else None
+
+
+init_metrics_server()
+
+
+def rerun():
+    # st.rerun replaced st.experimental_rerun in newer Streamlit releases
+    (getattr(st, "rerun", None) or st.experimental_rerun)()
+
+
+# Seconds a finished extraction is reused by other sessions asking for the same source
+JOB_RESULT_MAX_AGE = 3600
+
+
+def load_source(kind, payload, key):
+    """
+    Get the extracted text for a source through the background job queue.
+
+    Submitting is idempotent: reruns and other sessions asking for the same key
+    attach to the same in-flight (or recently finished) job instead of starting
+    duplicate work. The job id is kept in session state, so reruns only poll it,
+    and a failed job is not resubmitted until the user asks to retry.
+
+    Args:
+        kind: Job kind, e.g. "parse_pdf"
+        payload: Function returning the job arguments; only called when a job is submitted
+        key: Coalescing key identifying the source
+    """
+    store = get_doc_store()
+    # Reload if the stored document was cleaned up since it was extracted
+    if st.session_state.source_key == key and store.exists(st.session_state.doc_id):
+        return
+
+    job_queue = get_job_queue()
+    job_id = st.session_state.jobs.get(key)
+    job = job_queue.get(job_id) if job_id else None
+    if job is None:
+        # Workers write the text to the document store and return only its id
+        # payload() may spool an upload, so it only runs if no existing job is reused
+        job_id = job_queue.submit(kind, lambda: {**payload(), "store_dir": store.root}, key=key,
+                                  max_age=JOB_RESULT_MAX_AGE)
+        st.session_state.jobs[key] = job_id
+        job = job_queue.get(job_id)
+
+    if job["status"] == DONE and not store.exists(job["result"]["doc_id"]):
+        # The extracted text was cleaned up since this job ran: extract it again
+        st.session_state.jobs[key] = job_queue.submit(kind, lambda: {**payload(), "store_dir": store.root}, key=key)
+        rerun()
+    elif job["status"] == DONE:
+        del st.session_state.jobs[key]
+        # The worker's parser spans and metrics would otherwise be lost with its process
+        telemetry = job_queue.take_telemetry(job_id)
+        if telemetry:
+            METRICS.merge(telemetry.get("metrics") or {})
+        st.session_state.extraction_telemetry = telemetry
+        # New source: drop results computed for the previous one
+        st.session_state.doc_id = job["result"]["doc_id"]
+        st.session_state.source_key = key
+        st.session_state.summary = None
+        st.session_state.entities = None
+        st.session_state.sentiment = None
+        st.session_state.insights = None
+        st.session_state.answers = {}
+        st.session_state.answer_prefetch = None
+    elif job["status"] == FAILED:
+        # The failed job stays in session state, so reruns show its error instead of extracting
+        # again; changing the input gives a new key, and Retry forgets the failure
+        telemetry = job_queue.take_telemetry(job_id)
+        if telemetry:
+            METRICS.merge(telemetry.get("metrics") or {})
+        st.sidebar.error(f"Extraction failed: {job['error']}")
+        if st.sidebar.button("Retry extraction", key=f"retry_{key}"):
+            del st.session_state.jobs[key]
+            rerun()
+    else:
+        stage = (job["partial"] or {}).get("stage", job["status"])
+        st.sidebar.info(f"⏳ Extracting content ({stage})...")
+        time.sleep(1)
+        rerun()
+
+DEFAULT_ENTITIES = {}
+DEFAULT_SENTIMENT = {"textblob": {"polarity": 0, "subjectivity": 0},
+                     "vader": {"neg": 0, "neu": 1, "pos": 0, "compound": 0}}
+DEFAULT_INSIGHTS = {"follow_up_questions": ["What are the key points?"], "topics": []}
+
+
+def apply_stage_result(result):
+    """Store a finished pipeline stage in session state and return an error message, if any."""
+    if result.stage == SUMMARY:
+        if result.error:
+            st.session_state.summary = "Error generating summary. Please check your API key and try again."
+            return f"Error: {str(result.error)}"
+        if is_summary_error(result.value):
+            st.session_state.summary = "Could not generate summary due to API key issues."
+            return result.value
+        st.session_state.summary = result.value
+
+    elif result.stage == ANALYSIS:
+        if result.error:
+            # Initialize with empty values to prevent errors
+            st.session_state.entities = DEFAULT_ENTITIES
+            st.session_state.sentiment = DEFAULT_SENTIMENT
+            return f"Error during analysis: {str(result.error)}"
+        st.session_state.entities = result.value["entities"]
+        st.session_state.sentiment = result.value["sentiment"]
+
+    elif result.stage == INSIGHTS:
+        if result.error:
+            st.session_state.insights = DEFAULT_INSIGHTS
+            return f"Error during analysis: {str(result.error)}"
+        st.session_state.insights = result.value
+
+        # Answer every suggested question in one background request so clicks are instant
+        if st.session_state.get("prefetch_answers", True):
+            st.session_state.answer_prefetch = prefetch_answers(
+                result.value["follow_up_questions"], get_doc_store().get(st.session_state.doc_id),
+                backend=st.session_state.llm_backend, doc_id=st.session_state.doc_id)
+
+    return None
+
+
+def fill_missing_results():
+    """Fill in defaults for any section whose stage did not produce a result."""
+    if st.session_state.entities is None:
+        st.session_state.entities = DEFAULT_ENTITIES
+    if st.session_state.sentiment is None:
+        st.session_state.sentiment = DEFAULT_SENTIMENT
+    if st.session_state.insights is None:
+        st.session_state.insights = DEFAULT_INSIGHTS
+
+
+def render_summary():
+    st.write(st.session_state.summary)
+
+
+def render_entities():
+    if st.session_state.entities and len(st.session_state.entities) > 0:
+        # Group entities by type
+        entity_types = {}
+        for entity_type, entities_list in st.session_state.entities.items():
+            if entities_list:  # Only show entity types with actual entities
+                entity_types[entity_type] = entities_list
+
+        if entity_types:
+            tabs = st.tabs(list(entity_types.keys()))
+            for i, (entity_type, tab) in enumerate(zip(entity_types.keys(), tabs)):
+                with tab:
+                    # Create a grid layout for entities
+                    cols = st.columns(3)
+                    for j, entity in enumerate(entity_types[entity_type]):
+                        with cols[j % 3]:
+                            # Use different colors for different entity types
+                            if entity_type == "PERSON":
+                                st.info(entity)
+                            elif entity_type == "ORG" or entity_type == "ORGANIZATION":
+                                st.success(entity)
+                            elif entity_type == "GPE" or entity_type == "LOC" or entity_type == "LOCATION":
+                                st.warning(entity)
+                            elif entity_type == "DATE" or entity_type == "TIME":
+                                st.error(entity)
+                            else:
+                                st.write(entity)
+        else:
+            st.write("No named entities detected in this content.")
+    else:
+        st.write("No named entities detected in this content.")
+
+
+def render_sentiment():
+    # Create columns for the two sentiment analyzers
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.write("**TextBlob Analysis:**")
+        tb_polarity = st.session_state.sentiment["textblob"]["polarity"]
+        tb_subjectivity = st.session_state.sentiment["textblob"]["subjectivity"]
+
+        # Display polarity with color and emotion
+        polarity_color = "green" if tb_polarity > 0 else "red" if tb_polarity < 0 else "gray"
+        polarity_emotion = "Positive 😊" if tb_polarity > 0.3 else "Negative ☹️" if tb_polarity < -0.3 else "Neutral 😐"
+
+        st.markdown(f"Polarity: <span style='color:{polarity_color}'>{tb_polarity:.2f}</span> ({polarity_emotion})", unsafe_allow_html=True)
+        st.progress(tb_subjectivity)
+        st.write(f"Subjectivity: {tb_subjectivity:.2f} (Objective ↔️ Subjective)")
+
+    with col2:
+        st.write("**VADER Analysis:**")
+        vader = st.session_state.sentiment["vader"]
+        compound = vader["compound"]
+
+        # Display sentiment distribution
+        st.write("Sentiment Distribution:")
+
+        # Create a horizontal stacked bar
+        sentiment_data = {
+            "Positive": vader["pos"] * 100,
+            "Neutral": vader["neu"] * 100,
+            "Negative": vader["neg"] * 100
+        }
+
+        # Display compound score with emotion
+        compound_color = "green" if compound > 0.05 else "red" if compound < -0.05 else "gray"
+        compound_emotion = "Positive 😊" if compound > 0.05 else "Negative ☹️" if compound < -0.05 else "Neutral 😐"
+
+        st.markdown(f"Overall: <span style='color:{compound_color}'>{compound:.2f}</span> ({compound_emotion})", unsafe_allow_html=True)
+
+        # Create a chart for sentiment distribution
+        st.bar_chart(sentiment_data)
+
+
+def render_insights():
+    # Display topics in a more visual way
+    if st.session_state.insights["topics"]:
+        st.write("**Topics Identified:**")
+        cols = st.columns(min(3, len(st.session_state.insights["topics"])))
+        for i, topic in enumerate(st.session_state.insights["topics"]):
+            with cols[i % 3]:
+                st.info(topic)
+    else:
+        st.write("**Topics Identified:** None found")
+
+    # Display follow-up questions in an interactive way
+    st.write("**Follow-up Questions:**")
+    for i, question in enumerate(st.session_state.insights["follow_up_questions"]):
+        with st.expander(question):
+            # Check if we already have an answer
+            if f"q_{i}" not in st.session_state.answers:
+                cached = get_cached_answer(question, st.session_state.doc_id,
+                                           backend=st.session_state.llm_backend)
+                if cached is not None:
+                    st.session_state.answers[f"q_{i}"] = cached
+
+            if f"q_{i}" in st.session_state.answers:
+                st.write(st.session_state.answers[f"q_{i}"])
+            else:
+                if st.button(f"Answer this question", key=f"btn_q_{i}"):
+                    with st.spinner("Generating answer..."):
+                        # Let a running prefetch finish rather than sending the document again
+                        prefetch = st.session_state.answer_prefetch
+                        if prefetch is not None:
+                            try:
+                                prefetch.result()
+                            except Exception:
+                                pass
+                        answer = answer_followup_question(question, get_doc_store().get(st.session_state.doc_id),
+                                                          backend=st.session_state.llm_backend,
+                                                          doc_id=st.session_state.doc_id)
+                        # Store answer in session state
+                        st.session_state.answers[f"q_{i}"] = answer
+                        st.write(answer)
+
+
+SECTION_TITLES = {
+    "summary": "📝 Summary",
+    "entities": "🔎 Named Entities",
+    "sentiment": "😊 Sentiment",
+    "insights": "💡 Suggested Insights",
+}
+SECTION_RENDERERS = {
+    "summary": render_summary,
+    "entities": render_entities,
+    "sentiment": render_sentiment,
+    "insights": render_insights,
+}
+# Which UI sections each pipeline stage fills in
+STAGE_SECTIONS = {
+    SUMMARY: ["summary"],
+    ANALYSIS: ["entities", "sentiment"],
+    INSIGHTS: ["insights"],
+}
+
+
+def render_section(name, placeholder, error=None):
+    """Render a result section into its placeholder, replacing any progress message."""
+    with placeholder.container():
+        st.subheader(SECTION_TITLES[name])
+        if error:
+            st.error(error)
+        SECTION_RENDERERS[name]()
+
 
 # Sidebar input options
 st.sidebar.header("Choose your input type:")
@@ -65,164 +396,110 @@ st.sidebar.markdown("""
 <small>Get your API key from [OpenAI](https://platform.openai.com/api-keys)</small>
 """, unsafe_allow_html=True)
 
+BACKEND_LABELS = {
+    "openai": "OpenAI",
+    "local": "Local (fast, offline)",
+    "auto": "Auto (OpenAI, local fallback)",
+}
+st.sidebar.selectbox("LLM backend", BACKENDS, key="llm_backend", format_func=BACKEND_LABELS.get,
+                     index=BACKENDS.index(DEFAULT_BACKEND) if DEFAULT_BACKEND in BACKENDS else 0,
+                     help="Local mode summarizes and answers on this machine in under a second, without an API key")
+
+st.sidebar.checkbox("Classify topics with the LLM", value=False, key="llm_topics",
+                    help="Use the selected LLM backend for topic classification, falling back to keywords when it isn't confident")
+
+st.sidebar.checkbox("Prefetch follow-up answers", value=True, key="prefetch_answers",
+                    help="Answer all suggested questions in one background request as soon as insights are ready")
+
 st.sidebar.markdown("---")
 
 if input_type == "PDF":
     uploaded_file = st.sidebar.file_uploader("Upload PDF", type=["pdf"])
     if uploaded_file:
-        st.session_state.raw_text = extract_pdf_text(uploaded_file)
+        data = uploaded_file.getvalue()
+        load_source("parse_pdf", lambda: {"path": spool_upload(data, suffix=".pdf"), "spooled": True},
+                    key=f"pdf:{content_key(data)}")
 
 elif input_type == "YouTube":
     youtube_url = st.sidebar.text_input("Enter YouTube URL")
     if youtube_url:
-        st.session_state.raw_text = extract_youtube_transcript(youtube_url)
+        load_source("parse_youtube", lambda: {"url": youtube_url}, key=f"youtube:{youtube_url}")
 
 elif input_type == "News Article":
     news_url = st.sidebar.text_input("Enter News Article URL")
     if news_url:
-        st.session_state.raw_text = extract_news_content(news_url)
+        load_source("parse_news", lambda: {"url": news_url}, key=f"news:{news_url}")
 
-if st.session_state.raw_text:
+# The stored document may have been cleaned up since the last rerun
+if (st.session_state.doc_id and get_doc_store().exists(st.session_state.doc_id)
+        and get_doc_store().length(st.session_state.doc_id)):
     st.subheader("🔍 Extracted Raw Text")
     with st.expander("View Text"):
-        st.write(st.session_state.raw_text[:3000] + "..." if len(st.session_state.raw_text) > 3000 else st.session_state.raw_text)
+        st.write(get_doc_store().preview(st.session_state.doc_id, 3000))
 
     if st.button("Generate Summary and Insights") or st.session_state.summary:
+        # Reserve a slot for each section so results can fill in as they complete
+        sections = {name: st.empty() for name in SECTION_RENDERERS}
+        rendered = set()
+
         # Only run analysis if not already in session state
         if not st.session_state.summary:
+            for name, placeholder in sections.items():
+                with placeholder.container():
+                    st.subheader(SECTION_TITLES[name])
+                    st.info("⏳ Working on it...")
+
             try:
-                with st.spinner("Generating summary..."):
-                    summary = summarize_text(st.session_state.raw_text)
-                    
-                    # Check if summary is an error message
-                    if summary.startswith("⚠️ ERROR"):
-                        st.error(summary)
-                        st.session_state.summary = "Could not generate summary due to API key issues."
-                    else:
-                        st.session_state.summary = summary
-                        
-                        # Only proceed with further analysis if summary was successful
-                        try:
-                            analysis_result = analyze_text(st.session_state.raw_text)
-                            st.session_state.entities = analysis_result["entities"]
-                            st.session_state.sentiment = analysis_result["sentiment"]
-                            st.session_state.insights = generate_insights(st.session_state.summary)
-                        except Exception as e:
-                            st.error(f"Error during analysis: {str(e)}")
-                            # Initialize with empty values to prevent errors
-                            st.session_state.entities = {}
-                            st.session_state.sentiment = {"textblob": {"polarity": 0, "subjectivity": 0}, 
-                                                         "vader": {"neg": 0, "neu": 1, "pos": 0, "compound": 0}}
-                            st.session_state.insights = {"follow_up_questions": ["What are the key points?"], "topics": []}
-                            
+                ctx = get_script_run_ctx()
+                nlp_pool = get_nlp_pool()
+                llm_backend = st.session_state.llm_backend
+                insights = nlp_pool.generate_insights
+                if st.session_state.llm_topics:
+                    # Runs in the pipeline's worker thread, replacing the keyword topics
+                    def insights(summary):
+                        return dict(nlp_pool.generate_insights(summary),
+                                    topics=classify_topics(summary, use_gpt=True, backend=llm_backend))
+                with start_trace(source=st.session_state.source_key, backend=st.session_state.llm_backend) as trace:
+                    # Attribute the extraction time to the first analysis of the document
+                    if st.session_state.extraction_telemetry:
+                        trace.merge(st.session_state.extraction_telemetry)
+                        st.session_state.extraction_telemetry = None
+                    for result in iter_analysis(
+                        get_doc_store().get(st.session_state.doc_id),
+                        summarize=functools.partial(summarize_text, backend=llm_backend),
+                        analyze=nlp_pool.analyze_text,
+                        insights=insights,
+                        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+                    ):
+                        error = apply_stage_result(result)
+                        for name in STAGE_SECTIONS[result.stage]:
+                            render_section(name, sections[name], error)
+                            rendered.add(name)
+
+                # Keep a per-request trace of stage timings and token counts
+                trace_dir = os.getenv("SCOPEAI_TRACE_DIR")
+                if trace_dir:
+                    os.makedirs(trace_dir, exist_ok=True)
+                    trace.write_json(os.path.join(trace_dir, f"{trace.request_id}.json"))
             except Exception as e:
                 st.error(f"Error: {str(e)}")
-                st.session_state.summary = "Error generating summary. Please check your API key and try again."
-
-        # Now display all results using session state variables
-        st.subheader("📝 Summary")
-        st.write(st.session_state.summary)
-
-        st.subheader("🔎 Named Entities")
-        if st.session_state.entities and len(st.session_state.entities) > 0:
-            # Group entities by type
-            entity_types = {}
-            for entity_type, entities_list in st.session_state.entities.items():
-                if entities_list:  # Only show entity types with actual entities
-                    entity_types[entity_type] = entities_list
-            
-            if entity_types:
-                tabs = st.tabs(list(entity_types.keys()))
-                for i, (entity_type, tab) in enumerate(zip(entity_types.keys(), tabs)):
-                    with tab:
-                        # Create a grid layout for entities
-                        cols = st.columns(3)
-                        for j, entity in enumerate(entity_types[entity_type]):
-                            with cols[j % 3]:
-                                # Use different colors for different entity types
-                                if entity_type == "PERSON":
-                                    st.info(entity)
-                                elif entity_type == "ORG" or entity_type == "ORGANIZATION":
-                                    st.success(entity)
-                                elif entity_type == "GPE" or entity_type == "LOC" or entity_type == "LOCATION":
-                                    st.warning(entity)
-                                elif entity_type == "DATE" or entity_type == "TIME":
-                                    st.error(entity)
-                                else:
-                                    st.write(entity)
-            else:
-                st.write("No named entities detected in this content.")
-        else:
-            st.write("No named entities detected in this content.")
+                if not st.session_state.summary:
+                    st.session_state.summary = "Error generating summary. Please check your API key and try again."
 
-        st.subheader("😊 Sentiment")
-
-        # Create columns for the two sentiment analyzers
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.write("**TextBlob Analysis:**")
-            tb_polarity = st.session_state.sentiment["textblob"]["polarity"]
-            tb_subjectivity = st.session_state.sentiment["textblob"]["subjectivity"]
-            
-            # Display polarity with color and emotion
-            polarity_color = "green" if tb_polarity > 0 else "red" if tb_polarity < 0 else "gray"
-            polarity_emotion = "Positive 😊" if tb_polarity > 0.3 else "Negative ☹️" if tb_polarity < -0.3 else "Neutral 😐"
-            
-            st.markdown(f"Polarity: <span style='color:{polarity_color}'>{tb_polarity:.2f}</span> ({polarity_emotion})", unsafe_allow_html=True)
-            st.progress(tb_subjectivity)
-            st.write(f"Subjectivity: {tb_subjectivity:.2f} (Objective ↔️ Subjective)")
-
-        with col2:
-            st.write("**VADER Analysis:**")
-            vader = st.session_state.sentiment["vader"]
-            compound = vader["compound"]
-            
-            # Display sentiment distribution
-            st.write("Sentiment Distribution:")
-            
-            # Create a horizontal stacked bar
-            sentiment_data = {
-                "Positive": vader["pos"] * 100,
-                "Neutral": vader["neu"] * 100,
-                "Negative": vader["neg"] * 100
-            }
-            
-            # Display compound score with emotion
-            compound_color = "green" if compound > 0.05 else "red" if compound < -0.05 else "gray"
-            compound_emotion = "Positive 😊" if compound > 0.05 else "Negative ☹️" if compound < -0.05 else "Neutral 😐"
-            
-            st.markdown(f"Overall: <span style='color:{compound_color}'>{compound:.2f}</span> ({compound_emotion})", unsafe_allow_html=True)
-            
-            # Create a chart for sentiment distribution
-            st.bar_chart(sentiment_data)
-
-        st.subheader("💡 Suggested Insights")
-
-        # Display topics in a more visual way
-        if st.session_state.insights["topics"]:
-            st.write("**Topics Identified:**")
-            cols = st.columns(min(3, len(st.session_state.insights["topics"])))
-            for i, topic in enumerate(st.session_state.insights["topics"]):
-                with cols[i % 3]:
-                    st.info(topic)
-        else:
-            st.write("**Topics Identified:** None found")
-
-        # Display follow-up questions in an interactive way
-        st.write("**Follow-up Questions:**")
-        for i, question in enumerate(st.session_state.insights["follow_up_questions"]):
-            with st.expander(question):
-                # Check if we already have an answer
-                if f"q_{i}" in st.session_state.answers:
-                    st.write(st.session_state.answers[f"q_{i}"])
-                else:
-                    if st.button(f"Answer this question", key=f"btn_q_{i}"):
-                        with st.spinner("Generating answer..."):
-                            answer = answer_followup_question(question, st.session_state.raw_text)
-                            # Store answer in session state
-                            st.session_state.answers[f"q_{i}"] = answer
-                            st.write(answer)
+            fill_missing_results()
+
+            # Record entities and topics so they can be queried across documents later
+            try:
+                get_corpus_index().add_document(st.session_state.doc_id, st.session_state.entities,
+                                                st.session_state.insights["topics"],
+                                                source=st.session_state.source_key)
+            except Exception as e:
+                st.sidebar.warning(f"Could not update the corpus index: {str(e)}")
+
+        # Now display every section that was not streamed in above
+        for name, placeholder in sections.items():
+            if name not in rendered:
+                render_section(name, placeholder)
 else:
     st.info("Please upload a file or enter a valid URL to begin.")
 
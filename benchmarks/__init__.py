@@ -0,0 +1,2 @@
+# ScopeAI benchmark suite
+# Run with: python -m benchmarks.run --help
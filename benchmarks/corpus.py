@@ -0,0 +1,100 @@
+import html
+import random
+from typing import List
+
+"""
+Synthetic corpora for benchmarks.
+Generates deterministic English-like text of a requested size, plus HTML
+article and PDF renderings of it.
+"""
+
+_SUBJECTS = ["The company", "The government", "Researchers", "The central bank", "Doctors",
+             "The university", "Investors", "The new software", "Local officials", "The market"]
+_VERBS = ["announced", "reported", "reviewed", "expanded", "criticized", "launched",
+          "approved", "delayed", "measured", "predicted"]
+_OBJECTS = ["a new budget", "the quarterly revenue", "a treatment plan", "the data platform",
+            "an investment fund", "the election results", "a customer service program",
+            "the hospital network", "an academic study", "the regulation"]
+_TAILS = ["after months of debate", "in New York last Monday", "despite rising costs",
+          "according to Apple Inc", "with strong support from students", "amid political pressure",
+          "for the third time this year", "in a statement on Friday", "as demand kept growing", ""]
+
+SIZES = {"1KB": 1 << 10, "100KB": 100 << 10, "1MB": 1 << 20, "10MB": 10 << 20, "100MB": 100 << 20}
+
+
+def parse_size(size: str) -> int:
+    """Convert a size label like "10MB" (or a plain byte count) to bytes."""
+    return SIZES[size] if size in SIZES else int(size)
+
+
+def generate_text(size_bytes: int, seed: int = 0) -> str:
+    """
+    Generate deterministic English-like text of roughly size_bytes.
+
+    Args:
+        size_bytes: Target size in bytes
+        seed: Random seed
+
+    Returns:
+        Generated text with paragraphs separated by blank lines
+    """
+    rng = random.Random(seed)
+    parts: List[str] = []
+    total = 0
+    sentences_in_paragraph = 0
+
+    while total < size_bytes:
+        tail = rng.choice(_TAILS)
+        sentence = f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}{' ' + tail if tail else ''}."
+        sentences_in_paragraph += 1
+        separator = "\n\n" if sentences_in_paragraph % 6 == 0 else " "
+        parts.append(sentence + separator)
+        total += len(sentence) + len(separator)
+
+    return "".join(parts)[:size_bytes]
+
+
+def make_html_article(text: str, title: str = "Benchmark Article") -> str:
+    """
+    Wrap text in a news-like HTML page with navigation, ads and comments.
+
+    Args:
+        text: Article body
+        title: Page title
+
+    Returns:
+        HTML document
+    """
+    paragraphs = "\n".join(f"<p>{html.escape(p.strip())}</p>" for p in text.split("\n\n") if p.strip())
+    return f"""<!DOCTYPE html>
+<html><head><title>{html.escape(title)}</title><style>body {{ font-family: serif; }}</style>
+<script>var tracking = true;</script></head>
+<body>
+<header><nav><a href="/">Home</a> <a href="/world">World</a></nav></header>
+<div class="ad-banner">Subscribe now for unlimited access to every story!</div>
+<article><h1>{html.escape(title)}</h1>
+{paragraphs}
+</article>
+<div class="related-stories"><p>Read more: another story you may like to read today.</p></div>
+<div class="comments"><p>Great article, thanks for sharing this with all of us readers.</p></div>
+<footer>Copyright Benchmark News</footer>
+</body></html>"""
+
+
+def make_pdf(text: str, path: str, chars_per_page: int = 3000):
+    """
+    Render text into a PDF file using PyMuPDF.
+
+    Args:
+        text: Text to render
+        path: Output file path
+        chars_per_page: Approximate number of characters per page
+    """
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for start in range(0, max(len(text), 1), chars_per_page):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(36, 36, 559, 806), text[start:start + chars_per_page], fontsize=7)
+    doc.save(path)
+    doc.close()
@@ -0,0 +1,246 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from .corpus import SIZES, generate_text, make_html_article, make_pdf, parse_size
+from .stub_server import StubConfig, StubServer
+
+"""
+End-to-end benchmark runner.
+Each (benchmark, size) case runs in a fresh process so peak RSS can be
+measured per case. LLM calls go to a local OpenAI-compatible stub server.
+
+Example:
+    python -m benchmarks.run --sizes 1KB,100KB,1MB --latency 0.1 --rate-limit-rate 0.05
+"""
+
+
+def _bench_pdf_extract(text: str, ctx: Dict) -> Callable[[], None]:
+    from src.parser.pdf_parser import extract_pdf_text
+
+    path = os.path.join(ctx["tmpdir"], "bench.pdf")
+    make_pdf(text, path)
+
+    def run():
+        with open(path, "rb") as f:
+            extract_pdf_text(f)
+    return run
+
+
+def _bench_news_extract(text: str, ctx: Dict) -> Callable[[], None]:
+    from src.parser.news_parser import extract_news_content
+    return lambda: extract_news_content(ctx["fixture_url"])
+
+
+def _bench_chunk_text(text: str, ctx: Dict) -> Callable[[], None]:
+    from src.utils.helpers import chunk_text
+    return lambda: chunk_text(text)
+
+
+def _bench_count_tokens(text: str, ctx: Dict) -> Callable[[], None]:
+    from src.utils.helpers import count_tokens
+    count_tokens("warm up")  # Load the encoding outside the timed runs
+    return lambda: count_tokens(text)
+
+
+def _bench_summarize(text: str, ctx: Dict) -> Callable[[], None]:
+    from src.llm.summarizer import TextSummarizer
+    summarizer = TextSummarizer(api_key="stub-key", base_url=ctx["base_url"])
+    return lambda: summarizer.summarize(text)
+
+
+def _bench_local_summarize(text: str, ctx: Dict) -> Callable[[], None]:
+    from src.llm.backends import LocalBackend
+    backend = LocalBackend()
+    return lambda: backend.summarize(text)
+
+
+def _bench_analyze_text(text: str, ctx: Dict) -> Callable[[], None]:
+    from src.llm.ner_sentiment import analyze_text
+    return lambda: analyze_text(text)
+
+
+def _bench_generate_insights(text: str, ctx: Dict) -> Callable[[], None]:
+    from src.llm.insight_gen import generate_insights
+    return lambda: generate_insights(text)
+
+
+# name -> (setup function returning the timed callable, largest input size run by default)
+BENCHMARKS = {
+    "pdf_extract": (_bench_pdf_extract, SIZES["10MB"]),
+    "news_extract": (_bench_news_extract, SIZES["10MB"]),
+    "chunk_text": (_bench_chunk_text, SIZES["100MB"]),
+    "count_tokens": (_bench_count_tokens, SIZES["100MB"]),
+    "summarize": (_bench_summarize, SIZES["1MB"]),
+    "local_summarize": (_bench_local_summarize, SIZES["10MB"]),
+    "analyze_text": (_bench_analyze_text, SIZES["1MB"]),
+    "generate_insights": (_bench_generate_insights, SIZES["100KB"]),
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 2)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile: the smallest value with at least pct percent of the values at or below it."""
+    ordered = sorted(values)
+    # Multiply before dividing, so e.g. 90% of 10 values is exactly rank 9
+    index = min(len(ordered) - 1, max(0, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[index]
+
+
+def _run_case(name: str, size_bytes: int, repeat: int, ctx: Dict, results: multiprocessing.Queue):
+    """Child process: build the input, time the benchmark and report latencies and peak RSS."""
+    try:
+        text = generate_text(size_bytes, seed=ctx["seed"])
+        run = BENCHMARKS[name][0](text, ctx)
+        baseline_rss = _peak_rss_mb()
+
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            latencies.append(time.perf_counter() - start)
+
+        results.put({"latencies": latencies, "baseline_rss_mb": baseline_rss, "peak_rss_mb": _peak_rss_mb()})
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_case(name: str, size_bytes: int, repeat: int, ctx: Dict, timeout: float) -> Dict:
+    """
+    Run one benchmark case in a fresh process and summarize its measurements.
+
+    Args:
+        name: Benchmark name from BENCHMARKS
+        size_bytes: Input size in bytes
+        repeat: Number of timed runs
+        ctx: Shared context (stub URLs, temp dir, seed)
+        timeout: Seconds to wait before abandoning the case
+
+    Returns:
+        Result dictionary for the case
+    """
+    mp = multiprocessing.get_context("spawn")
+    results = mp.Queue()
+    process = mp.Process(target=_run_case, args=(name, size_bytes, repeat, ctx, results))
+    process.start()
+
+    try:
+        measured = results.get(timeout=timeout)
+    except Exception:
+        measured = {"error": f"Timed out after {timeout}s"}
+    process.join(5)
+    if process.is_alive():
+        process.terminate()
+
+    result = {"benchmark": name, "bytes": size_bytes, "repeat": repeat}
+    if "error" in measured:
+        result["error"] = measured["error"]
+        return result
+
+    latencies = measured["latencies"]
+    mean = sum(latencies) / len(latencies)
+    result.update({
+        "latency_s": {
+            "min": min(latencies),
+            "mean": mean,
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "max": max(latencies),
+        },
+        "throughput_mb_s": (size_bytes / (1 << 20)) / mean if mean > 0 else None,
+        "baseline_rss_mb": measured["baseline_rss_mb"],
+        "peak_rss_mb": measured["peak_rss_mb"],
+    })
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the ScopeAI benchmark suite")
+    parser.add_argument("--benchmarks", default=",".join(BENCHMARKS), help="Comma-separated benchmark names")
+    parser.add_argument("--sizes", default="1KB,100KB,1MB,10MB,100MB", help="Comma-separated input sizes")
+    parser.add_argument("--all-sizes", action="store_true", help="Ignore per-benchmark size caps")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds allowed per case")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of stub requests failing with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/bench-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.benchmarks.split(",") if n.strip()]
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    sizes = [parse_size(s.strip()) for s in args.sizes.split(",") if s.strip()]
+
+    output = args.output or os.path.join(os.path.dirname(__file__), "results",
+                                         time.strftime("bench-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    config = StubConfig(args.latency, args.jitter, args.error_rate, args.rate_limit_rate, seed=args.seed)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "results": [],
+    }
+
+    with StubServer(config) as server, tempfile.TemporaryDirectory() as tmpdir:
+        for name in names:
+            max_bytes = BENCHMARKS[name][1]
+            for size_bytes in sizes:
+                if size_bytes > max_bytes and not args.all_sizes:
+                    continue
+
+                ctx = {"base_url": server.base_url, "tmpdir": tmpdir, "seed": args.seed}
+                if name == "news_extract":
+                    ctx["fixture_url"] = server.add_fixture(
+                        f"article-{size_bytes}.html", make_html_article(generate_text(size_bytes, seed=args.seed)))
+
+                stub_before = server.stats
+                result = run_case(name, size_bytes, args.repeat, ctx, args.timeout)
+                result["stub"] = {k: server.stats[k] - stub_before[k] for k in stub_before}
+                report["results"].append(result)
+
+                if "error" in result:
+                    print(f"{name:<18} {size_bytes:>11,} B  ERROR {result['error']}")
+                else:
+                    print(f"{name:<18} {size_bytes:>11,} B  p50 {result['latency_s']['p50']:.4f}s  "
+                          f"p99 {result['latency_s']['p99']:.4f}s  peak RSS {result['peak_rss_mb']} MB")
+
+                # Write after every case so partial results survive interruptions
+                with open(output, "w", encoding="utf-8") as f:
+                    json.dump(report, f, indent=2)
+
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+"""
+Local OpenAI-compatible stub server.
+Answers /v1/chat/completions with a deterministic pseudo-summary after a
+configurable latency, and can inject server errors and 429 rate limits.
+Also serves HTML fixtures under /fixtures/ for the news parser benchmarks.
+"""
+
+
+class StubConfig:
+    """Behaviour of the stub server."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, summary_words: int = 60, seed: int = 0):
+        """
+        Args:
+            latency: Base response latency in seconds
+            jitter: Maximum extra random latency in seconds
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            summary_words: Number of words in each completion
+            seed: Seed for the error/latency random generator
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.summary_words = summary_words
+        self.random = random.Random(seed)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ScopeAIStub/0.1"
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        fixtures = self.server.fixtures
+        name = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+        if not self.path.startswith("/fixtures/") or name not in fixtures:
+            self.send_error(404)
+            return
+
+        data = fixtures[name].encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        config = self.server.config
+        stats = self.server.stats
+        with self.server.lock:
+            roll = config.random.random()
+            delay = config.latency + config.random.random() * config.jitter
+            stats["requests"] += 1
+
+        time.sleep(delay)
+
+        if roll < config.rate_limit_rate:
+            with self.server.lock:
+                stats["rate_limited"] += 1
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                            headers={"Retry-After": "0"})
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            with self.server.lock:
+                stats["errors"] += 1
+            self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        prompt = " ".join(m.get("content") or "" for m in messages)
+        last_user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        completion = " ".join(last_user.split()[-config.summary_words:])
+        prompt_tokens = len(prompt.split())
+        completion_tokens = len(completion.split())
+
+        self._send_json(200, {
+            "id": f"chatcmpl-stub-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": completion},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+class StubServer:
+    """Run the stub server in a background thread, usable as a context manager."""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = config or StubConfig()
+        self.httpd.fixtures = {}
+        self.httpd.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+        self.httpd.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to pass to the OpenAI client."""
+        return self.url + "/v1"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self.httpd.stats)
+
+    def add_fixture(self, name: str, html: str) -> str:
+        """
+        Serve an HTML document and return its URL.
+
+        Args:
+            name: File name under /fixtures/
+            html: Document contents
+
+        Returns:
+            URL of the fixture
+        """
+        self.httpd.fixtures[name] = html
+        return f"{self.url}/fixtures/{name}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the OpenAI-compatible stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubServer(StubConfig(args.latency, args.jitter, args.error_rate, args.rate_limit_rate), port=args.port)
+    print(f"Stub server listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
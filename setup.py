@@ -17,4 +17,7 @@ if __name__ == "__main__":
             line.strip() for line in open("requirements.txt")
             if line.strip() and not line.startswith("#")
         ],
+        entry_points={
+            "console_scripts": ["scopeai=src.cli:main"],
+        },
     )
\ No newline at end of file
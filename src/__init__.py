@@ -1,7 +1,16 @@
 # ScopeAI package
 __version__ = "0.1.0"
 
-# Import submodules to make them available when importing the package
-from . import parser
-from . import llm
-from . import utils
+import importlib
+
+# Submodules are imported on first attribute access so that importing a single
+# helper doesn't pull in every heavy dependency (torch, spaCy, Streamlit, ...)
+_SUBMODULES = ("parser", "llm", "utils", "batch", "cli")
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_SUBMODULES))
@@ -0,0 +1,371 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set
+
+from .utils.corpus_index import CorpusIndex
+from .utils.tracing import Trace, activate, span, write_prometheus
+
+"""
+Headless batch pipeline.
+Runs extraction -> summary -> NER/sentiment -> insights over a manifest of
+sources, with a worker pool per stage and bounded queues between stages.
+Results are streamed to a JSONL file and completed items are checkpointed so
+that an interrupted run can be resumed.
+"""
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("extract", "summarize", "analyze", "insights")
+DEFAULT_WORKERS = {"extract": 4, "summarize": 8, "analyze": 2, "insights": 2}
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# Prefixes the parsers use when they return an error message instead of text
+PARSER_ERROR_PREFIXES = ("❌", "Error fetching the article", "Could not extract article content")
+
+
+def infer_source_type(source: str) -> str:
+    """
+    Guess the source type of a manifest entry.
+
+    Args:
+        source: File path or URL
+
+    Returns:
+        One of "pdf", "youtube" or "news"
+    """
+    lowered = source.lower()
+    if "youtube.com/" in lowered or "youtu.be/" in lowered:
+        return "youtube"
+    if lowered.endswith(".pdf"):
+        return "pdf"
+    return "news"
+
+
+def load_manifest(path: str) -> Iterator[Dict]:
+    """
+    Read manifest entries from a file.
+
+    Each non-empty line is either a JSON object with a "source" key (and
+    optional "id" and "type") or a bare path/URL. Lines starting with # are
+    ignored.
+
+    Args:
+        path: Path to the manifest file
+
+    Yields:
+        Item dictionaries with "id", "type" and "source" keys
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            item = json.loads(line) if line.startswith("{") else {"source": line}
+            item.setdefault("type", infer_source_type(item["source"]))
+            item.setdefault("id", item["source"])
+            yield item
+
+
+def load_checkpoint(path: Optional[str]) -> Set[str]:
+    """
+    Read the ids of items completed by previous runs.
+
+    Args:
+        path: Path to the checkpoint file
+
+    Returns:
+        Set of completed item ids
+    """
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def extract_item(item: Dict) -> str:
+    """
+    Extract the raw text for a manifest item.
+
+    Args:
+        item: Manifest item
+
+    Returns:
+        Extracted text
+    """
+    if item["type"] == "pdf":
+        from .parser.pdf_parser import extract_pdf_text
+        with open(item["source"], "rb") as f:
+            text = extract_pdf_text(f)
+    elif item["type"] == "youtube":
+        from .parser.youtube_parser import extract_youtube_transcript
+        text = extract_youtube_transcript(item["source"])
+    elif item["type"] == "news":
+        from .parser.news_parser import extract_news_content
+        text = extract_news_content(item["source"])
+    else:
+        raise ValueError(f"Unknown source type: {item['type']}")
+
+    if not text or text.startswith(PARSER_ERROR_PREFIXES):
+        raise RuntimeError(text or "No text extracted")
+    return text
+
+
+class BatchRunner:
+    """Run the analysis pipeline over many items with a worker pool per stage."""
+
+    def __init__(self, output_path: str, checkpoint_path: Optional[str] = None,
+                 workers: Optional[Dict[str, int]] = None, queue_size: int = 64,
+                 model: str = "gpt-3.5-turbo", compression_ratio: Optional[float] = None,
+                 include_text: bool = False, nlp_processes: int = 0, trace: bool = False,
+                 metrics_path: Optional[str] = None, index_path: Optional[str] = None,
+                 backend: Optional[str] = None, llm_topics: bool = False, topic_batch_size: int = 20):
+        """
+        Initialize the runner.
+
+        Args:
+            output_path: JSONL file results are appended to
+            checkpoint_path: File recording completed item ids (defaults to output_path + ".ckpt")
+            workers: Number of worker threads per stage, keyed by stage name
+            queue_size: Maximum number of items waiting between two stages
+            model: OpenAI model used for summarization
+            compression_ratio: Optional extractive compression ratio for the summarizer
+            include_text: Whether to include the extracted text in each result
+            nlp_processes: If > 0, run NER/sentiment and insights in a pool of this many
+                processes with preloaded models instead of in the stage threads
+            trace: Whether to attach a per-item trace (stage spans and token counts) to each result
+            metrics_path: File to write aggregate metrics to in Prometheus text format
+            index_path: SQLite corpus index to add each successful item's entities and topics to
+            backend: LLM backend for summaries, "openai", "local" or "auto" (defaults to SCOPEAI_LLM_BACKEND)
+            llm_topics: Classify topics with the LLM backend, batching summaries from
+                concurrent items into one request, instead of keyword matching
+            topic_batch_size: Maximum summaries per topic classification request
+        """
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or output_path + ".ckpt"
+        self.workers = dict(DEFAULT_WORKERS, **(workers or {}))
+        self.queue_size = queue_size
+        self.model = model
+        self.compression_ratio = compression_ratio
+        self.include_text = include_text
+
+        self.stats = {stage: 0 for stage in STAGES}
+        self.stats.update({"skipped": 0, "written": 0, "errors": 0, "index_errors": 0})
+        self._stats_lock = threading.Lock()
+        self.nlp_processes = nlp_processes
+        if nlp_processes > 0:
+            # Stage threads only wait on the pool, so keep enough of them to feed every process
+            for stage in ("analyze", "insights"):
+                self.workers[stage] = max(self.workers[stage], nlp_processes)
+        self.trace = trace
+        self.metrics_path = metrics_path
+        self.backend = backend
+        self._llm = None
+        self.llm_topics = llm_topics
+        self.topic_batch_size = topic_batch_size
+        self._topic_batcher = None
+        if llm_topics:
+            # Each insight thread waits on the batcher, so keep enough of them to fill a batch
+            self.workers["insights"] = max(self.workers["insights"], topic_batch_size)
+        self._nlp_pool = None
+        self._traces: Dict[str, Trace] = {}
+        self._index = CorpusIndex(index_path) if index_path else None
+
+    def _summarize(self, record: Dict):
+        record["summary"] = self._llm.summarize(record["text"], compression_ratio=self.compression_ratio)
+
+    def _extract(self, record: Dict):
+        record["text"] = extract_item(record)
+
+    def _analyze(self, record: Dict):
+        if self._nlp_pool:
+            record.update(self._nlp_pool.analyze_text(record["text"]))
+        else:
+            from .llm.ner_sentiment import analyze_text
+            record.update(analyze_text(record["text"]))
+
+    def _insights(self, record: Dict):
+        if self._nlp_pool:
+            record["insights"] = self._nlp_pool.generate_insights(record["summary"])
+        else:
+            from .llm.insight_gen import generate_insights
+            record["insights"] = generate_insights(record["summary"])
+        if self._topic_batcher is not None:
+            record["insights"]["topics"] = self._topic_batcher.classify(record["summary"])
+
+    def _stage_handlers(self) -> Dict[str, Callable[[Dict], None]]:
+        return {
+            "extract": self._extract,
+            "summarize": self._summarize,
+            "analyze": self._analyze,
+            "insights": self._insights,
+        }
+
+    def _run_stage(self, stage: str, handler: Callable[[Dict], None],
+                   inbox: queue.Queue, outbox: queue.Queue, remaining: list, lock: threading.Lock,
+                   downstream_workers: int):
+        """Worker loop for one stage; the last worker to finish signals every worker of the next stage."""
+        while True:
+            record = inbox.get()
+            if record is _DONE:
+                break
+
+            # Records that already failed pass straight through to the writer
+            if "error" not in record:
+                try:
+                    with activate(self._traces.get(record["id"])), span(f"batch.{stage}"):
+                        handler(record)
+                    with self._stats_lock:
+                        self.stats[stage] += 1
+                except Exception as e:
+                    logger.warning(f"{stage} failed for {record['id']}: {e}")
+                    record["error"] = f"{stage}: {str(e)}"
+
+            outbox.put(record)
+
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                for _ in range(downstream_workers):
+                    outbox.put(_DONE)
+
+    def _index_record(self, record: Dict):
+        """Add a successful record's entities and topics to the corpus index, counting failures."""
+        try:
+            self._index.add_document(record["id"], record.get("entities"),
+                                     (record.get("insights") or {}).get("topics", []), source=record.get("source"))
+        except Exception as e:
+            logger.warning(f"Indexing failed for {record['id']}: {e}")
+            with self._stats_lock:
+                self.stats["index_errors"] += 1
+
+    def _write_record(self, record: Dict, out, ckpt):
+        if not self.include_text:
+            record.pop("text", None)
+        trace = self._traces.pop(record["id"], None)
+        if trace is not None:
+            record["trace"] = trace.to_dict()
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+        with self._stats_lock:
+            self.stats["written"] += 1
+            if "error" in record:
+                self.stats["errors"] += 1
+
+        # Only successful items are checkpointed, so failures are retried on resume
+        if "error" not in record:
+            if self._index is not None:
+                self._index_record(record)
+            ckpt.write(record["id"] + "\n")
+            ckpt.flush()
+
+    def _write_results(self, inbox: queue.Queue):
+        """Append finished records to the output file and checkpoint successful ones."""
+        with open(self.output_path, "a", encoding="utf-8") as out, \
+                open(self.checkpoint_path, "a", encoding="utf-8") as ckpt:
+            while True:
+                record = inbox.get()
+                if record is _DONE:
+                    break
+
+                # The writer must keep draining its queue, or every stage blocks on a full queue
+                try:
+                    self._write_record(record, out, ckpt)
+                except Exception as e:
+                    logger.error(f"Writing the result of {record.get('id')} failed: {e}")
+                    with self._stats_lock:
+                        self.stats["errors"] += 1
+
+    def run(self, items: Iterable[Dict], progress_every: int = 100) -> Dict[str, float]:
+        """
+        Process items through every stage.
+
+        Items already listed in the checkpoint file are skipped. Results are
+        written at least once: an item whose result was written but not yet
+        checkpointed when the run stopped is processed again on resume.
+
+        Args:
+            items: Manifest items with "id", "type" and "source" keys
+            progress_every: Log progress after this many items are fed in
+
+        Returns:
+            Dictionary of per-stage counts, errors, elapsed time and throughput
+
+        Raises:
+            ValueError: If the LLM backend can't be created (e.g. "openai" without an API key)
+        """
+        completed = load_checkpoint(self.checkpoint_path)
+        # Created once before the workers start, so every summarize thread shares one backend
+        if self._llm is None:
+            from .llm.backends import get_backend
+            self._llm = get_backend(self.backend, model=self.model)
+        if self.nlp_processes > 0 and self._nlp_pool is None:
+            from .llm.nlp_pool import NLPWorkerPool
+            self._nlp_pool = NLPWorkerPool(num_workers=self.nlp_processes)
+        if self.llm_topics and self._topic_batcher is None:
+            from .llm.insight_gen import TopicBatcher
+            self._topic_batcher = TopicBatcher(backend=self.backend, batch_size=self.topic_batch_size)
+        handlers = self._stage_handlers()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(STAGES) + 1)]
+        threads = []
+        start_time = time.time()
+
+        # Worker counts per stage, plus the single writer at the end
+        counts = [max(1, self.workers[stage]) for stage in STAGES] + [1]
+
+        for i, stage in enumerate(STAGES):
+            remaining, lock = [counts[i]], threading.Lock()
+            for n in range(counts[i]):
+                thread = threading.Thread(
+                    target=self._run_stage,
+                    args=(stage, handlers[stage], queues[i], queues[i + 1], remaining, lock, counts[i + 1]),
+                    name=f"{stage}-{n}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        writer = threading.Thread(target=self._write_results, args=(queues[-1],), name="writer", daemon=True)
+        writer.start()
+
+        # Feed the first stage; put() blocks when the queue is full, bounding memory
+        fed = 0
+        for item in items:
+            if item["id"] in completed:
+                self.stats["skipped"] += 1
+                continue
+            if self.trace:
+                self._traces[item["id"]] = Trace(item["id"], type=item["type"], source=item["source"])
+            queues[0].put(dict(item))
+            fed += 1
+            if progress_every and fed % progress_every == 0:
+                logger.info(f"Queued {fed} items, written {self.stats['written']}")
+
+        for _ in range(counts[0]):
+            queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        writer.join()
+
+        if self._nlp_pool:
+            self._nlp_pool.shutdown()
+            self._nlp_pool = None
+        if self._topic_batcher is not None:
+            self._topic_batcher.close()
+            self._topic_batcher = None
+        if self.metrics_path:
+            write_prometheus(self.metrics_path)
+
+        elapsed = time.time() - start_time
+        result = dict(self.stats)
+        result["elapsed_seconds"] = round(elapsed, 3)
+        result["items_per_second"] = round(self.stats["written"] / elapsed, 3) if elapsed > 0 else 0.0
+        return result
@@ -0,0 +1,177 @@
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional
+
+"""
+Command-line entry point for headless ScopeAI runs.
+
+Example:
+    scopeai run manifest.txt -o results.jsonl --summarize-workers 16 --index corpus.sqlite3
+    scopeai query corpus.sqlite3 --entity "Acme Inc" --topic Finance --since 7d
+    scopeai playlist "https://www.youtube.com/playlist?list=..." -o transcripts/
+"""
+
+
+def _add_run_parser(subparsers):
+    parser = subparsers.add_parser("run", help="Process a manifest of PDFs, YouTube URLs and news URLs")
+    parser.add_argument("manifest", help="File with one path/URL or JSON object per line")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file to append results to")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: OUTPUT.ckpt)")
+    parser.add_argument("--extract-workers", type=int, default=4, help="Worker threads for text extraction")
+    parser.add_argument("--summarize-workers", type=int, default=8, help="Worker threads for LLM summaries")
+    parser.add_argument("--analyze-workers", type=int, default=2, help="Worker threads for NER and sentiment")
+    parser.add_argument("--insight-workers", type=int, default=2, help="Worker threads for insight generation")
+    parser.add_argument("--nlp-processes", type=int, default=0,
+                        help="Run NER/sentiment/insights in this many processes with preloaded models")
+    parser.add_argument("--queue-size", type=int, default=64, help="Maximum items buffered between stages")
+    parser.add_argument("--model", default="gpt-3.5-turbo", help="OpenAI model used for summaries")
+    parser.add_argument("--backend", choices=("openai", "local", "auto"),
+                        help="LLM backend for summaries (default: SCOPEAI_LLM_BACKEND or openai)")
+    parser.add_argument("--compression-ratio", type=float, help="Extractively compress chunks to this token ratio")
+    parser.add_argument("--llm-topics", action="store_true",
+                        help="Classify topics with the LLM backend in batched requests instead of keyword matching")
+    parser.add_argument("--topic-batch-size", type=int, default=20, help="Summaries per topic classification request")
+    parser.add_argument("--trace", action="store_true", help="Attach per-item stage timings and token counts")
+    parser.add_argument("--metrics-file", help="Write aggregate metrics in Prometheus text format to this file")
+    parser.add_argument("--include-text", action="store_true", help="Include the extracted text in each result")
+    parser.add_argument("--index", help="Add entities and topics of each result to this SQLite corpus index")
+
+
+def _add_query_parser(subparsers):
+    parser = subparsers.add_parser("query", help="Query a corpus index built by 'run --index' or the app")
+    parser.add_argument("index", help="SQLite corpus index file")
+    parser.add_argument("--entity", action="append", default=[], help="Entity every document must mention (repeatable)")
+    parser.add_argument("--topic", action="append", default=[], help="Topic every document must have (repeatable)")
+    parser.add_argument("--since", help="Only documents indexed since this time (e.g. 7d, 12h or 2024-05-01)")
+    parser.add_argument("--until", help="Only documents indexed before this time")
+    parser.add_argument("--cooccur", metavar="TERM",
+                        help="Instead of listing documents, count the terms found together with this entity")
+    parser.add_argument("--cooccur-topic", metavar="TOPIC",
+                        help="Instead of listing documents, count the terms found together with this topic")
+    parser.add_argument("-k", "--limit", type=int, default=20, help="Maximum number of results")
+
+
+def _add_playlist_parser(subparsers):
+    parser = subparsers.add_parser("playlist", help="Download and transcribe every video of a YouTube playlist or channel")
+    parser.add_argument("url", help="Playlist, channel or video URL")
+    parser.add_argument("-o", "--output-dir", required=True, help="Directory for transcripts (<video id>.txt)")
+    parser.add_argument("--download-workers", type=int, default=4, help="Concurrent audio downloads")
+    parser.add_argument("--transcribe-workers", type=int, default=1,
+                        help="Concurrent transcriptions (each extra worker loads its own Whisper model)")
+    parser.add_argument("--max-pending", type=int, help="Maximum downloaded files waiting for transcription")
+    parser.add_argument("--whisper-model", default="tiny", help="Whisper model size")
+    parser.add_argument("--keep-audio", action="store_true", help="Keep downloaded audio files")
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """Parse a relative age like 7d/12h/30m or an ISO date into a Unix timestamp."""
+    if not value:
+        return None
+    units = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+    if value[-1:] in units and value[:-1].isdigit():
+        return time.time() - int(value[:-1]) * units[value[-1]]
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _run(args) -> int:
+    from .batch import BatchRunner, load_manifest
+
+    runner = BatchRunner(
+        output_path=args.output,
+        checkpoint_path=args.checkpoint,
+        workers={
+            "extract": args.extract_workers,
+            "summarize": args.summarize_workers,
+            "analyze": args.analyze_workers,
+            "insights": args.insight_workers,
+        },
+        queue_size=args.queue_size,
+        model=args.model,
+        compression_ratio=args.compression_ratio,
+        include_text=args.include_text,
+        nlp_processes=args.nlp_processes,
+        trace=args.trace,
+        metrics_path=args.metrics_file,
+        index_path=args.index,
+        backend=args.backend,
+        llm_topics=args.llm_topics,
+        topic_batch_size=args.topic_batch_size,
+    )
+    stats = runner.run(load_manifest(args.manifest))
+    print(json.dumps(stats, indent=2))
+    return 1 if stats["errors"] else 0
+
+
+def _query(args) -> int:
+    from .utils.corpus_index import CorpusIndex, ENTITY, TOPIC
+
+    index = CorpusIndex(args.index)
+    since, until = _parse_time(args.since), _parse_time(args.until)
+
+    if args.cooccur or args.cooccur_topic:
+        kind, value = (ENTITY, args.cooccur) if args.cooccur else (TOPIC, args.cooccur_topic)
+        for term_kind, term, count in index.co_occurrences(value, kind, since=since, until=until, k=args.limit):
+            print(f"{count}\t{term_kind}\t{term}")
+        return 0
+
+    for doc in index.search(args.entity, args.topic, since=since, until=until, limit=args.limit):
+        indexed_at = datetime.fromtimestamp(doc["indexed_at"]).isoformat(timespec="seconds")
+        print(f"{indexed_at}\t{doc['doc_key']}\t{doc['source'] or ''}")
+    return 0
+
+
+def _playlist(args) -> int:
+    from .parser.youtube_playlist import PlaylistIngester
+
+    ingester = PlaylistIngester(
+        output_dir=args.output_dir,
+        download_workers=args.download_workers,
+        transcribe_workers=args.transcribe_workers,
+        whisper_model_size=args.whisper_model,
+        max_pending=args.max_pending,
+        keep_audio=args.keep_audio,
+    )
+    stats = ingester.run(args.url)
+    stats["transcribed"] = len(stats["transcribed"])
+    print(json.dumps(stats, indent=2))
+    return 1 if stats["download"]["failed"] or stats["transcribe"]["failed"] else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Parse command-line arguments and run the selected command.
+
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="scopeai", description="ScopeAI headless pipeline runner")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable debug logging")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_run_parser(subparsers)
+    _add_query_parser(subparsers)
+    _add_playlist_parser(subparsers)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Pick up OPENAI_API_KEY from .env like the Streamlit app does
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    commands = {"run": _run, "query": _query, "playlist": _playlist}
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
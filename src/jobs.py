@@ -0,0 +1,385 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .utils.doc_store import DocumentStore
+from .utils.tracing import capture_telemetry, record_cache
+
+"""
+Local background job queue.
+Jobs are stored in SQLite and executed by a pool of worker processes, so long
+parse/summarize jobs never run in the Streamlit script thread. Identical
+in-flight requests (same coalescing key) share a single job. Extracted text
+can be written to a DocumentStore so only its id goes through the queue.
+The spans and metrics a worker records for a job are stored with it until the
+submitter takes them with take_telemetry.
+"""
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), "scopeai_jobs.sqlite3")
+DEFAULT_SPOOL_DIR = os.path.join(tempfile.gettempdir(), "scopeai_uploads")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    key TEXT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    partial TEXT,
+    result TEXT,
+    error TEXT,
+    telemetry TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_key_status ON jobs (key, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+
+def content_key(data: bytes) -> str:
+    """Return a SHA-256 hex digest used to coalesce jobs on identical uploads."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def spool_upload(data: bytes, directory: str = DEFAULT_SPOOL_DIR, suffix: str = "") -> str:
+    """
+    Write uploaded bytes to a content-addressed file that worker processes can read.
+
+    Submit the path with "spooled": True in the job payload so the job removes
+    the file once it has read it, and spool from a payload function passed to
+    JobQueue.submit so nothing is written when an existing job is reused.
+
+    Args:
+        data: File contents
+        directory: Directory to store the file in
+        suffix: File extension (e.g. ".pdf")
+
+    Returns:
+        Path to the stored file
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, content_key(data) + suffix)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path
+
+
+class JobQueue:
+    """SQLite-backed job queue shared between the UI and worker processes."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        """
+        Open (and if needed create) the job database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "telemetry" not in columns:
+                # Databases created before telemetry was stored with jobs
+                try:
+                    conn.execute("ALTER TABLE jobs ADD COLUMN telemetry TEXT")
+                except sqlite3.OperationalError:
+                    pass  # Added concurrently by another process
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def submit(self, kind: str, payload: Union[Dict[str, Any], Callable[[], Dict[str, Any]]],
+               key: Optional[str] = None, max_age: Optional[float] = None) -> str:
+        """
+        Submit a job, reusing an in-flight job with the same key if there is one.
+
+        Finished jobs are only reused when max_age is given, so callers that
+        need to follow a job across calls should keep its id and poll get().
+
+        Args:
+            kind: Job type, one of JOB_HANDLERS
+            payload: JSON-serializable job arguments, or a function returning them that is
+                only called when a new job is created (e.g. one that spools an upload)
+            key: Coalescing key such as a URL or file hash
+            max_age: Also reuse a job with the same key that completed successfully
+                within this many seconds
+
+        Returns:
+            The job id
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if key is not None:
+                    row = conn.execute(
+                        "SELECT id FROM jobs WHERE key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                        (key, QUEUED, RUNNING),
+                    ).fetchone()
+                    if row is None and max_age is not None:
+                        row = conn.execute(
+                            "SELECT id FROM jobs WHERE key = ? AND status = ? AND updated_at >= ? "
+                            "ORDER BY updated_at DESC LIMIT 1",
+                            (key, DONE, now - max_age),
+                        ).fetchone()
+                    record_cache("job_queue", row is not None)
+                    if row:
+                        conn.execute("COMMIT")
+                        return row["id"]
+
+                job_id = uuid.uuid4().hex
+                if callable(payload):
+                    payload = payload()
+                conn.execute(
+                    "INSERT INTO jobs (id, key, kind, payload, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, key, kind, json.dumps(payload), QUEUED, now, now),
+                )
+                conn.execute("COMMIT")
+                return job_id
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status and (partial) results of a job.
+
+        Args:
+            job_id: Id returned by submit
+
+        Returns:
+            Job dictionary, or None if the job doesn't exist
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        job.pop("telemetry", None)
+        for field in ("payload", "partial", "result"):
+            job[field] = json.loads(job[field]) if job[field] is not None else None
+        return job
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job and mark it as running."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, kind, payload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                         (RUNNING, time.time(), row["id"]))
+            conn.execute("COMMIT")
+        return {"id": row["id"], "kind": row["kind"], "payload": json.loads(row["payload"])}
+
+    def _update(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def report_partial(self, job_id: str, partial: Any):
+        """Store intermediate progress or results for a running job."""
+        self._update(job_id, partial=json.dumps(partial))
+
+    def complete(self, job_id: str, result: Any, telemetry: Optional[Dict[str, Any]] = None):
+        """Mark a job as done with its result and the telemetry its worker captured."""
+        self._update(job_id, status=DONE, result=json.dumps(result), telemetry=_dump_telemetry(telemetry))
+
+    def fail(self, job_id: str, error: str, telemetry: Optional[Dict[str, Any]] = None):
+        """Mark a job as failed."""
+        self._update(job_id, status=FAILED, error=error, telemetry=_dump_telemetry(telemetry))
+
+    def take_telemetry(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the spans, token counts and metrics recorded while a job ran.
+
+        Each job's telemetry is handed out once, so sessions sharing a job
+        don't count its work twice.
+
+        Args:
+            job_id: Id returned by submit
+
+        Returns:
+            Telemetry to pass to tracing.merge_telemetry, or None if there is
+            none (or it was already taken)
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT telemetry FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None and row["telemetry"] is not None:
+                conn.execute("UPDATE jobs SET telemetry = NULL WHERE id = ?", (job_id,))
+            conn.execute("COMMIT")
+        if row is None or row["telemetry"] is None:
+            return None
+        return json.loads(row["telemetry"])
+
+    def requeue_running(self) -> int:
+        """
+        Put jobs left running by workers that died back in the queue.
+
+        Only call this when no workers are alive.
+
+        Returns:
+            Number of jobs requeued
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                                  (QUEUED, time.time(), RUNNING))
+            return cursor.rowcount
+
+
+def _dump_telemetry(telemetry: Optional[Dict[str, Any]]) -> Optional[str]:
+    # Span attributes aren't guaranteed to be JSON types
+    return json.dumps(telemetry, default=str) if telemetry is not None else None
+
+
+def _parse_pdf(payload: Dict, report: Callable[[Any], None]) -> str:
+    from .parser.pdf_parser import extract_pdf_text
+    try:
+        with open(payload["path"], "rb") as f:
+            return extract_pdf_text(f)
+    finally:
+        # Uploads written by spool_upload are only needed by this job
+        if payload.get("spooled") and os.path.exists(payload["path"]):
+            os.remove(payload["path"])
+
+
+def _parse_youtube(payload: Dict, report: Callable[[Any], None]) -> str:
+    from .parser.youtube_parser import YouTubeParser
+
+    report({"stage": "loading model"})
+    parser = YouTubeParser(whisper_model_size=payload.get("whisper_model_size", "tiny"))
+    report({"stage": "downloading audio"})
+    audio_path = parser.download_audio(payload["url"])
+    try:
+        report({"stage": "transcribing"})
+        transcript = parser.transcribe_audio(audio_path).strip()
+    finally:
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+    return transcript if transcript else "❌ No transcript found."
+
+
+def _parse_news(payload: Dict, report: Callable[[Any], None]) -> str:
+    from .parser.news_parser import extract_news_content
+    return extract_news_content(payload["url"])
+
+
+def _summarize(payload: Dict, report: Callable[[Any], None]) -> str:
+    from .llm.backends import get_backend
+    report({"stage": "summarizing"})
+    llm = get_backend(payload.get("backend"), model=payload.get("model", "gpt-3.5-turbo"))
+    return llm.summarize(payload["text"], compression_ratio=payload.get("compression_ratio"))
+
+
+# Job kind -> handler(payload, report) returning a JSON-serializable result
+JOB_HANDLERS = {
+    "parse_pdf": _parse_pdf,
+    "parse_youtube": _parse_youtube,
+    "parse_news": _parse_news,
+    "summarize": _summarize,
+}
+
+
+def run_worker(db_path: str = DEFAULT_DB_PATH, poll_interval: float = 0.5, max_jobs: Optional[int] = None):
+    """
+    Worker loop: claim queued jobs and run them until stopped.
+
+    Args:
+        db_path: Path to the job database
+        poll_interval: Seconds to sleep when the queue is empty
+        max_jobs: Stop after this many jobs (None runs forever)
+    """
+    job_queue = JobQueue(db_path)
+    processed = 0
+
+    while max_jobs is None or processed < max_jobs:
+        job = job_queue.claim()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        job_id = job["id"]
+        # Spans and metrics recorded here would be lost with this process, so they go back with the job
+        outcome = capture_telemetry(_run_job, job_queue, job)
+        try:
+            if "error" in outcome:
+                raise outcome["error"]
+            job_queue.complete(job_id, outcome["result"], outcome["telemetry"])
+        except Exception as e:
+            logger.error(f"Job {job_id} ({job['kind']}) failed: {e}")
+            job_queue.fail(job_id, str(e), outcome["telemetry"])
+        processed += 1
+
+
+def _run_job(job_queue: JobQueue, job: Dict[str, Any]) -> Any:
+    job_id = job["id"]
+    result = JOB_HANDLERS[job["kind"]](job["payload"], lambda partial: job_queue.report_partial(job_id, partial))
+    # Keep large texts out of the job table when the submitter asked for a stored document
+    store_dir = job["payload"].get("store_dir")
+    if store_dir and isinstance(result, str):
+        result = {"doc_id": DocumentStore(store_dir).put(result)}
+    return result
+
+
+class JobWorkerPool:
+    """Pool of worker processes serving a JobQueue."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, num_workers: int = 2):
+        """
+        Args:
+            db_path: Path to the job database
+            num_workers: Number of worker processes
+        """
+        self.db_path = db_path
+        self.num_workers = num_workers
+        self.processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        """Start the worker processes, requeueing jobs orphaned by a previous pool."""
+        JobQueue(self.db_path).requeue_running()
+        # Spawn rather than fork so workers don't inherit the server's threads
+        ctx = multiprocessing.get_context("spawn")
+        for i in range(self.num_workers):
+            process = ctx.Process(target=run_worker, args=(self.db_path,), name=f"scopeai-job-worker-{i}", daemon=True)
+            process.start()
+            self.processes.append(process)
+
+    def stop(self):
+        """Terminate all worker processes."""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        self.processes = []
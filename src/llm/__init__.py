@@ -4,8 +4,15 @@
 # Empty file or just a simple version indicator
 __version__ = "0.1.0"
 
-# Import modules to make them available when importing the package
-from . import summarizer
-from . import ner_sentiment
-from . import insight_gen
-from . import answer_followup
\ No newline at end of file
+import importlib
+
+# Modules are imported lazily on first attribute access
+_SUBMODULES = ("summarizer", "ner_sentiment", "insight_gen", "answer_followup", "pipeline", "extractive", "nlp_pool", "answer_cache", "backends")
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_SUBMODULES))
@@ -0,0 +1,206 @@
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from ..utils.tracing import record_cache
+
+"""
+Semantic answer cache for follow-up questions.
+Answers are stored per document under the normalized question text. A new
+question that isn't stored verbatim reuses a cached answer when it shares
+enough content words with the cached question and asks the same kind of
+question: the same question words (who, when, ...) and the same negation.
+"""
+
+# Words that don't change what a question is asking about
+STOPWORDS = frozenset("""
+a an the this that these those is are was were be been being do does did doing
+can could should would will shall may might must of in on at to for from by with
+about into over under as and or it its they them their there here i me my we us
+our you your he she his her some any more most very just so than then also
+""".split())
+
+# Kept as terms, and must match exactly for a cached answer to be reused
+QUESTION_WORDS = frozenset("what which who whom whose why how when where".split())
+NEGATIONS = frozenset("not no never nor none nobody nothing neither without".split())
+
+_CONTRACTIONS = ((re.compile(r"\bwon't\b"), "will not"), (re.compile(r"\bcan't\b"), "can not"),
+                 (re.compile(r"\bcannot\b"), "can not"), (re.compile(r"n't\b"), " not"))
+
+
+def _stem(word: str) -> str:
+    """
+    Light suffix stripping so plurals and verb forms share a stem.
+
+    Every form is reduced the same way, e.g. price, prices, priced and pricing
+    all become "pric", and plan, plans, planned and planning all become "plan".
+    """
+    if len(word) <= 3 or word in QUESTION_WORDS or word in NEGATIONS:
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "zes", "ches", "shes")):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    elif word.endswith("ing") and len(word) > 5:
+        word = word[:-3]
+    elif word.endswith("ed") and len(word) > 4:
+        word = word[:-2]
+    # Planned -> plan, but keep call, miss, buzz
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "aeiouslz":
+        word = word[:-1]
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def _words(question: str):
+    text = question.lower().replace("\u2019", "'")
+    for pattern, replacement in _CONTRACTIONS:
+        text = pattern.sub(replacement, text)
+    return re.findall(r"\w+", text)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase a question and drop its punctuation, keeping every word in order."""
+    return " ".join(_words(question))
+
+
+def question_terms(question: str) -> FrozenSet[str]:
+    """
+    Reduce a question to its set of normalized content words.
+
+    Args:
+        question: The question text
+
+    Returns:
+        Frozen set of stemmed, lowercased words without stopwords; question
+        words and negations are kept as they are
+    """
+    words = _words(question)
+    terms = frozenset(_stem(w) for w in words if w not in STOPWORDS)
+    # Questions made only of stopwords still need something to compare
+    return terms or frozenset(words)
+
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Cosine similarity between two sets of terms."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / math.sqrt(len(a) * len(b))
+
+
+def same_intent(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """Return True if two term sets ask the same kind of question with the same negation."""
+    return a & QUESTION_WORDS == b & QUESTION_WORDS and bool(a & NEGATIONS) == bool(b & NEGATIONS)
+
+
+class SemanticAnswerCache:
+    """Per-document LRU cache of answers, matched by question similarity."""
+
+    def __init__(self, threshold: float = 0.8, max_documents: int = 256, max_answers_per_document: int = 64):
+        """
+        Args:
+            threshold: Minimum similarity for a cached question to count as a match
+            max_documents: Maximum number of documents kept before evicting the least recently used
+            max_answers_per_document: Maximum number of answers kept per document
+        """
+        self.threshold = threshold
+        self.max_documents = max_documents
+        self.max_answers_per_document = max_answers_per_document
+        # Per document: normalized question -> (terms, question, answer)
+        self._documents: "OrderedDict[str, OrderedDict[str, Tuple[FrozenSet[str], str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+
+    def lookup(self, doc_id: str, question: str) -> Optional[str]:
+        """
+        Find a cached answer for a question about a document.
+
+        Args:
+            doc_id: Document identifier (e.g. a content hash)
+            question: The question text
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        key = normalize_question(question)
+        terms = question_terms(question)
+        with self._lock:
+            answers = self._documents.get(doc_id)
+            result = None
+
+            if answers is not None:
+                self._documents.move_to_end(doc_id)
+                if key in answers:
+                    answers.move_to_end(key)
+                    result = answers[key][2]
+                    self._stats["exact_hits"] += 1
+                else:
+                    # Term overlap only picks candidates; the question words and negation must match too
+                    best_score, best_key = 0.0, None
+                    for cached_key, (cached_terms, _, _) in answers.items():
+                        score = similarity(terms, cached_terms)
+                        if score > best_score and same_intent(terms, cached_terms):
+                            best_score, best_key = score, cached_key
+                    if best_key is not None and best_score >= self.threshold:
+                        answers.move_to_end(best_key)
+                        result = answers[best_key][2]
+                        self._stats["semantic_hits"] += 1
+
+            if result is None:
+                self._stats["misses"] += 1
+
+        record_cache("followup_answers", result is not None)
+        return result
+
+    def store(self, doc_id: str, question: str, answer: str):
+        """
+        Cache an answer, evicting the least recently used entries when full.
+
+        Args:
+            doc_id: Document identifier
+            question: The question text
+            answer: The answer to cache
+        """
+        key = normalize_question(question)
+        terms = question_terms(question)
+        with self._lock:
+            answers = self._documents.get(doc_id)
+            if answers is None:
+                answers = self._documents[doc_id] = OrderedDict()
+            self._documents.move_to_end(doc_id)
+
+            answers[key] = (terms, question, answer)
+            answers.move_to_end(key)
+
+            while len(answers) > self.max_answers_per_document:
+                answers.popitem(last=False)
+                self._stats["evictions"] += 1
+            while len(self._documents) > self.max_documents:
+                _, evicted = self._documents.popitem(last=False)
+                self._stats["evictions"] += len(evicted)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get hit/miss statistics.
+
+        Returns:
+            Dictionary with hit counts, misses, evictions, entries and hit_rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["documents"] = len(self._documents)
+            stats["entries"] = sum(len(answers) for answers in self._documents.values())
+
+        lookups = stats["exact_hits"] + stats["semantic_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["exact_hits"] + stats["semantic_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._documents.clear()
@@ -1,32 +1,148 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .answer_cache import SemanticAnswerCache
+from .backends import AUTO, DEFAULT_BACKEND, OPENAI, get_backend
+from ..utils.tracing import traced
+
+"""
+Follow-up question answering.
+Answers are cached per document and reused for similarly worded questions, and
+all suggested questions for a document can be answered together in one
+batched request. Requests go through the LLM backend chosen per call.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Shared across sessions, so common questions about the same document skip the LLM
+ANSWER_CACHE = SemanticAnswerCache(
+    threshold=float(os.getenv("SCOPEAI_ANSWER_CACHE_THRESHOLD", "0.8")),
+    max_documents=int(os.getenv("SCOPEAI_ANSWER_CACHE_DOCUMENTS", "256")),
+)
+
+# Background threads for prefetching answers
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="followup-prefetch")
+
+
+def document_hash(text: str) -> str:
+    """Return a stable hash identifying a document's text (the same as its DocumentStore id)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _cache_key(doc_id: str, backend: Optional[str]) -> str:
+    # "auto" reads OpenAI answers, so local fallback answers never shadow them
+    backend = backend or DEFAULT_BACKEND
+    return f"{OPENAI if backend == AUTO else backend}:{doc_id}"
+
+
+def get_cached_answer(question: str, doc_id: str, backend: Optional[str] = None) -> Optional[str]:
+    """
+    Look up a previously generated answer to the same or a similar question.
+
+    Args:
+        question: The follow-up question
+        doc_id: Id of the document the question is about (its DocumentStore id or document_hash)
+        backend: Backend the answer should come from (defaults to SCOPEAI_LLM_BACKEND)
+
+    Returns:
+        The cached answer, or None if no similar question has been answered yet
+    """
+    return ANSWER_CACHE.lookup(_cache_key(doc_id, backend), question)
+
+
+def cache_answer(question: str, doc_id: str, answer: str, backend: Optional[str] = None):
+    """Store an answer, produced by backend, for later lookups by the same or similar questions."""
+    ANSWER_CACHE.store(_cache_key(doc_id, backend), question, answer)
+
+
 # First define the function
-def answer_followup_question(question: str, text: str) -> str:
-    """Generate answer to follow-up question using LLM"""
-    from openai import OpenAI
-    import os
-    
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
-    prompt = f"""
-    Based on the following text, answer the question.
-    
-    TEXT: {text}
-    
-    QUESTION: {question}
-    
-    Provide a concise, informative answer based only on information in the text.
-    If the text doesn't contain enough information to answer, say so.
-    """
-    
+@traced("llm.followup")
+def answer_followup_question(question: str, text: str, backend: Optional[str] = None,
+                             doc_id: Optional[str] = None) -> str:
+    """
+    Generate answer to follow-up question using LLM
+
+    Args:
+        question: The follow-up question
+        text: The document the question is about
+        backend: "openai", "local" or "auto" (defaults to SCOPEAI_LLM_BACKEND, else "openai")
+        doc_id: The document's id; hashed from text only when not given
+    """
+    doc_id = doc_id or document_hash(text)
+    cached = get_cached_answer(question, doc_id, backend=backend)
+    if cached is not None:
+        return cached
+
+    try:
+        llm = get_backend(backend)
+        answer = llm.answer(question, text)
+        cache_answer(question, doc_id, answer, backend=llm.served_by())
+        return answer
+    except Exception as e:
+        return f"Error generating answer: {str(e)}"
+
+
+@traced("llm.followup_batch")
+def answer_followup_questions(questions: List[str], text: str, backend: Optional[str] = None,
+                              doc_id: Optional[str] = None) -> Dict[str, str]:
+    """
+    Answer several follow-up questions about the same text in a single request.
+
+    Questions that already have a cached answer are not sent again. New
+    answers are added to the cache.
+
+    Args:
+        questions: Questions to answer
+        text: The document the questions are about
+        backend: "openai", "local" or "auto" (defaults to SCOPEAI_LLM_BACKEND, else "openai")
+        doc_id: The document's id; hashed from text only when not given
+
+    Returns:
+        Dictionary mapping each answered question to its answer. Questions the
+        model didn't answer (or all of them, if the request failed) are omitted.
+    """
+    doc_id = doc_id or document_hash(text)
+    answers = {}
+    pending = []
+    for question in questions:
+        cached = get_cached_answer(question, doc_id, backend=backend)
+        if cached is not None:
+            answers[question] = cached
+        elif question not in pending:
+            pending.append(question)
+
+    if not pending:
+        return answers
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that answers questions based on provided text."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=200,
-            temperature=0.3,
-        )
-        return response.choices[0].message.content
+        llm = get_backend(backend)
+        parsed = llm.answer_many(pending, text)
     except Exception as e:
-        return f"Error generating answer: {str(e)}"
\ No newline at end of file
+        logger.warning(f"Batched follow-up answering failed: {e}")
+        return answers
+
+    for index, answer in parsed.items():
+        cache_answer(pending[index], doc_id, answer, backend=llm.served_by())
+        answers[pending[index]] = answer
+
+    return answers
+
+
+def prefetch_answers(questions: List[str], text: str, backend: Optional[str] = None,
+                     doc_id: Optional[str] = None) -> Future:
+    """
+    Answer questions in the background with a single batched request.
+
+    Args:
+        questions: Questions to answer
+        text: The document the questions are about
+        backend: "openai", "local" or "auto" (defaults to SCOPEAI_LLM_BACKEND, else "openai")
+        doc_id: The document's id; hashed from text only when not given
+
+    Returns:
+        Future resolving to the answers dictionary from answer_followup_questions
+    """
+    return _PREFETCH_EXECUTOR.submit(answer_followup_questions, list(questions), text, backend, doc_id)
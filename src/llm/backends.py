@@ -0,0 +1,386 @@
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+from ..utils.helpers import count_tokens
+from ..utils.tracing import METRICS, record_usage, span
+
+"""
+Pluggable LLM backends.
+Summaries, follow-up answers and topic classification go through a backend
+chosen per request: "openai" calls the OpenAI API, "local" runs the CPU-only
+extractive engine in well under a second, and "auto" uses OpenAI but falls
+back to the local engine when the API is unavailable, failing or too slow.
+"""
+
+logger = logging.getLogger(__name__)
+
+OPENAI = "openai"
+LOCAL = "local"
+AUTO = "auto"
+BACKENDS = (OPENAI, LOCAL, AUTO)
+
+DEFAULT_BACKEND = os.getenv("SCOPEAI_LLM_BACKEND", OPENAI)
+# Seconds "auto" waits for each OpenAI request before answering locally
+DEFAULT_TIMEOUT = float(os.getenv("SCOPEAI_LLM_TIMEOUT", "60"))
+
+
+def _get_streamlit_secret(name):
+    """Read a value from Streamlit secrets, if Streamlit and the secret are available."""
+    try:
+        import streamlit as st
+        if hasattr(st, 'secrets') and name in st.secrets:
+            return st.secrets[name]
+    except Exception:
+        pass
+    return None
+
+
+def resolve_api_key(api_key: Optional[str] = None) -> Optional[str]:
+    """Return the given key, else OPENAI_API_KEY from the environment, else from Streamlit secrets."""
+    return api_key or os.getenv("OPENAI_API_KEY") or _get_streamlit_secret("OPENAI_API_KEY")
+
+
+# Start of one {"index": i, "topics": [...]} result of the topic prompt
+_TOPIC_ITEM = re.compile(r'\{\s*"index"')
+
+
+def _iter_topic_items(content: str):
+    """Yield the result objects of a topic reply, decoding them one by one if the whole reply isn't valid JSON."""
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    if match:
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and isinstance(data.get("results"), list):
+            yield from data["results"]
+            return
+
+    # A reply cut off at max_tokens still holds every result before the cut
+    decoder = json.JSONDecoder()
+    for item_match in _TOPIC_ITEM.finditer(content):
+        try:
+            item, _ = decoder.raw_decode(content, item_match.start())
+        except ValueError:
+            continue
+        yield item
+
+
+def _parse_topic_scores(content: str, count: int, labels: List[str]) -> List[Dict[str, float]]:
+    """
+    Parse the {"results": [{"index": i, "topics": [{"label": ..., "confidence": ...}]}]} JSON of the topic prompt.
+
+    Each result is checked on its own, so a malformed or truncated entry only
+    loses the scores of its own text.
+    """
+    scores = [{} for _ in range(count)]
+    canonical = {label.lower(): label for label in labels}
+    for item in _iter_topic_items(content or ""):
+        if not isinstance(item, dict):
+            continue
+        index = item.get("index")
+        if not isinstance(index, int) or not 0 <= index < count:
+            continue
+        topics = item.get("topics")
+        for topic in topics if isinstance(topics, list) else []:
+            if not isinstance(topic, dict):
+                continue
+            label = canonical.get(str(topic.get("label", "")).strip().lower())
+            confidence = topic.get("confidence")
+            # Labels outside the fixed set are dropped
+            if label and isinstance(confidence, (int, float)):
+                scores[index][label] = min(1.0, max(0.0, float(confidence)))
+    return scores
+
+
+def _parse_batch_answers(content: str, count: int) -> Dict[int, str]:
+    """Parse the {"answers": [{"index": i, "answer": "..."}]} JSON returned by the batch prompt."""
+    # Tolerate text around the JSON object
+    match = re.search(r"\{.*\}", content or "", re.DOTALL)
+    if not match:
+        return {}
+
+    data = json.loads(match.group(0))
+    answers = {}
+    for item in data.get("answers", []):
+        index = item.get("index")
+        answer = item.get("answer")
+        if isinstance(index, int) and 0 <= index < count and isinstance(answer, str) and answer.strip():
+            answers[index] = answer.strip()
+    return answers
+
+
+class LLMBackend:
+    """Interface shared by all backends."""
+
+    name = ""
+
+    def summarize(self, text: str, compression_ratio: Optional[float] = None) -> str:
+        """Summarize text."""
+        raise NotImplementedError
+
+    def answer(self, question: str, text: str) -> str:
+        """Answer a question about text."""
+        raise NotImplementedError
+
+    def answer_many(self, questions: List[str], text: str) -> Dict[int, str]:
+        """Answer several questions about the same text, keyed by question index."""
+        return {i: self.answer(question, text) for i, question in enumerate(questions)}
+
+    def classify_topics(self, texts: List[str], labels: List[str]) -> List[Dict[str, float]]:
+        """Score each text against a fixed label set, returning label -> confidence (0-1) per text."""
+        raise NotImplementedError
+
+    def served_by(self) -> str:
+        """Name of the backend that produced this thread's last result."""
+        return self.name
+
+
+class OpenAIBackend(LLMBackend):
+    """Backend calling the OpenAI chat completions API."""
+
+    name = OPENAI
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo",
+                 base_url: Optional[str] = None, timeout: Optional[float] = None, attempts: int = 3):
+        """
+        Args:
+            api_key: OpenAI API key (defaults to OPENAI_API_KEY or Streamlit secrets)
+            model: OpenAI model to use
+            base_url: Optional OpenAI-compatible API endpoint (e.g. a local stub server)
+            timeout: Timeout of each request in seconds (None uses the client default)
+            attempts: Attempts per chat request, with exponential backoff between them;
+                1 also turns off the client's own retries, so the first error is raised at once
+        """
+        api_key = resolve_api_key(api_key)
+        if not api_key:
+            raise ValueError("OpenAI API key not found. Please set it in .env or pass directly.")
+
+        from openai import OpenAI
+        client_kwargs = {"api_key": api_key, "base_url": base_url}
+        if timeout is not None:
+            client_kwargs["timeout"] = timeout
+        if attempts <= 1:
+            client_kwargs["max_retries"] = 0
+        self.client = OpenAI(**client_kwargs)
+        self.model = model
+        self.attempts = max(1, attempts)
+
+    def chat(self, messages: List[Dict[str, str]], max_tokens: int, stage: str, **kwargs) -> str:
+        """
+        Send a chat completion request, retrying up to the configured number of attempts.
+
+        Args:
+            messages: List of message dictionaries for the conversation
+            max_tokens: Maximum tokens to generate
+            stage: Stage name used for token accounting (e.g. "summarize")
+            **kwargs: Extra request parameters such as temperature or response_format
+
+        Returns:
+            The content of the first choice
+        """
+        if self.attempts == 1:
+            return self._chat(messages, max_tokens, stage, **kwargs)
+        retrying = retry(stop=stop_after_attempt(self.attempts), wait=wait_exponential(multiplier=1, min=4, max=10))
+        return retrying(self._chat)(messages, max_tokens, stage, **kwargs)
+
+    def _chat(self, messages: List[Dict[str, str]], max_tokens: int, stage: str, **kwargs) -> str:
+        with span("llm.openai", model=self.model):
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                **kwargs,
+            )
+        record_usage(stage, response, messages, self.model)
+        return response.choices[0].message.content
+
+    def summarize(self, text: str, compression_ratio: Optional[float] = None) -> str:
+        from .summarizer import TextSummarizer
+        summarizer = TextSummarizer(model=self.model, compression_ratio=compression_ratio, backend=self)
+        return summarizer.summarize(text)
+
+    def answer(self, question: str, text: str) -> str:
+        prompt = f"""
+    Based on the following text, answer the question.
+
+    TEXT: {text}
+
+    QUESTION: {question}
+
+    Provide a concise, informative answer based only on information in the text.
+    If the text doesn't contain enough information to answer, say so.
+    """
+
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant that answers questions based on provided text."},
+            {"role": "user", "content": prompt}
+        ]
+        return self.chat(messages, max_tokens=200, stage="followup", temperature=0.3)
+
+    def answer_many(self, questions: List[str], text: str) -> Dict[int, str]:
+        """Answer all questions in a single JSON-mode request; unanswered questions are omitted."""
+        numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions))
+        prompt = f"""
+    Based on the following text, answer each of the numbered questions.
+
+    TEXT: {text}
+
+    QUESTIONS:
+    {numbered}
+
+    Provide a concise, informative answer to each question based only on information in the text.
+    If the text doesn't contain enough information to answer a question, say so.
+    Respond with JSON only, in the form {{"answers": [{{"index": 0, "answer": "..."}}]}}.
+    """
+
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant that answers questions based on provided text. You always respond with valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
+        content = self.chat(messages, max_tokens=200 * len(questions), stage="followup", temperature=0.3,
+                            response_format={"type": "json_object"})
+        return _parse_batch_answers(content, len(questions))
+
+    def classify_topics(self, texts: List[str], labels: List[str]) -> List[Dict[str, float]]:
+        """Classify all texts in a single JSON-mode request; texts the model skipped get no scores."""
+        documents = "\n\n".join(f"[{i}] {text}" for i, text in enumerate(texts))
+        prompt = f"""
+    Classify each of the numbered documents into zero or more of these topics: {", ".join(labels)}.
+
+    DOCUMENTS:
+    {documents}
+
+    Use only the listed topics. Give each assigned topic a confidence between 0 and 1.
+    Respond with JSON only, in the form
+    {{"results": [{{"index": 0, "topics": [{{"label": "{labels[0]}", "confidence": 0.9}}]}}]}}.
+    """
+
+        messages = [
+            {"role": "system", "content": "You are a precise document classifier. You always respond with valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
+        # About 15 tokens per scored label, plus the index and brackets of each result
+        content = self.chat(messages, max_tokens=50 + len(texts) * (10 + 15 * len(labels)), stage="topics",
+                            temperature=0, response_format={"type": "json_object"})
+        return _parse_topic_scores(content, len(texts), labels)
+
+
+class LocalBackend(LLMBackend):
+    """CPU-only extractive backend; needs no network or API key."""
+
+    name = LOCAL
+
+    def __init__(self, summary_tokens: int = 300, answer_sentences: int = 3, model: str = "gpt-3.5-turbo"):
+        """
+        Args:
+            summary_tokens: Approximate summary length in tokens
+            answer_sentences: Maximum number of sentences in an answer
+            model: Model name used for token counting
+        """
+        self.summary_tokens = summary_tokens
+        self.answer_sentences = answer_sentences
+        self.model = model
+
+    def summarize(self, text: str, compression_ratio: Optional[float] = None) -> str:
+        """Summarize text in about summary_tokens, or less if compression_ratio of the text's tokens is smaller."""
+        from .extractive import summarize_extractive
+        max_tokens = self.summary_tokens
+        if compression_ratio:
+            max_tokens = min(max_tokens, max(1, int(count_tokens(text, self.model) * compression_ratio)))
+        with span("llm.local.summarize"):
+            return summarize_extractive(text, max_tokens=max_tokens, model=self.model)
+
+    def answer(self, question: str, text: str) -> str:
+        from .extractive import answer_extractive
+        with span("llm.local.answer"):
+            return answer_extractive(question, text, max_sentences=self.answer_sentences)
+
+    def classify_topics(self, texts: List[str], labels: List[str]) -> List[Dict[str, float]]:
+        from .insight_gen import keyword_topics
+        return [{topic: 1.0 for topic in keyword_topics(text) if topic in labels} for text in texts]
+
+
+class FallbackBackend(LLMBackend):
+    """Use a primary backend, falling back to another one on errors or timeouts."""
+
+    name = AUTO
+
+    def __init__(self, primary: Optional[LLMBackend], fallback: LLMBackend):
+        """
+        Args:
+            primary: Preferred backend, or None if it is unavailable (e.g. no API key). It is
+                called in the caller's thread, so it must time out its own requests and
+                should not retry them
+            fallback: Backend used when the primary raises, including on a request timeout
+        """
+        self.primary = primary
+        self.fallback = fallback
+        self._local = threading.local()
+
+    def _call(self, method: str, *args):
+        if self.primary is not None:
+            try:
+                result = getattr(self.primary, method)(*args)
+                self._local.served_by = self.primary.name
+                return result
+            except Exception as e:
+                logger.warning(f"{self.primary.name} {method} failed ({e}), using {self.fallback.name}")
+            METRICS.inc("scopeai_llm_fallbacks_total", help_text="Requests answered by the fallback backend",
+                        method=method)
+
+        self._local.served_by = self.fallback.name
+        return getattr(self.fallback, method)(*args)
+
+    def summarize(self, text: str, compression_ratio: Optional[float] = None) -> str:
+        return self._call("summarize", text, compression_ratio)
+
+    def answer(self, question: str, text: str) -> str:
+        return self._call("answer", question, text)
+
+    def answer_many(self, questions: List[str], text: str) -> Dict[int, str]:
+        return self._call("answer_many", questions, text)
+
+    def classify_topics(self, texts: List[str], labels: List[str]) -> List[Dict[str, float]]:
+        return self._call("classify_topics", texts, labels)
+
+    def served_by(self) -> str:
+        return getattr(self._local, "served_by", self.name)
+
+
+def get_backend(name: Optional[str] = None, model: str = "gpt-3.5-turbo", **kwargs) -> LLMBackend:
+    """
+    Create the backend for a request.
+
+    Args:
+        name: "openai", "local" or "auto" (defaults to SCOPEAI_LLM_BACKEND, else "openai")
+        model: OpenAI model used by the openai and auto backends
+        **kwargs: Extra OpenAIBackend arguments such as api_key, base_url, timeout or attempts
+
+    Returns:
+        The backend
+
+    Raises:
+        ValueError: For an unknown backend name, or "openai" without an API key
+    """
+    name = name or DEFAULT_BACKEND
+    if name == OPENAI:
+        return OpenAIBackend(model=model, **kwargs)
+    if name == LOCAL:
+        return LocalBackend(model=model)
+    if name == AUTO:
+        try:
+            # Fail fast by default: each request times out on its own and isn't retried before falling back
+            kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+            kwargs.setdefault("attempts", 1)
+            primary = OpenAIBackend(model=model, **kwargs)
+        except ValueError:
+            primary = None
+        return FallbackBackend(primary, LocalBackend(model=model))
+    raise ValueError(f"Unknown LLM backend: {name!r} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,213 @@
+import re
+from typing import List, NamedTuple, Optional
+import numpy as np
+
+from ..utils.helpers import count_tokens, iter_chunks
+from .answer_cache import question_terms
+
+"""
+Local extractive compression.
+Scores sentences with TF-IDF weighted TextRank so that only the most
+informative ones are sent to the LLM, or returned directly as a fully local
+summary or answer.
+"""
+
+# Sentence boundaries: terminal punctuation followed by whitespace, or line breaks
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+|\n+')
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+# Spoken-word disfluencies common in transcripts
+FILLER_PATTERN = re.compile(r'\b(?:um+|uh+|erm+|hmm+|you know|i mean)\b[,.]?\s*', re.IGNORECASE)
+
+NO_ANSWER = "The text doesn't contain enough information to answer this question."
+
+
+class CompressionResult(NamedTuple):
+    """Compressed text together with a report of how much was kept."""
+    text: str
+    original_tokens: int
+    kept_tokens: int
+    total_sentences: int
+    kept_sentences: int
+
+    @property
+    def kept_ratio(self) -> float:
+        return self.kept_tokens / self.original_tokens if self.original_tokens else 1.0
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences, dropping filler words and empty fragments.
+
+    Args:
+        text: The input text
+
+    Returns:
+        List of sentences in document order
+    """
+    text = FILLER_PATTERN.sub('', text)
+    return [s.strip() for s in SENTENCE_SPLIT_PATTERN.split(text) if s and s.strip()]
+
+
+def score_sentences(sentences: List[str], damping: float = 0.85, iterations: int = 30) -> np.ndarray:
+    """
+    Score sentences by TextRank over their TF-IDF cosine similarity graph.
+
+    Args:
+        sentences: Sentences to score
+        damping: TextRank damping factor
+        iterations: Number of power iterations
+
+    Returns:
+        Array of scores, one per sentence
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+
+    # Build the term-frequency matrix
+    vocabulary = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for word in WORD_PATTERN.findall(sentence.lower()):
+            rows.append(i)
+            cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    if not vocabulary:
+        return np.full(n, 1.0 / n)
+
+    tf = np.zeros((n, len(vocabulary)))
+    np.add.at(tf, (rows, cols), 1.0)
+
+    # Weight by inverse document frequency and normalize rows
+    df = np.count_nonzero(tf, axis=0)
+    tfidf = tf * (np.log((1 + n) / (1 + df)) + 1.0)
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    tfidf = np.divide(tfidf, norms, out=np.zeros_like(tfidf), where=norms > 0)
+
+    # Sentence similarity graph without self-loops
+    similarity = tfidf @ tfidf.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1.0 / n), where=row_sums > 0)
+
+    # Power iteration
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        scores = (1 - damping) / n + damping * (transition.T @ scores)
+
+    return scores
+
+
+def compress_text(text: str, ratio: float = 0.5, min_sentences: int = 3, model: str = "gpt-3.5-turbo",
+                  budget_tokens: Optional[int] = None) -> CompressionResult:
+    """
+    Keep the most informative sentences of text within a target token ratio.
+
+    Exact repeated sentences (boilerplate, repeated catchphrases) are dropped
+    before scoring. Selected sentences are returned in their original order.
+
+    Args:
+        text: The input text to compress
+        ratio: Target fraction of tokens to keep (0 < ratio <= 1)
+        min_sentences: Texts with this many sentences or fewer are returned unchanged
+        model: The model name to use for token counting
+        budget_tokens: Absolute number of tokens to keep; overrides ratio when given
+
+    Returns:
+        CompressionResult with the compressed text and a report of what was kept
+    """
+    original_tokens = count_tokens(text, model)
+    sentences = split_sentences(text)
+    if budget_tokens is not None:
+        ratio = budget_tokens / original_tokens if original_tokens else 1.0
+
+    if ratio >= 1.0 or len(sentences) <= min_sentences:
+        return CompressionResult(text, original_tokens, original_tokens, len(sentences), len(sentences))
+
+    # Drop exact repeats, keeping the first occurrence
+    seen = set()
+    unique_sentences = []
+    for sentence in sentences:
+        key = ' '.join(WORD_PATTERN.findall(sentence.lower()))
+        if key and key not in seen:
+            seen.add(key)
+            unique_sentences.append(sentence)
+
+    scores = score_sentences(unique_sentences)
+    sentence_tokens = [count_tokens(s, model) for s in unique_sentences]
+    budget = max(1, int(original_tokens * ratio))
+
+    # Greedily take the best sentences until the budget is used
+    selected = []
+    kept_tokens = 0
+    for idx in np.argsort(-scores, kind="stable"):
+        if selected and kept_tokens + sentence_tokens[idx] > budget:
+            continue
+        selected.append(idx)
+        kept_tokens += sentence_tokens[idx]
+
+    selected.sort()
+    compressed = ' '.join(unique_sentences[idx] for idx in selected)
+
+    return CompressionResult(compressed, original_tokens, kept_tokens, len(sentences), len(selected))
+
+
+def summarize_extractive(text: str, max_tokens: int = 300, chunk_chars: int = 20000,
+                         model: str = "gpt-3.5-turbo") -> str:
+    """
+    Summarize text locally by keeping its most central sentences.
+
+    Long texts are reduced chunk by chunk first, since the sentence similarity
+    graph grows quadratically with the number of sentences.
+
+    Args:
+        text: The input text
+        max_tokens: Approximate length of the summary in tokens
+        chunk_chars: Texts longer than this are reduced in chunks of this size
+        model: The model name to use for token counting
+
+    Returns:
+        The extractive summary
+    """
+    while len(text) > chunk_chars:
+        chunks = list(iter_chunks(text, chunk_size=chunk_chars, overlap=0))
+        # Keep about twice the final budget across all chunks for the last pass to choose from
+        per_chunk = max(1, 2 * max_tokens // len(chunks))
+        reduced = " ".join(compress_text(chunk, budget_tokens=per_chunk, min_sentences=1, model=model).text
+                           for chunk in chunks)
+        if len(reduced) >= len(text):
+            break
+        text = reduced
+
+    return compress_text(text, budget_tokens=max_tokens, model=model).text
+
+
+def answer_extractive(question: str, text: str, max_sentences: int = 3) -> str:
+    """
+    Answer a question locally with the sentences that best match its content words.
+
+    Args:
+        question: The question
+        text: The text to answer from
+        max_sentences: Maximum number of sentences in the answer
+
+    Returns:
+        The matching sentences in document order, or a note that the text has no answer
+    """
+    terms = list(question_terms(question))
+    sentences = split_sentences(text)
+    if not terms or not sentences:
+        return NO_ANSWER
+
+    # Presence matrix of question terms in each sentence, weighted by IDF
+    sentence_terms = [question_terms(sentence) for sentence in sentences]
+    present = np.array([[term in st for term in terms] for st in sentence_terms], dtype=float)
+    df = present.sum(axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+    lengths = np.array([len(st) for st in sentence_terms], dtype=float)
+    scores = (present @ idf) / np.log(2.0 + lengths)
+
+    best = [idx for idx in np.argsort(-scores, kind="stable")[:max_sentences] if scores[idx] > 0]
+    if not best:
+        return NO_ANSWER
+    return " ".join(sentences[idx] for idx in sorted(best))
@@ -1,7 +1,38 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import hashlib
+import logging
+import queue
 import re
-import spacy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 
+from ..utils.tracing import propagate, record_cache, span, traced
+
+logger = logging.getLogger(__name__)
+
+# Global spaCy model cache
+_SPACY_MODELS = {}
+
+def get_spacy_model(name: str = "en_core_web_sm"):
+    """
+    Load a spaCy pipeline once per process and reuse it.
+    
+    Args:
+        name: Name of the spaCy model package
+        
+    Returns:
+        The loaded spaCy Language object
+    """
+    record_cache("spacy_model", name in _SPACY_MODELS)
+    if name not in _SPACY_MODELS:
+        import spacy
+        with span("nlp.spacy.load_model", model=name):
+            _SPACY_MODELS[name] = spacy.load(name)
+    return _SPACY_MODELS[name]
+
+@traced("nlp.insights")
 def generate_insights(summarized_text: str, use_gpt_for_topics: bool = False) -> Dict:
     """
     Generate insights from summarized text including follow-up questions and topic classification.
@@ -27,9 +58,10 @@ def generate_insights(summarized_text: str, use_gpt_for_topics: bool = False) ->
 def generate_followup_questions(text: str) -> List[str]:
     """Generate better follow-up questions using spaCy NLP"""
     
-    # Load spaCy model
-    nlp = spacy.load("en_core_web_sm")
-    doc = nlp(text)
+    # Load spaCy model (cached after the first call)
+    nlp = get_spacy_model()
+    with span("nlp.spacy.parse"):
+        doc = nlp(text)
     
     questions = []
     
@@ -92,38 +124,32 @@ def generate_followup_questions(text: str) -> List[str]:
         
     return questions[:5]  # Return at most 5 questions
 
-def classify_topics(text: str, use_gpt: bool = False) -> List[str]:
+# Fixed topic labels and the keywords used to match them locally
+TOPIC_KEYWORDS = {
+    "Finance": ["money", "financial", "budget", "cost", "profit", "revenue", "investment"],
+    "Technology": ["software", "hardware", "tech", "algorithm", "data", "digital", "computer"],
+    "Healthcare": ["health", "medical", "patient", "doctor", "hospital", "treatment", "care"],
+    "Education": ["school", "student", "learn", "teach", "education", "academic", "university"],
+    "Business": ["company", "business", "market", "strategy", "customer", "product", "service"],
+    "Politics": ["government", "policy", "political", "law", "regulation", "election", "vote"]
+}
+
+def keyword_topics(text: str) -> List[str]:
     """
-    Classify the topics present in the summarized text.
+    Classify topics by keyword matching.
     
     Args:
         text: The summarized text
-        use_gpt: Whether to use GPT for classification (otherwise use keyword matching)
         
     Returns:
-        List of identified topics
+        Labels from TOPIC_KEYWORDS with at least one keyword in the text
     """
-    if use_gpt:
-        # In a real implementation, you would call a GPT model here
-        # For now, we'll return a placeholder
-        return ["GPT topic classification not implemented"]
-    
-    # Simple keyword-based topic classification
-    topic_keywords = {
-        "Finance": ["money", "financial", "budget", "cost", "profit", "revenue", "investment"],
-        "Technology": ["software", "hardware", "tech", "algorithm", "data", "digital", "computer"],
-        "Healthcare": ["health", "medical", "patient", "doctor", "hospital", "treatment", "care"],
-        "Education": ["school", "student", "learn", "teach", "education", "academic", "university"],
-        "Business": ["company", "business", "market", "strategy", "customer", "product", "service"],
-        "Politics": ["government", "policy", "political", "law", "regulation", "election", "vote"]
-    }
-    
     identified_topics = []
     
     # Convert text to lowercase for case-insensitive matching
     text_lower = text.lower()
     
-    for topic, keywords in topic_keywords.items():
+    for topic, keywords in TOPIC_KEYWORDS.items():
         for keyword in keywords:
             if keyword.lower() in text_lower:
                 identified_topics.append(topic)
@@ -131,6 +157,210 @@ def classify_topics(text: str, use_gpt: bool = False) -> List[str]:
     
     return identified_topics
 
+# Labels scored at least this confident are kept; if none are, keyword matching is used instead
+TOPIC_CONFIDENCE_THRESHOLD = 0.5
+# Maximum summaries packed into one classification request, and their total size
+TOPIC_BATCH_SIZE = 20
+MAX_TOPIC_BATCH_CHARS = 24000
+# Maximum concurrent classification requests
+TOPIC_REQUEST_WORKERS = 4
+
+MAX_CACHED_TOPICS = 4096
+_TOPIC_CACHE = OrderedDict()
+_TOPIC_CACHE_LOCK = threading.Lock()
+
+def _topic_cache_key(text: str, backend: str) -> str:
+    return f"{backend}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+def _group_topic_batches(keys: List[str], texts: Dict[str, str], batch_size: int) -> List[List[str]]:
+    """Group texts into batches limited by count and total characters."""
+    batches = []
+    current, current_chars = [], 0
+    for key in keys:
+        size = len(texts[key])
+        if current and (len(current) >= batch_size or current_chars + size > MAX_TOPIC_BATCH_CHARS):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(key)
+        current_chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+@traced("nlp.topics_batch")
+def classify_topics_batch(texts: List[str], backend: Optional[str] = None,
+                          threshold: float = TOPIC_CONFIDENCE_THRESHOLD,
+                          batch_size: int = TOPIC_BATCH_SIZE) -> List[List[str]]:
+    """
+    Classify many summaries against the fixed TOPIC_KEYWORDS labels with as few LLM requests as possible.
+    
+    Scores are cached by summary hash, so repeated summaries are never sent
+    twice once they have been scored. Uncached summaries are packed into batched structured-output
+    requests. A summary with no label at or above threshold (or whose request
+    failed) falls back to keyword matching.
+    
+    Args:
+        texts: Summaries to classify
+        backend: "openai", "local" or "auto" (defaults to SCOPEAI_LLM_BACKEND, else "openai")
+        threshold: Minimum confidence for a label to be kept
+        batch_size: Maximum summaries per request
+        
+    Returns:
+        List of topic lists, one per input text, most confident first
+    """
+    from .backends import AUTO, DEFAULT_BACKEND, LOCAL, OPENAI, get_backend
+    
+    backend = backend or DEFAULT_BACKEND
+    # "auto" shares OpenAI's cache entries, and local fallback scores are not cached under it
+    namespace = OPENAI if backend == AUTO else backend
+    labels = list(TOPIC_KEYWORDS)
+    
+    scores: Dict[str, Dict[str, float]] = {}
+    pending: Dict[str, str] = {}
+    keys = []
+    for text in texts:
+        key = _topic_cache_key(text, namespace)
+        keys.append(key)
+        if key in scores or key in pending:
+            continue
+        with _TOPIC_CACHE_LOCK:
+            cached = _TOPIC_CACHE.get(key)
+            if cached is not None:
+                _TOPIC_CACHE.move_to_end(key)
+        record_cache("topic_labels", cached is not None)
+        if cached is not None:
+            scores[key] = cached
+        else:
+            pending[key] = text
+    
+    if pending:
+        try:
+            llm = get_backend(backend)
+        except ValueError as e:
+            # e.g. no API key: every summary falls back to keyword matching
+            logger.warning(f"Topic classification backend unavailable: {e}")
+            llm = None
+        
+        def run(batch_keys: List[str]) -> Tuple[List[Dict[str, float]], bool]:
+            if llm is None:
+                return [{} for _ in batch_keys], False
+            try:
+                batch_scores = llm.classify_topics([pending[key] for key in batch_keys], labels)
+            except Exception as e:
+                logger.warning(f"Topic classification of {len(batch_keys)} summaries failed: {e}")
+                return [{} for _ in batch_keys], False
+            return batch_scores, namespace == LOCAL or llm.served_by() != LOCAL
+        
+        batches = _group_topic_batches(list(pending), pending, max(1, batch_size))
+        with ThreadPoolExecutor(max_workers=min(TOPIC_REQUEST_WORKERS, len(batches))) as executor:
+            for batch_keys, (batch_scores, cacheable) in zip(batches, executor.map(propagate(run), batches)):
+                for key, text_scores in zip(batch_keys, batch_scores):
+                    scores[key] = text_scores
+                    # An empty result may just be a summary the model skipped, so it is asked again next time
+                    if cacheable and text_scores:
+                        with _TOPIC_CACHE_LOCK:
+                            _TOPIC_CACHE[key] = text_scores
+                            while len(_TOPIC_CACHE) > MAX_CACHED_TOPICS:
+                                _TOPIC_CACHE.popitem(last=False)
+    
+    results = []
+    for text, key in zip(texts, keys):
+        confident = sorted((label for label, confidence in scores[key].items() if confidence >= threshold),
+                           key=lambda label: -scores[key][label])
+        results.append(confident or keyword_topics(text))
+    return results
+
+class TopicBatcher:
+    """
+    Collect topic classification calls from many threads into batched requests.
+    
+    Each call blocks until its batch is classified. A batch is sent once it
+    holds batch_size summaries or max_wait seconds after its first one arrived.
+    After close(), calls classify their summary on their own.
+    """
+    
+    def __init__(self, backend: Optional[str] = None, batch_size: int = TOPIC_BATCH_SIZE,
+                 max_wait: float = 0.5, threshold: float = TOPIC_CONFIDENCE_THRESHOLD):
+        """
+        Args:
+            backend: "openai", "local" or "auto" (defaults to SCOPEAI_LLM_BACKEND, else "openai")
+            batch_size: Maximum summaries per request
+            max_wait: Seconds to wait for a batch to fill up
+            threshold: Minimum confidence for a label to be kept
+        """
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.threshold = threshold
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="topic-batcher", daemon=True)
+        self._thread.start()
+    
+    def classify(self, text: str) -> List[str]:
+        """Classify one summary as part of the next batch."""
+        future = Future()
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._queue.put((text, future))
+        if closed:
+            # The batching thread has stopped, so nothing would ever answer a queued call
+            return classify_topics_batch([text], backend=self.backend, threshold=self.threshold)[0]
+        return future.result()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # Stop after this batch
+                    break
+                batch.append(item)
+            
+            try:
+                results = classify_topics_batch([text for text, _ in batch], backend=self.backend,
+                                                threshold=self.threshold, batch_size=self.batch_size)
+                for (_, future), topics in zip(batch, results):
+                    future.set_result(topics)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+    
+    def close(self):
+        """Send any waiting batch and stop the background thread."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._thread.join()
+
+def classify_topics(text: str, use_gpt: bool = False, backend: Optional[str] = None) -> List[str]:
+    """
+    Classify the topics present in the summarized text.
+    
+    Args:
+        text: The summarized text
+        use_gpt: Whether to classify through the LLM backend (otherwise use keyword matching)
+        backend: "openai", "local" or "auto" (defaults to SCOPEAI_LLM_BACKEND, else "openai")
+        
+    Returns:
+        List of identified topics
+    """
+    if use_gpt:
+        return classify_topics_batch([text], backend=backend)[0]
+    
+    return keyword_topics(text)
+
 if __name__ == "__main__":
     # Example usage
     sample_text = "The company announced a new AI product yesterday. Their CEO explained that this technology would revolutionize customer service automation. Early market reactions have been positive."
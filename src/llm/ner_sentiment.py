@@ -1,12 +1,30 @@
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import re
 
+from ..utils.tracing import record_cache, span, traced
+
 """
 Named Entity Recognition and Sentiment Analysis module.
 Uses TextBlob for basic NER and TextBlob/VADER for sentiment scoring.
+TextBlob and VADER are imported on first use to keep module import cheap.
 """
 
+# Shared VADER analyzer (loading its lexicon is the expensive part)
+_VADER_ANALYZER = None
+
+def get_vader_analyzer():
+    """
+    Get the shared VADER analyzer, creating it on first use.
+    
+    Returns:
+        SentimentIntensityAnalyzer instance
+    """
+    global _VADER_ANALYZER
+    record_cache("vader_analyzer", _VADER_ANALYZER is not None)
+    if _VADER_ANALYZER is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _VADER_ANALYZER = SentimentIntensityAnalyzer()
+    return _VADER_ANALYZER
+
 def extract_entities_with_textblob(text):
     """
     Extract named entities from text using TextBlob.
@@ -18,6 +36,7 @@ def extract_entities_with_textblob(text):
     Returns:
         dict: Dictionary with entity types as keys and lists of entities as values
     """
+    from textblob import TextBlob
     blob = TextBlob(text)
     entities = {
         "PERSON": [],
@@ -62,6 +81,7 @@ def get_textblob_sentiment(text):
     Returns:
         dict: Dictionary with polarity and subjectivity scores
     """
+    from textblob import TextBlob
     blob = TextBlob(text)
     return {
         "polarity": blob.sentiment.polarity,  # Range: -1.0 to 1.0 (negative to positive)
@@ -78,10 +98,11 @@ def get_vader_sentiment(text):
     Returns:
         dict: Dictionary with negative, neutral, positive, and compound scores
     """
-    analyzer = SentimentIntensityAnalyzer()
+    analyzer = get_vader_analyzer()
     scores = analyzer.polarity_scores(text)
     return scores
 
+@traced("nlp.analyze")
 def analyze_text(text):
     """
     Perform both NER and sentiment analysis on input text.
@@ -92,12 +113,17 @@ def analyze_text(text):
     Returns:
         dict: Dictionary containing entities and sentiment scores
     """
-    result = {
-        "entities": extract_entities_with_textblob(text),
-        "sentiment": {
+    with span("nlp.entities"):
+        entities = extract_entities_with_textblob(text)
+    with span("nlp.sentiment"):
+        sentiment = {
             "textblob": get_textblob_sentiment(text),
             "vader": get_vader_sentiment(text)
         }
+    
+    result = {
+        "entities": entities,
+        "sentiment": sentiment
     }
     return result
 
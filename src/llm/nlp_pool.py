@@ -0,0 +1,181 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Union
+
+from .ner_sentiment import analyze_text, get_vader_analyzer
+from .insight_gen import generate_insights, get_spacy_model
+from ..utils.tracing import capture_telemetry, current_trace, unwrap_telemetry
+
+"""
+Process pool for the CPU-bound NLP stages.
+Each worker process loads spaCy, TextBlob and VADER once at startup, so
+entity, sentiment and question extraction scale with cores instead of
+serializing on the GIL of the server process. Spans and metrics recorded in
+the workers are sent back with each result and merged into the caller's
+trace and metrics.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Seconds warm_up waits for every worker to start and load its models
+WARM_UP_TIMEOUT = 300
+
+# Shared by all workers of a pool; warm_up pings meet here, one per process
+_WARM_UP_BARRIER = None
+
+
+def _init_worker(barrier=None):
+    """Preload the NLP models in a freshly started worker process."""
+    global _WARM_UP_BARRIER
+    _WARM_UP_BARRIER = barrier
+
+    from textblob import TextBlob
+
+    get_spacy_model()
+    get_vader_analyzer()
+    # Trigger TextBlob's lazy tagger and noun phrase extractor loading
+    TextBlob("Warm up the models.").noun_phrases
+
+
+def _ping() -> int:
+    # A worker holding a ping can't take another, so every process has to answer
+    # one, which it only does after its initializer has loaded the models
+    if _WARM_UP_BARRIER is not None:
+        _WARM_UP_BARRIER.wait(WARM_UP_TIMEOUT)
+    return os.getpid()
+
+
+def _analyze_document(doc: Dict) -> Dict:
+    """Run NER, sentiment and insight generation for a single document."""
+    result = analyze_text(doc["text"])
+    result.update(generate_insights(doc.get("summary") or doc["text"]))
+    return result
+
+
+def _analyze_batch(docs: List[Dict]) -> List[Dict]:
+    return [_analyze_document(doc) for doc in docs]
+
+
+def default_num_workers() -> int:
+    """Number of warm workers, from SCOPEAI_NLP_WORKERS or the CPU count."""
+    return int(os.getenv("SCOPEAI_NLP_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+
+
+class NLPWorkerPool:
+    """
+    Pool of worker processes with the NLP models preloaded.
+
+    If a worker process dies, the tasks it was running fail with
+    BrokenProcessPool and the next submission starts a fresh set of workers.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, warm: bool = True):
+        """
+        Start the worker processes.
+
+        Args:
+            num_workers: Number of worker processes (defaults to default_num_workers())
+            warm: Whether to start every worker and load its models immediately
+        """
+        self.num_workers = num_workers or default_num_workers()
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        if warm:
+            self.warm_up()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Spawn rather than fork so workers don't inherit the server's threads
+        ctx = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(ctx.Barrier(self.num_workers),),
+        )
+
+    def _submit_to_workers(self, fn, *args) -> Future:
+        """Submit a task, replacing the workers first if one of them died (e.g. killed for running out of memory)."""
+        with self._lock:
+            try:
+                return self._executor.submit(fn, *args)
+            except BrokenProcessPool:
+                logger.warning("An NLP worker process died, starting new worker processes")
+                self._executor.shutdown(wait=False)
+                self._executor = self._new_executor()
+                return self._executor.submit(fn, *args)
+
+    def _submit(self, fn, *args) -> Future:
+        """Run fn in a worker; its spans and metrics are merged into the trace active at submission."""
+        trace = current_trace()
+        future = Future()
+
+        def merge(done: Future):
+            try:
+                future.set_result(unwrap_telemetry(done.result(), trace))
+            except BaseException as e:
+                future.set_exception(e)
+
+        self._submit_to_workers(capture_telemetry, fn, *args).add_done_callback(merge)
+        return future
+
+    def warm_up(self) -> List[int]:
+        """
+        Block until every worker process has started and loaded its models.
+
+        Returns:
+            Process ids of the workers, one per worker
+
+        Raises:
+            threading.BrokenBarrierError: If the workers weren't all ready within WARM_UP_TIMEOUT
+        """
+        futures = [self._submit(_ping) for _ in range(self.num_workers)]
+        return [future.result() for future in futures]
+
+    def analyze_text(self, text: str) -> Dict:
+        """Process-pool equivalent of ner_sentiment.analyze_text."""
+        return self._submit(analyze_text, text).result()
+
+    def generate_insights(self, summarized_text: str) -> Dict:
+        """Process-pool equivalent of insight_gen.generate_insights."""
+        return self._submit(generate_insights, summarized_text).result()
+
+    def submit(self, text: str, summary: Optional[str] = None) -> Future:
+        """
+        Queue a single document for full analysis.
+
+        Args:
+            text: Raw document text used for entities and sentiment
+            summary: Optional summary used for follow-up questions and topics
+
+        Returns:
+            Future resolving to a dict with entities, sentiment, follow_up_questions and topics
+        """
+        return self._submit(_analyze_document, {"text": text, "summary": summary})
+
+    def analyze_batch(self, docs: List[Union[str, Dict]], batch_size: int = 8) -> List[Dict]:
+        """
+        Analyze many documents, sending them to the workers in batches.
+
+        Args:
+            docs: Raw texts, or dicts with "text" and optional "summary" keys
+            batch_size: Number of documents sent to a worker per task
+
+        Returns:
+            List of analysis results in the same order as docs
+        """
+        docs = [{"text": doc} if isinstance(doc, str) else doc for doc in docs]
+        futures = [self._submit(_analyze_batch, docs[i:i + batch_size])
+                   for i in range(0, len(docs), batch_size)]
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional
+
+from .summarizer import summarize_text
+from .ner_sentiment import analyze_text
+from .insight_gen import generate_insights
+from ..utils.tracing import propagate
+
+"""
+Analysis pipeline orchestrator.
+Runs the local NLP stages concurrently with the network-bound LLM summary so
+that each result can be shown as soon as it is ready.
+"""
+
+SUMMARY = "summary"
+ANALYSIS = "analysis"
+INSIGHTS = "insights"
+
+
+class StageResult(NamedTuple):
+    """Outcome of a single pipeline stage."""
+    stage: str
+    value: Any = None
+    error: Optional[Exception] = None
+
+
+def is_summary_error(summary: str) -> bool:
+    """Return True if the summarizer returned an error message instead of a summary."""
+    return not summary or summary.startswith("⚠️")
+
+
+def iter_analysis(raw_text: str,
+                  summarize: Callable[[str], str] = summarize_text,
+                  analyze: Callable[[str], Dict] = analyze_text,
+                  insights: Callable[[str], Dict] = generate_insights,
+                  initializer: Optional[Callable[[], None]] = None) -> Iterator[StageResult]:
+    """
+    Run summary, NER/sentiment and insight generation, yielding each stage as it completes.
+
+    Entity and sentiment analysis only depend on the raw text, so they start
+    immediately alongside the summary. Insight generation starts as soon as a
+    successful summary arrives.
+
+    Args:
+        raw_text: The extracted text to analyze
+        summarize: Function producing a summary from raw text
+        analyze: Function producing entities and sentiment from raw text
+        insights: Function producing insights from the summary
+        initializer: Optional callable run in each worker thread before it starts
+            (e.g. to attach the Streamlit script context)
+
+    Returns:
+        Iterator of StageResult in completion order
+    """
+    with ThreadPoolExecutor(max_workers=3, initializer=initializer) as executor:
+        # propagate() keeps spans from the worker threads on the caller's trace
+        pending = {
+            executor.submit(propagate(summarize), raw_text): SUMMARY,
+            executor.submit(propagate(analyze), raw_text): ANALYSIS,
+        }
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    yield StageResult(stage, error=e)
+                    continue
+
+                # Insights are generated from the summary, so chain them here
+                if stage == SUMMARY and not is_summary_error(value):
+                    pending[executor.submit(propagate(insights), value)] = INSIGHTS
+
+                yield StageResult(stage, value)
+
+
+def run_analysis(raw_text: str, **kwargs) -> Dict[str, StageResult]:
+    """
+    Run the full analysis pipeline and collect all stage results.
+
+    Args:
+        raw_text: The extracted text to analyze
+        **kwargs: Forwarded to iter_analysis
+
+    Returns:
+        Dictionary mapping stage name to its StageResult
+    """
+    return {result.stage: result for result in iter_analysis(raw_text, **kwargs)}
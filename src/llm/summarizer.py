@@ -1,13 +1,17 @@
-import os
-import time
+import functools
 import logging
-from typing import List, Optional
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
-import streamlit as st
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from ..utils.helpers import count_tokens, iter_chunks, lazy_cache_data, truncate_tokens
+from ..utils.dedupe import dedupe_chunks
+from ..utils.tracing import propagate, span, traced
+from .backends import OpenAIBackend, get_backend
+from .extractive import compress_text
 
 """
-Text summarization module using OpenAI's GPT API.
+Text summarization module using OpenAI's GPT API (or another LLM backend).
 """
 
 
@@ -18,7 +22,12 @@ logger = logging.getLogger(__name__)
 class TextSummarizer:
     """Class to handle text summarization using OpenAI's GPT API."""
     
-    def __init__(self, api_key=None, model="gpt-3.5-turbo", max_tokens=4096, max_summary_tokens=1000):
+    # Tokens reserved for the system prompt, instructions and message framing
+    PROMPT_OVERHEAD_TOKENS = 100
+
+    def __init__(self, api_key=None, model="gpt-3.5-turbo", max_tokens=4096, max_summary_tokens=1000,
+                 reduce_fan_in=8, max_workers=4, compression_ratio=None,
+                 dedupe_threshold=0.9, base_url=None, backend=None):
         """
         Initialize the summarizer with API credentials and parameters.
         
@@ -27,23 +36,33 @@ class TextSummarizer:
             model: OpenAI model to use
             max_tokens: Maximum tokens the model can process
             max_summary_tokens: Maximum tokens for the summary
+            reduce_fan_in: Maximum number of summaries combined in one reduce request
+            max_workers: Maximum number of concurrent API requests per level
+            compression_ratio: If set, extractively compress each chunk to roughly this
+                fraction of its tokens before sending it to the API
+            dedupe_threshold: Similarity above which a chunk is treated as a near duplicate
+                of an earlier one and skipped (None disables deduplication)
+            base_url: Optional OpenAI-compatible API endpoint (e.g. a local stub server)
+            backend: OpenAIBackend to send requests through (created from api_key,
+                model and base_url if not given)
         """
-        # Try to get API key from environment if not provided
-        if not api_key:
-            api_key = os.getenv("OPENAI_API_KEY")
-            
-        if not api_key:
-            raise ValueError("OpenAI API key not found. Please set it in .env or pass directly.")
-            
-        self.client = OpenAI(api_key=api_key)
+        # Raises ValueError if no API key is found in the arguments, environment or secrets
+        self.backend = backend or OpenAIBackend(api_key=api_key, model=model, base_url=base_url)
         self.model = model
         self.max_tokens = max_tokens
         self.max_summary_tokens = max_summary_tokens
+        self.reduce_fan_in = max(2, reduce_fan_in)
+        self.max_workers = max(1, max_workers)
+        self.compression_ratio = compression_ratio
+        # Reports for the most recent summarize() call; each call builds its own
+        self.compression_report = self._new_compression_report()
+        self._report_lock = threading.Lock()
+        self.dedupe_threshold = dedupe_threshold
+        self.dedupe_report = None
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     def _call_openai_api(self, messages):
         """
-        Call OpenAI API with retry logic.
+        Call OpenAI API through the backend, which retries failed requests.
         
         Args:
             messages: List of message dictionaries for the conversation
@@ -52,15 +71,14 @@ class TextSummarizer:
             Summary text from API response
         """
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
+            return self.backend.chat(
+                messages,
                 max_tokens=self.max_summary_tokens,
+                stage="summarize",
                 temperature=0.5,
                 top_p=1.0,
                 frequency_penalty=0.0,
             )
-            return response.choices[0].message.content
         except Exception as e:
             logger.error(f"Error calling OpenAI API: {e}")
             raise
@@ -71,33 +89,167 @@ class TextSummarizer:
         
         Args:
             text: The input text to chunk
-            chunk_size: Approximate number of tokens per chunk
+            chunk_size: Approximate number of characters per chunk
             
         Returns:
             List of text chunks
         """
-        # Simple chunking by character count (approximation)
-        # In practice, you might want a more sophisticated tokenizer
-        words = text.split()
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        
-        for word in words:
-            word_length = len(word) + 1  # +1 for space
-            if current_length + word_length > chunk_size:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-                current_length = word_length
-            else:
-                current_chunk.append(word)
-                current_length += word_length
-                
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+        # Chunk by character offsets so only the chunk strings themselves are created
+        return list(iter_chunks(text, chunk_size=chunk_size, overlap=0))
+    
+    def _run_parallel(self, func: Callable, items: List) -> List[str]:
+        """
+        Apply func to every item concurrently, preserving input order.
+        
+        Args:
+            func: Function making a single API request
+            items: Inputs for each request
+            
+        Returns:
+            List of results in the same order as items
+        """
+        if len(items) <= 1 or self.max_workers == 1:
+            return [func(item) for item in items]
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            # propagate() keeps worker-thread spans attached to the caller's trace
+            return list(executor.map(propagate(func), items))
+    
+    @staticmethod
+    def _new_compression_report() -> Dict[str, int]:
+        return {"original_tokens": 0, "kept_tokens": 0, "total_sentences": 0, "kept_sentences": 0}
+    
+    def _compress(self, text: str, report: Dict[str, int]) -> str:
+        """
+        Extractively shrink text before it is sent to the API, if compression is enabled.
+        
+        Args:
+            text: Source text for a single request
+            report: Compression report of the current summarize() call to add to
+            
+        Returns:
+            The compressed text, or the input unchanged when compression is off
+        """
+        if not self.compression_ratio:
+            return text
+        
+        with span("llm.compress"):
+            result = compress_text(text, ratio=self.compression_ratio, model=self.model)
+        with self._report_lock:
+            for key in report:
+                report[key] += getattr(result, key)
+        return result.text
+    
+    def _summarize_chunk(self, chunk: str, report: Dict[str, int]) -> str:
+        """Summarize a single chunk of the source text."""
+        chunk = self._compress(chunk, report)
+        messages = [
+            {"role": "system", "content": "You are a concise summarizer. Extract the key points only."},
+            {"role": "user", "content": f"Summarize this text:\n\n{chunk}"}
+        ]
+        return self._call_openai_api(messages)
+    
+    def _combine_summaries(self, summaries: List[str]) -> str:
+        """Merge a group of section summaries into one summary."""
+        combined_summary = "\n\n".join(summaries)
+        messages = [
+            {"role": "system", "content": "You are a concise summarizer. Create a unified summary."},
+            {"role": "user", "content": f"Create a unified summary from these section summaries:\n\n{combined_summary}"}
+        ]
+        return self._call_openai_api(messages)
+    
+    def _fit_summary(self, summary: str, limit: int) -> str:
+        """
+        Shrink a summary to at most limit tokens.
+        
+        The summary is extractively re-compressed first, so whole sentences are
+        kept where possible, and cut at the token limit if that isn't enough.
+        
+        Args:
+            summary: Summary from the previous level
+            limit: Maximum number of tokens
             
-        return chunks
+        Returns:
+            The summary, shortened if it was over the limit
+        """
+        tokens = count_tokens(summary, self.model)
+        if tokens <= limit:
+            return summary
+        
+        compressed = compress_text(summary, budget_tokens=limit, min_sentences=1, model=self.model).text
+        return truncate_tokens(compressed, limit, self.model)
     
+    def _group_summaries(self, summaries: List[str]) -> List[List[str]]:
+        """
+        Group consecutive summaries so each group fits in a single reduce request.
+        
+        Args:
+            summaries: Summaries from the previous level
+            
+        Returns:
+            List of groups, each holding at most reduce_fan_in summaries
+        """
+        budget = self.max_tokens - self.max_summary_tokens - self.PROMPT_OVERHEAD_TOKENS
+        # A summary that fills the budget alone could never be sent, so shrink it first
+        summaries = [self._fit_summary(summary, budget) for summary in summaries]
+        groups = []
+        current_group = []
+        current_tokens = 0
+        
+        for summary in summaries:
+            summary_tokens = count_tokens(summary, self.model)
+            if current_group and (current_tokens + summary_tokens > budget
+                                  or len(current_group) >= self.reduce_fan_in):
+                groups.append(current_group)
+                current_group = []
+                current_tokens = 0
+            current_group.append(summary)
+            current_tokens += summary_tokens
+            
+        if current_group:
+            groups.append(current_group)
+        
+        # Always make progress: if no two summaries fit together, shrink each to
+        # half the budget so that pairs of them do
+        if len(groups) == len(summaries) and len(summaries) > 1:
+            summaries = [self._fit_summary(summary, budget // 2) for summary in summaries]
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+            
+        return groups
+    
+    def _reduce_summaries(self, summaries: List[str]) -> str:
+        """
+        Recursively merge summaries in a tree until a single summary remains.
+        
+        Each level combines at most reduce_fan_in summaries per request and runs
+        its requests in parallel, so the number of sequential rounds grows
+        logarithmically with the number of chunks.
+        
+        Args:
+            summaries: Chunk summaries to merge
+            
+        Returns:
+            The final unified summary
+        """
+        level = 1
+        while len(summaries) > 1:
+            groups = self._group_summaries(summaries)
+            logger.info(f"Reduce level {level}: merging {len(summaries)} summaries into {len(groups)}")
+            summaries = self._run_parallel(self._combine_summaries, groups)
+            level += 1
+            
+        return summaries[0] if summaries else ""
+    
+    def _log_compression_report(self, report: Dict[str, int]):
+        """Log how much of the input survived extractive compression."""
+        if self.compression_ratio and report["original_tokens"]:
+            logger.info(
+                f"Extractive compression kept {report['kept_tokens']}/{report['original_tokens']} tokens "
+                f"({report['kept_tokens'] / report['original_tokens']:.0%}), "
+                f"{report['kept_sentences']}/{report['total_sentences']} sentences"
+            )
+    
+    @traced("llm.summarize")
     def summarize(self, text):
         """
         Summarize the input text.
@@ -115,72 +267,70 @@ class TextSummarizer:
         if len(text.split()) < 100:
             return text
             
+        # Reports are local to this call, so concurrent calls don't mix their figures
+        report = self._new_compression_report()
+        self.compression_report = report
+        summarize_chunk = functools.partial(self._summarize_chunk, report=report)
+        
         # Handle long text by chunking
         if len(text) > self.max_tokens * 2:  # Rough character estimation
-            chunks = self._chunk_text(text)
+            with span("llm.chunk"):
+                chunks = self._chunk_text(text)
             logger.info(f"Text split into {len(chunks)} chunks for processing")
             
-            # Summarize each chunk
-            chunk_summaries = []
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Summarizing chunk {i+1}/{len(chunks)}")
-                
-                messages = [
-                    {"role": "system", "content": "You are a concise summarizer. Extract the key points only."},
-                    {"role": "user", "content": f"Summarize this text:\n\n{chunk}"}
-                ]
-                
-                chunk_summary = self._call_openai_api(messages)
-                chunk_summaries.append(chunk_summary)
-                time.sleep(1)  # Avoid rate limits
+            # Skip repeated sponsor reads, pull quotes and other near-identical chunks
+            if self.dedupe_threshold:
+                with span("llm.dedupe"):
+                    chunks, dedupe_report = dedupe_chunks(chunks, threshold=self.dedupe_threshold)
+                self.dedupe_report = dedupe_report
+                logger.info(
+                    f"Dedupe kept {dedupe_report.unique_chunks}/{dedupe_report.total_chunks} chunks "
+                    f"({dedupe_report.duplicate_chunks} near duplicates dropped)"
+                )
+            
+            # Summarize each chunk (map phase)
+            chunk_summaries = self._run_parallel(summarize_chunk, chunks)
+            self._log_compression_report(report)
                 
             # Combine chunk summaries for final summary
             combined_summary = "\n\n".join(chunk_summaries)
             
-            # If combined summaries are still too long, summarize again
+            # If combined summaries are still too long, reduce them level by level
             if len(combined_summary) > self.max_tokens:
                 logger.info("Generating final summary from chunk summaries")
-                messages = [
-                    {"role": "system", "content": "You are a concise summarizer. Create a unified summary."},
-                    {"role": "user", "content": f"Create a unified summary from these section summaries:\n\n{combined_summary}"}
-                ]
-                return self._call_openai_api(messages)
+                return self._reduce_summaries(chunk_summaries)
             
             return combined_summary
         
         # For text within token limits, summarize directly
-        messages = [
-            {"role": "system", "content": "You are a concise summarizer. Extract the key points only."},
-            {"role": "user", "content": f"Summarize this text:\n\n{text}"}
-        ]
-        
-        return self._call_openai_api(messages)
+        summary = summarize_chunk(text)
+        self._log_compression_report(report)
+        return summary
 
-@st.cache_data
-def summarize_text(text, model="gpt-3.5-turbo"):
+@lazy_cache_data
+def summarize_text(text, model="gpt-3.5-turbo", compression_ratio=None, backend=None):
     """
     Simple function interface for text summarization.
     
     Args:
         text: Text to summarize
         model: Model to use for summarization
+        compression_ratio: Optional fraction of tokens to keep via local extractive
+            compression before calling the API
+        backend: "openai", "local" or "auto" (defaults to SCOPEAI_LLM_BACKEND, else "openai")
         
     Returns:
         Summarized text
     """
-    # Try to get API key from different sources
-    api_key = os.getenv("OPENAI_API_KEY")
-    
-    # Try Streamlit secrets as a fallback
-    if not api_key and hasattr(st, 'secrets') and "OPENAI_API_KEY" in st.secrets:
-        api_key = st.secrets["OPENAI_API_KEY"]
-        
-    # If still no API key, return error message
-    if not api_key:
-        return "⚠️ ERROR: No OpenAI API key found. Please add your API key in the sidebar."
+    # The openai backend looks for the key in the environment and Streamlit secrets
+    try:
+        llm = get_backend(backend, model=model)
+    except ValueError as e:
+        if "API key" in str(e):
+            return "⚠️ ERROR: No OpenAI API key found. Please add your API key in the sidebar."
+        return f"⚠️ Error generating summary: {str(e)}"
     
     try:
-        summarizer = TextSummarizer(api_key=api_key, model=model)
-        return summarizer.summarize(text)
+        return llm.summarize(text, compression_ratio=compression_ratio)
     except Exception as e:
         return f"⚠️ Error generating summary: {str(e)}"
\ No newline at end of file
@@ -1,7 +1,15 @@
 # Parser module initialization
 __version__ = "0.1.0"
 
-# Import modules to make them available when importing the package
-from . import pdf_parser
-from . import youtube_parser
-from . import news_parser
+import importlib
+
+# Modules are imported lazily on first attribute access
+_SUBMODULES = ("pdf_parser", "youtube_parser", "news_parser", "youtube_playlist")
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_SUBMODULES))
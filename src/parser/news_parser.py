@@ -1,8 +1,9 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 from urllib.parse import urlparse
 
+from ..utils.tracing import span, traced
+
+@traced("parser.news")
 def extract_news_content(url):
     """
     Extract the main content from a news article URL.
@@ -13,19 +14,25 @@ def extract_news_content(url):
     Returns:
         str: The main text content of the article with boilerplate removed.
     """
+    # Imported here so that importing this module stays cheap
+    import requests
+    from bs4 import BeautifulSoup
+    
     # Send HTTP request
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        with span("parser.news.fetch"):
+            response = requests.get(url, headers=headers, timeout=10)
+            response.raise_for_status()
     except requests.exceptions.RequestException as e:
         return f"Error fetching the article: {e}"
     
     # Parse HTML content
-    soup = BeautifulSoup(response.text, 'html.parser')
+    with span("parser.news.html_parse", bytes=len(response.content)):
+        soup = BeautifulSoup(response.text, 'html.parser')
     
     # Remove unwanted elements
     for element in soup.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe']):
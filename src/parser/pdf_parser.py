@@ -1,7 +1,9 @@
-import fitz  # PyMuPDF
 from typing import Union
 from io import BytesIO
 
+from ..utils.tracing import traced
+
+@traced("parser.pdf")
 def extract_pdf_text(uploaded_pdf: Union[BytesIO, any]) -> str:
     """
     Extracts text content from a PDF file using PyMuPDF (fitz).
@@ -13,6 +15,7 @@ def extract_pdf_text(uploaded_pdf: Union[BytesIO, any]) -> str:
         str: Extracted plain text from the PDF
     """
     try:
+        import fitz  # PyMuPDF
         text = ""
         with fitz.open(stream=uploaded_pdf.read(), filetype="pdf") as doc:
             for page in doc:
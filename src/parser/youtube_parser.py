@@ -1,62 +1,89 @@
 import os
 import tempfile
-import whisper
 from typing import Optional, Union
 import sys
-import yt_dlp  
+
+from ..utils.tracing import record_cache, span, traced
 
 # Global model cache
 _WHISPER_MODELS = {}
 
+
+def _load_whisper_model(whisper_model_size: str):
+    try:
+        print(f"Loading whisper model: {whisper_model_size}")  # Debug statement
+        import whisper  # Pulls in torch, so only import when a model is needed
+        with span("parser.youtube.load_model", model=whisper_model_size):
+            return whisper.load_model(whisper_model_size)
+    except Exception as e:
+        error_msg = f"Failed to load Whisper model: {str(e)}"
+        print(error_msg)  # Print error for debugging
+        raise RuntimeError(error_msg)
+
+
+def download_audio(url: str, output_path: Optional[str] = None, quiet: bool = False) -> str:
+    """
+    Download audio from a YouTube video using yt-dlp Python package.
+
+    Args:
+        url: YouTube URL
+        output_path: Path to save the audio file. If None, a temporary file is used.
+        quiet: Suppress yt-dlp console output
+
+    Returns:
+        Path to the downloaded audio file
+    """
+    if output_path is None:
+        fd, output_path = tempfile.mkstemp(suffix=".mp3")
+        os.close(fd)
+
+    # Remove file extension for yt-dlp output template
+    output_template = output_path.rsplit('.', 1)[0]
+
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '192',
+        }],
+        'outtmpl': output_template,
+        'quiet': quiet,
+        'noprogress': quiet,
+    }
+
+    import yt_dlp
+    with span("parser.youtube.download"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        ydl.download([url])
+
+    return output_path
+
+
 class YouTubeParser:
     """Parser to extract transcripts from YouTube videos."""
     
-    def __init__(self, whisper_model_size: str = "base"):
+    def __init__(self, whisper_model_size: str = "base", shared_model: bool = True):
+        """
+        Args:
+            whisper_model_size: Whisper model to load
+            shared_model: Reuse the process-wide cached model. Pass False to load a
+                private copy, e.g. for transcribing from several threads at once.
+        """
+        if not shared_model:
+            self.whisper_model = _load_whisper_model(whisper_model_size)
+            return
+
         # Load model from cache or initialize
         global _WHISPER_MODELS
+        record_cache("whisper_model", whisper_model_size in _WHISPER_MODELS)
         if whisper_model_size not in _WHISPER_MODELS:
-            try:
-                print(f"Loading whisper model: {whisper_model_size}")  # Debug statement
-                _WHISPER_MODELS[whisper_model_size] = whisper.load_model(whisper_model_size )
-            except Exception as e:
-                error_msg = f"Failed to load Whisper model: {str(e)}"
-                print(error_msg)  # Print error for debugging
-                raise RuntimeError(error_msg)
+            _WHISPER_MODELS[whisper_model_size] = _load_whisper_model(whisper_model_size)
                 
         self.whisper_model = _WHISPER_MODELS[whisper_model_size]
     
     def download_audio(self, url: str, output_path: Optional[str] = None) -> str:
-        """
-        Download audio from a YouTube video using yt-dlp Python package.
-        
-        Args:
-            url: YouTube URL
-            output_path: Path to save the audio file. If None, a temporary file is used.
-            
-        Returns:
-            Path to the downloaded audio file
-        """
-        if output_path is None:
-            fd, output_path = tempfile.mkstemp(suffix=".mp3")
-            os.close(fd)
-        
-        # Remove file extension for yt-dlp output template
-        output_template = output_path.rsplit('.', 1)[0]
-        
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-            'outtmpl': output_template,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        
-        return output_path
+        """Download audio from a YouTube video (see download_audio)."""
+        return download_audio(url, output_path)
     
     def transcribe_audio(self, audio_path: str) -> str:
         """
@@ -68,7 +95,8 @@ class YouTubeParser:
         Returns:
             Transcription text
         """
-        result = self.whisper_model.transcribe(audio_path)
+        with span("parser.youtube.transcribe"):
+            result = self.whisper_model.transcribe(audio_path)
         return result["text"]
     
     def parse(self, url: str, cleanup: bool = True) -> str:
@@ -76,8 +104,7 @@ class YouTubeParser:
             audio_path = self.download_audio(url)
             if not audio_path or not os.path.exists(audio_path):
                 return "❌ Failed to download audio from YouTube."
-            result = self.whisper_model.transcribe(audio_path)
-            transcript = result.get("text", "").strip()
+            transcript = self.transcribe_audio(audio_path).strip()
             if cleanup and audio_path and os.path.exists(audio_path):
                 os.remove(audio_path)
             return transcript if transcript else "❌ No transcript found."
@@ -86,6 +113,7 @@ class YouTubeParser:
 
 
 # filepath: c:\Users\abhis\ScopeAI\src\parser\youtube_parser.py
+@traced("parser.youtube")
 def extract_youtube_transcript(url, use_whisper=True):
     """Extract transcript from YouTube video."""
     if use_whisper:
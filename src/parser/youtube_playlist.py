@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ..utils.tracing import span
+
+"""
+Playlist and channel ingestion.
+Expands a playlist or channel into its videos from yt-dlp metadata (no media
+is downloaded for that), then runs downloads in a bounded pool that feeds a
+separate transcription pool, so network and CPU work overlap. Transcripts are
+written one file per video, and videos that already have one are skipped.
+"""
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD = "download"
+TRANSCRIBE = "transcribe"
+
+# Marks the end of the transcription queue
+_DONE = object()
+
+
+def _entry_url(entry: Dict) -> Optional[str]:
+    url = entry.get("webpage_url") or entry.get("url")
+    if url and url.startswith("http"):
+        return url
+    if entry.get("id"):
+        return f"https://www.youtube.com/watch?v={entry['id']}"
+    return None
+
+
+def _iter_entries(info: Dict, ydl) -> Iterator[Dict]:
+    for entry in info.get("entries") or []:
+        if not entry:
+            continue
+        if entry.get("entries") is not None:
+            yield from _iter_entries(entry, ydl)
+        # Channels list their tabs (Videos, Shorts, ...) as links to nested playlists
+        elif entry.get("_type") == "playlist" or entry.get("ie_key") == "YoutubeTab":
+            nested = ydl.extract_info(entry["url"], download=False)
+            if nested:
+                yield from _iter_entries(nested, ydl)
+        else:
+            yield entry
+
+
+def expand_playlist(url: str) -> List[Dict[str, str]]:
+    """
+    List the videos of a playlist or channel without downloading any media.
+
+    Args:
+        url: Playlist, channel or single video URL
+
+    Returns:
+        List of {"id", "url", "title"} dictionaries in playlist order, without duplicates
+    """
+    import yt_dlp
+
+    ydl_opts = {"extract_flat": "in_playlist", "skip_download": True, "quiet": True, "ignoreerrors": True}
+    with span("parser.youtube.expand"), yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+        if info is None:
+            return []
+        entries = list(_iter_entries(info, ydl)) if info.get("entries") is not None else [info]
+
+    videos, seen = [], set()
+    for entry in entries:
+        video_url = _entry_url(entry)
+        video_id = entry.get("id")
+        if not video_id or not video_url or video_id in seen:
+            continue
+        seen.add(video_id)
+        videos.append({"id": video_id, "url": video_url, "title": entry.get("title") or ""})
+    return videos
+
+
+class PlaylistIngester:
+    """Download and transcribe every video of a playlist or channel."""
+
+    def __init__(self, output_dir: str, download_workers: int = 4, transcribe_workers: int = 1,
+                 whisper_model_size: str = "tiny", max_pending: Optional[int] = None,
+                 progress: Optional[Callable[[Dict], None]] = None, keep_audio: bool = False):
+        """
+        Args:
+            output_dir: Directory transcripts (<video id>.txt) and transcripts.jsonl are written to
+            download_workers: Concurrent audio downloads
+            transcribe_workers: Concurrent transcriptions; each worker after the first
+                loads its own copy of the Whisper model
+            whisper_model_size: Whisper model used for transcription
+            max_pending: Maximum downloaded files waiting for transcription
+                (defaults to twice the number of transcription workers)
+            progress: Called with a stats snapshot after each video finishes a stage
+            keep_audio: Keep downloaded audio files instead of deleting them after transcription
+        """
+        self.output_dir = output_dir
+        self.audio_dir = os.path.join(output_dir, "audio")
+        self.download_workers = max(1, download_workers)
+        self.transcribe_workers = max(1, transcribe_workers)
+        self.whisper_model_size = whisper_model_size
+        self.max_pending = max_pending or 2 * self.transcribe_workers
+        self.progress = progress
+        self.keep_audio = keep_audio
+
+        self.stats = {stage: {"done": 0, "failed": 0, "busy_seconds": 0.0} for stage in (DOWNLOAD, TRANSCRIBE)}
+        self.stats.update({"total": 0, "skipped": 0})
+        self._lock = threading.Lock()
+        self._start_time = None
+
+    def transcript_path(self, video_id: str) -> str:
+        return os.path.join(self.output_dir, f"{video_id}.txt")
+
+    def is_transcribed(self, video_id: str) -> bool:
+        """Return True if a transcript for the video was already written."""
+        return os.path.exists(self.transcript_path(video_id))
+
+    def snapshot(self) -> Dict:
+        """
+        Get current progress and per-stage throughput.
+
+        Returns:
+            Stats with done/failed counts, busy time, videos per minute for each
+            stage, plus total, skipped and elapsed seconds
+        """
+        with self._lock:
+            stats = json.loads(json.dumps(self.stats))
+        elapsed = time.time() - self._start_time if self._start_time else 0.0
+        stats["elapsed_seconds"] = round(elapsed, 2)
+        for stage in (DOWNLOAD, TRANSCRIBE):
+            done = stats[stage]["done"]
+            stats[stage]["per_minute"] = round(done * 60 / elapsed, 2) if elapsed else 0.0
+            stats[stage]["avg_seconds"] = round(stats[stage]["busy_seconds"] / done, 2) if done else 0.0
+            stats[stage]["busy_seconds"] = round(stats[stage]["busy_seconds"], 2)
+        return stats
+
+    def _record(self, stage: str, ok: bool, seconds: float):
+        with self._lock:
+            self.stats[stage]["done" if ok else "failed"] += 1
+            self.stats[stage]["busy_seconds"] += seconds
+        snapshot = self.snapshot()
+        logger.info(
+            f"{stage}: {snapshot[stage]['done']} done, {snapshot[stage]['failed']} failed "
+            f"of {snapshot['total'] - snapshot['skipped']} ({snapshot[stage]['per_minute']}/min)"
+        )
+        if self.progress:
+            # A failing callback must not kill a worker: the others would block on the pending queue
+            try:
+                self.progress(snapshot)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+
+    def _download(self, video: Dict, pending: queue.Queue):
+        from .youtube_parser import download_audio
+
+        audio_path = os.path.join(self.audio_dir, f"{video['id']}.mp3")
+        start = time.perf_counter()
+        try:
+            download_audio(video["url"], audio_path, quiet=True)
+            if not os.path.exists(audio_path):
+                raise RuntimeError("yt-dlp did not produce an audio file")
+        except Exception as e:
+            logger.warning(f"Download failed for {video['url']}: {e}")
+            self._record(DOWNLOAD, False, time.perf_counter() - start)
+            return
+        self._record(DOWNLOAD, True, time.perf_counter() - start)
+        # Blocks while transcription is behind, which keeps downloaded audio on disk bounded
+        pending.put((video, audio_path))
+
+    def _transcribe_worker(self, parser, pending: queue.Queue, results: List[Dict]):
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                break
+
+            video, audio_path = item
+            start = time.perf_counter()
+            try:
+                transcript = parser.transcribe_audio(audio_path).strip()
+                if not transcript:
+                    raise RuntimeError("No transcript found")
+                self._write_transcript(video, transcript)
+                with self._lock:
+                    results.append(video)
+                ok = True
+            except Exception as e:
+                logger.warning(f"Transcription failed for {video['url']}: {e}")
+                ok = False
+            finally:
+                if not self.keep_audio and os.path.exists(audio_path):
+                    os.remove(audio_path)
+            self._record(TRANSCRIBE, ok, time.perf_counter() - start)
+
+    def _write_transcript(self, video: Dict, transcript: str):
+        path = self.transcript_path(video["id"])
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(transcript)
+        os.replace(tmp_path, path)
+
+        record = dict(video, path=path, chars=len(transcript))
+        with self._lock, open(os.path.join(self.output_dir, "transcripts.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def run(self, url: str) -> Dict:
+        """
+        Ingest every video of a playlist, channel or single video URL.
+
+        Args:
+            url: Playlist, channel or video URL
+
+        Returns:
+            Final stats (see snapshot) with the list of newly transcribed videos under "transcribed"
+        """
+        os.makedirs(self.audio_dir, exist_ok=True)
+        self._start_time = time.time()
+
+        videos = expand_playlist(url)
+        todo = [video for video in videos if not self.is_transcribed(video["id"])]
+        with self._lock:
+            self.stats["total"] = len(videos)
+            self.stats["skipped"] = len(videos) - len(todo)
+        logger.info(f"{len(videos)} videos found, {len(todo)} to transcribe")
+
+        if not todo:
+            return dict(self.snapshot(), transcribed=[])
+
+        # Load models up front so a failure stops the run before anything is downloaded
+        from .youtube_parser import YouTubeParser
+        parsers = [YouTubeParser(self.whisper_model_size, shared_model=i == 0)
+                   for i in range(self.transcribe_workers)]
+
+        pending = queue.Queue(maxsize=self.max_pending)
+        results: List[Dict] = []
+        transcribers = [
+            threading.Thread(target=self._transcribe_worker, args=(parser, pending, results),
+                             name=f"transcribe-{i}", daemon=True)
+            for i, parser in enumerate(parsers)
+        ]
+        for thread in transcribers:
+            thread.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.download_workers, thread_name_prefix="download") as downloads:
+                for video in todo:
+                    downloads.submit(self._download, video, pending)
+        finally:
+            for _ in transcribers:
+                pending.put(_DONE)
+            for thread in transcribers:
+                thread.join()
+
+        stats = self.snapshot()
+        stats["transcribed"] = results
+        return stats
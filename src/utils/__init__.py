@@ -1,5 +1,15 @@
 # Utils module initialization
 __version__ = "0.1.0"
 
-# Import modules to make them available when importing the package
-from . import helpers
+import importlib
+
+# Modules are imported lazily on first attribute access
+_SUBMODULES = ("helpers", "dedupe", "tracing", "doc_store", "corpus_index")
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_SUBMODULES))
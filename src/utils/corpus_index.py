@@ -0,0 +1,253 @@
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+"""
+Cross-document entity and topic index.
+Entities and topics of each analyzed document are added to SQLite postings
+tables as the document is processed, so corpus-level questions ("which
+documents this week mention X together with Finance?") are answered from the
+index without re-running analysis.
+"""
+
+DEFAULT_INDEX_PATH = os.getenv("SCOPEAI_INDEX_PATH", os.path.join(tempfile.gettempdir(), "scopeai_index.sqlite3"))
+
+ENTITY = "entity"
+TOPIC = "topic"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT NOT NULL UNIQUE,
+    source TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_indexed_at ON documents (indexed_at);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    display TEXT NOT NULL,
+    UNIQUE (kind, name)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    label TEXT,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id, term_id);
+"""
+
+
+def normalize_term(value: str) -> str:
+    """Lowercase a term and collapse whitespace so spelling variants share a posting list."""
+    return " ".join(value.lower().split())
+
+
+class CorpusIndex:
+    """SQLite inverted index from entities and topics to documents."""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        """
+        Open (and if needed create) the index database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def add_document(self, doc_key: str, entities: Optional[Dict[str, List[str]]] = None,
+                     topics: Iterable[str] = (), source: Optional[str] = None,
+                     indexed_at: Optional[float] = None) -> int:
+        """
+        Add or replace the postings of one document.
+
+        Args:
+            doc_key: Stable document identifier (e.g. document store id or manifest id)
+            entities: Entity lists keyed by entity type, as returned by analyze_text
+            topics: Topic labels, as returned by classify_topics
+            source: Optional source path or URL
+            indexed_at: Unix timestamp used for date-range queries (defaults to now)
+
+        Returns:
+            Internal id of the document
+        """
+        terms: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
+        for label, values in (entities or {}).items():
+            for value in values:
+                name = normalize_term(value)
+                if name:
+                    terms.setdefault((ENTITY, name), (value.strip(), label))
+        for value in topics:
+            name = normalize_term(value)
+            if name:
+                terms.setdefault((TOPIC, name), (value.strip(), None))
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO documents (doc_key, source, indexed_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (doc_key) DO UPDATE SET source = excluded.source, indexed_at = excluded.indexed_at",
+                    (doc_key, source, indexed_at if indexed_at is not None else time.time()),
+                )
+                doc_id = conn.execute("SELECT id FROM documents WHERE doc_key = ?", (doc_key,)).fetchone()["id"]
+
+                # Re-indexing a document replaces its postings rather than adding to them
+                conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                conn.executemany("INSERT OR IGNORE INTO terms (kind, name, display) VALUES (?, ?, ?)",
+                                 [(kind, name, display) for (kind, name), (display, _) in terms.items()])
+                for (kind, name), (_, label) in terms.items():
+                    conn.execute(
+                        "INSERT INTO postings (term_id, doc_id, label) "
+                        "SELECT id, ?, ? FROM terms WHERE kind = ? AND name = ?",
+                        (doc_id, label, kind, name),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return doc_id
+
+    def _term_ids(self, conn: sqlite3.Connection, terms: List[Tuple[str, str]]) -> Optional[List[int]]:
+        """Look up term ids, or return None if any term has never been indexed."""
+        ids = []
+        for kind, value in terms:
+            row = conn.execute("SELECT id FROM terms WHERE kind = ? AND name = ?",
+                               (kind, normalize_term(value))).fetchone()
+            if row is None:
+                return None
+            ids.append(row["id"])
+        return ids
+
+    @staticmethod
+    def _date_filter(since: Optional[float], until: Optional[float]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("d.indexed_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("d.indexed_at < ?")
+            params.append(until)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def search(self, entities: Iterable[str] = (), topics: Iterable[str] = (),
+               since: Optional[float] = None, until: Optional[float] = None,
+               limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Find documents that mention all of the given entities and topics.
+
+        Args:
+            entities: Entity names every result must mention
+            topics: Topic labels every result must have
+            since: Only documents indexed at or after this Unix timestamp
+            until: Only documents indexed before this Unix timestamp
+            limit: Maximum number of results
+
+        Returns:
+            Matching documents (doc_key, source, indexed_at), newest first
+        """
+        terms = [(ENTITY, e) for e in entities] + [(TOPIC, t) for t in topics]
+        date_sql, date_params = self._date_filter(since, until)
+
+        with self._connect() as conn:
+            if not terms:
+                rows = conn.execute(
+                    f"SELECT d.doc_key, d.source, d.indexed_at FROM documents d WHERE 1 = 1{date_sql} "
+                    "ORDER BY d.indexed_at DESC LIMIT ?",
+                    (*date_params, limit),
+                ).fetchall()
+                return [dict(row) for row in rows]
+
+            term_ids = self._term_ids(conn, terms)
+            if term_ids is None:
+                return []
+
+            # Intersect posting lists: a document must appear once per requested term
+            placeholders = ", ".join("?" * len(term_ids))
+            rows = conn.execute(
+                f"SELECT d.doc_key, d.source, d.indexed_at FROM postings p "
+                f"JOIN documents d ON d.id = p.doc_id "
+                f"WHERE p.term_id IN ({placeholders}){date_sql} "
+                f"GROUP BY d.id HAVING COUNT(*) = ? "
+                f"ORDER BY d.indexed_at DESC LIMIT ?",
+                (*term_ids, *date_params, len(set(term_ids)), limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def co_occurrences(self, value: str, kind: str = ENTITY, with_kind: Optional[str] = None,
+                       since: Optional[float] = None, until: Optional[float] = None,
+                       k: int = 10) -> List[Tuple[str, str, int]]:
+        """
+        Count the terms that appear in the same documents as a given term.
+
+        Args:
+            value: The entity name or topic label
+            kind: ENTITY or TOPIC, the kind of value
+            with_kind: Only count co-occurring terms of this kind (None counts both)
+            since: Only documents indexed at or after this Unix timestamp
+            until: Only documents indexed before this Unix timestamp
+            k: Number of terms to return
+
+        Returns:
+            Up to k (kind, term, document count) tuples, most frequent first
+        """
+        date_sql, date_params = self._date_filter(since, until)
+        kind_sql = " AND t.kind = ?" if with_kind else ""
+        kind_params = [with_kind] if with_kind else []
+
+        with self._connect() as conn:
+            term_ids = self._term_ids(conn, [(kind, value)])
+            if term_ids is None:
+                return []
+            rows = conn.execute(
+                f"SELECT t.kind, t.display, COUNT(*) AS n FROM postings anchor "
+                f"JOIN documents d ON d.id = anchor.doc_id "
+                f"JOIN postings p ON p.doc_id = anchor.doc_id AND p.term_id != anchor.term_id "
+                f"JOIN terms t ON t.id = p.term_id "
+                f"WHERE anchor.term_id = ?{date_sql}{kind_sql} "
+                f"GROUP BY t.id ORDER BY n DESC, t.display LIMIT ?",
+                (term_ids[0], *date_params, *kind_params, k),
+            ).fetchall()
+        return [(row["kind"], row["display"], row["n"]) for row in rows]
+
+    def top_terms(self, kind: str = ENTITY, since: Optional[float] = None, until: Optional[float] = None,
+                  k: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get the terms of one kind that appear in the most documents.
+
+        Args:
+            kind: ENTITY or TOPIC
+            since: Only documents indexed at or after this Unix timestamp
+            until: Only documents indexed before this Unix timestamp
+            k: Number of terms to return
+
+        Returns:
+            Up to k (term, document count) tuples, most frequent first
+        """
+        date_sql, date_params = self._date_filter(since, until)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT t.display, COUNT(*) AS n FROM postings p "
+                f"JOIN terms t ON t.id = p.term_id JOIN documents d ON d.id = p.doc_id "
+                f"WHERE t.kind = ?{date_sql} GROUP BY t.id ORDER BY n DESC, t.display LIMIT ?",
+                (kind, *date_params, k),
+            ).fetchall()
+        return [(row["display"], row["n"]) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of indexed documents, terms and postings."""
+        with self._connect() as conn:
+            return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("documents", "terms", "postings")}
@@ -0,0 +1,147 @@
+import re
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+"""
+Near-duplicate detection for text chunks.
+Uses MinHash signatures over word shingles with a banded LSH index, so each
+chunk is only compared against a handful of candidates.
+"""
+
+WORD_PATTERN = re.compile(r"\w+")
+# Mersenne prime used for the universal hash family
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+class DedupeReport(NamedTuple):
+    """Statistics from a dedupe pass."""
+    total_chunks: int
+    unique_chunks: int
+    duplicate_chunks: int
+    # Index of each dropped chunk mapped to the index of the chunk it duplicates
+    duplicates: Dict[int, int]
+
+
+def shingle_hashes(text: str, shingle_size: int = 5) -> np.ndarray:
+    """
+    Hash the word shingles of a text.
+
+    Args:
+        text: The input text
+        shingle_size: Number of words per shingle
+
+    Returns:
+        Array of unique 32-bit shingle hashes
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+
+    size = min(shingle_size, len(words))
+    hashes = {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+              for i in range(len(words) - size + 1)}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+class MinHashLSH:
+    """Incremental MinHash LSH index for near-duplicate lookups."""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        """
+        Initialize the index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity to count as a duplicate
+            num_perm: Number of hash permutations in each signature
+            bands: Number of LSH bands (must divide num_perm)
+            seed: Seed for the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        rng = np.random.default_rng(seed)
+        self.threshold = threshold
+        self.rows = num_perm // bands
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """Compute the MinHash signature of a set of shingle hashes."""
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def query(self, signature: np.ndarray) -> Optional[int]:
+        """
+        Find an indexed item whose similarity to signature is above the threshold.
+
+        Args:
+            signature: MinHash signature to look up
+
+        Returns:
+            Key of the matching item, or None if there is no near duplicate
+        """
+        checked = set()
+        for band, buckets in enumerate(self._buckets):
+            band_key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for key in buckets.get(band_key, ()):
+                if key in checked:
+                    continue
+                checked.add(key)
+                if np.mean(self._signatures[key] == signature) >= self.threshold:
+                    return key
+        return None
+
+    def insert(self, key: int, signature: np.ndarray):
+        """Add an item's signature to the index."""
+        self._signatures[key] = signature
+        for band, buckets in enumerate(self._buckets):
+            band_key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            buckets.setdefault(band_key, []).append(key)
+
+
+def dedupe_chunks(chunks: List[str], threshold: float = 0.85, shingle_size: int = 5,
+                  num_perm: int = 64, bands: int = 16) -> Tuple[List[str], DedupeReport]:
+    """
+    Drop chunks that are near duplicates of an earlier chunk.
+
+    Runs in time linear in the total text size: every chunk is hashed once and
+    only compared against chunks that share an LSH bucket with it.
+
+    Args:
+        chunks: Text chunks in document order
+        threshold: Minimum estimated Jaccard similarity to count as a duplicate
+        shingle_size: Number of words per shingle
+        num_perm: Number of hash permutations in each signature
+        bands: Number of LSH bands
+
+    Returns:
+        Tuple of (unique chunks in original order, DedupeReport)
+    """
+    index = MinHashLSH(threshold=threshold, num_perm=num_perm, bands=bands)
+    unique = []
+    duplicates = {}
+
+    for i, chunk in enumerate(chunks):
+        hashes = shingle_hashes(chunk, shingle_size)
+        if hashes.size == 0:
+            unique.append(chunk)
+            continue
+
+        signature = index.signature(hashes)
+        match = index.query(signature)
+        if match is not None:
+            duplicates[i] = match
+            continue
+
+        index.insert(i, signature)
+        unique.append(chunk)
+
+    report = DedupeReport(
+        total_chunks=len(chunks),
+        unique_chunks=len(unique),
+        duplicate_chunks=len(duplicates),
+        duplicates=duplicates,
+    )
+    return unique, report
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional
+
+from .tracing import record_cache
+
+"""
+Disk-backed document store.
+Extracted text is stored once per unique document, compressed in fixed-size
+blocks, and read back through a memory map one block at a time. Callers keep
+only the document id and fetch previews and slices when they need them.
+"""
+
+DEFAULT_DOC_DIR = os.getenv("SCOPEAI_DOC_DIR", os.path.join(tempfile.gettempdir(), "scopeai_docs"))
+
+# File layout: MAGIC, index length (uint64), index JSON, then the compressed blocks
+MAGIC = b"SCD1"
+_HEADER = struct.Struct("<Q")
+
+# Number of document indexes kept in memory
+MAX_CACHED_INDEXES = 256
+
+
+def document_id(text: str) -> str:
+    """Return the content address of a document (SHA-256 of its UTF-8 text)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DocumentStore:
+    """Content-addressed store of block-compressed documents."""
+
+    def __init__(self, root: str = DEFAULT_DOC_DIR, block_chars: int = 64 * 1024, cache_blocks: int = 64):
+        """
+        Args:
+            root: Directory the documents are stored in
+            block_chars: Characters per compressed block (the unit of a read)
+            cache_blocks: Number of decompressed blocks kept in memory
+        """
+        self.root = root
+        self.block_chars = block_chars
+        self.cache_blocks = cache_blocks
+        self._indexes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._blocks: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, doc_id: str) -> str:
+        if not doc_id or not all(c in "0123456789abcdef" for c in doc_id):
+            raise ValueError(f"Invalid document id: {doc_id!r}")
+        return os.path.join(self.root, doc_id[:2], f"{doc_id}.scd")
+
+    def put(self, text: str) -> str:
+        """
+        Store a document, if it isn't stored already.
+
+        Args:
+            text: The document text
+
+        Returns:
+            The document id
+        """
+        doc_id = document_id(text)
+        path = self._path(doc_id)
+        exists = os.path.exists(path)
+        record_cache("doc_store", exists)
+        if exists:
+            return doc_id
+
+        blocks = []
+        offset = 0
+        index = {"length": len(text), "block_chars": self.block_chars, "blocks": []}
+        for start in range(0, len(text), self.block_chars):
+            data = zlib.compress(text[start:start + self.block_chars].encode("utf-8"), 6)
+            index["blocks"].append([offset, len(data)])
+            blocks.append(data)
+            offset += len(data)
+
+        index_data = json.dumps(index).encode("utf-8")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER.pack(len(index_data)))
+            f.write(index_data)
+            for data in blocks:
+                f.write(data)
+        # Concurrent writers of the same document produce identical files
+        os.replace(tmp_path, path)
+        return doc_id
+
+    def exists(self, doc_id: str) -> bool:
+        """Return True if the document is in the store."""
+        return os.path.exists(self._path(doc_id))
+
+    def _read_index(self, doc_id: str, mm: Optional[mmap.mmap] = None) -> Dict[str, Any]:
+        with self._lock:
+            index = self._indexes.get(doc_id)
+            if index is not None:
+                self._indexes.move_to_end(doc_id)
+                return index
+
+        if mm is None:
+            with open(self._path(doc_id), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return self._read_index(doc_id, mm)
+
+        if mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a ScopeAI document file: {doc_id}")
+        (index_size,) = _HEADER.unpack_from(mm, len(MAGIC))
+        data_start = len(MAGIC) + _HEADER.size
+        index = json.loads(mm[data_start:data_start + index_size].decode("utf-8"))
+        index["data_start"] = data_start + index_size
+
+        with self._lock:
+            self._indexes[doc_id] = index
+            while len(self._indexes) > MAX_CACHED_INDEXES:
+                self._indexes.popitem(last=False)
+        return index
+
+    def length(self, doc_id: str) -> int:
+        """Return the number of characters in a document."""
+        return self._read_index(doc_id)["length"]
+
+    def read_slice(self, doc_id: str, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Read a range of characters, decompressing only the blocks that cover it.
+
+        Args:
+            doc_id: The document id
+            start: First character offset
+            end: End offset (exclusive); None reads to the end of the document
+
+        Returns:
+            The text between start and end
+        """
+        index = self._read_index(doc_id)
+        block_chars = index["block_chars"]
+        end = index["length"] if end is None else min(end, index["length"])
+        start = max(start, 0)
+        if start >= end:
+            return ""
+
+        first, last = start // block_chars, (end - 1) // block_chars
+        parts = []
+        missing = []
+        with self._lock:
+            for i in range(first, last + 1):
+                block = self._blocks.get((doc_id, i))
+                if block is not None:
+                    self._blocks.move_to_end((doc_id, i))
+                parts.append(block)
+                if block is None:
+                    missing.append(i)
+
+        if missing:
+            with open(self._path(doc_id), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for i in missing:
+                    offset, size = index["blocks"][i]
+                    pos = index["data_start"] + offset
+                    parts[i - first] = zlib.decompress(mm[pos:pos + size]).decode("utf-8")
+
+            with self._lock:
+                for i in missing:
+                    self._blocks[(doc_id, i)] = parts[i - first]
+                while len(self._blocks) > self.cache_blocks:
+                    self._blocks.popitem(last=False)
+
+        text = "".join(parts)
+        offset = first * block_chars
+        return text[start - offset:end - offset]
+
+    def get(self, doc_id: str) -> str:
+        """Read a whole document."""
+        return self.read_slice(doc_id)
+
+    def preview(self, doc_id: str, max_chars: int = 3000) -> str:
+        """Return the start of a document, with "..." appended if it was cut."""
+        text = self.read_slice(doc_id, 0, max_chars)
+        return text + "..." if self.length(doc_id) > max_chars else text
+
+    def iter_slices(self, doc_id: str, size: int = 64 * 1024) -> Iterator[str]:
+        """
+        Read a document in consecutive slices.
+
+        Args:
+            doc_id: The document id
+            size: Characters per slice
+
+        Yields:
+            Slices of the document in order
+        """
+        length = self.length(doc_id)
+        for start in range(0, length, size):
+            yield self.read_slice(doc_id, start, start + size)
+
+    def delete(self, doc_id: str):
+        """Remove a document from the store."""
+        with self._lock:
+            self._indexes.pop(doc_id, None)
+            for key in [key for key in self._blocks if key[0] == doc_id]:
+                del self._blocks[key]
+        try:
+            os.remove(self._path(doc_id))
+        except FileNotFoundError:
+            pass
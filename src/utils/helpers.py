@@ -1,6 +1,14 @@
 import re
-import tiktoken
-from typing import List, Dict, Any, Optional
+import sys
+import functools
+import threading
+from typing import Callable, List, Dict, Any, Iterator, Optional, Tuple
+
+# Tokenizer cache, keyed by model name (tiktoken is imported on first use)
+_ENCODINGS = {}
+
+# Results kept per function by lazy_cache_data in the Streamlit app
+MAX_CACHED_RESULTS = 256
 
 def clean_text(text: str) -> str:
     """
@@ -24,53 +32,123 @@ def clean_text(text: str) -> str:
     
     return text
 
-def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
+def _skip_whitespace(text: str, pos: int) -> int:
+    """Return the index of the first non-whitespace character at or after pos"""
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+def iter_chunk_spans(text: str, chunk_size: int = 1000, overlap: int = 100) -> Iterator[Tuple[int, int]]:
     """
-    Split long text into overlapping chunks of specified size
+    Lazily split text into overlapping chunks, yielding character offsets
+    
+    Chunks end at a sentence boundary (., !, ? or newline) in the second half
+    of the window when possible, otherwise at a word boundary. No substrings
+    are created, so callers can slice only the chunks they actually need.
+    
+    Empty text yields no spans. Text made only of whitespace yields a single
+    empty span, so chunk_text still returns [""] for it as it always has.
     
     Args:
         text: The input text to chunk
         chunk_size: Maximum size of each chunk in characters
-        overlap: Number of characters to overlap between chunks
+        overlap: Approximate number of characters to overlap between chunks
+            (0 <= overlap < chunk_size). Each chunk still starts at least half
+            a chunk after the previous one, so large overlaps are capped.
         
-    Returns:
-        List of text chunks
+    Yields:
+        (start, end) offsets into the original text
+        
+    Raises:
+        ValueError: If chunk_size or overlap is out of range
     """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if not 0 <= overlap < chunk_size:
+        raise ValueError(f"overlap must be in [0, chunk_size), got {overlap} with chunk_size {chunk_size}")
     if not text:
-        return []
-    
-    text = clean_text(text)
+        return
     
-    # If text is shorter than chunk_size, return it as a single chunk
-    if len(text) <= chunk_size:
-        return [text]
+    length = len(text)
+    start = _skip_whitespace(text, 0)
+    if start == length:
+        yield 0, 0
+        return
     
-    chunks = []
-    start = 0
-    
-    while start < len(text):
+    while start < length:
         # Find the end position of the current chunk
         end = start + chunk_size
         
         # If we're not at the end of the text, try to find a good break point
-        if end < len(text):
-            # Look for natural break points (sentence endings, paragraphs)
-            breakpoint = text.rfind('.', start, end)
-            if breakpoint == -1 or breakpoint < start + chunk_size // 2:
-                breakpoint = text.rfind(' ', start, end)
-            
-            if breakpoint != -1 and breakpoint > start + chunk_size // 2:
+        if end < length:
+            half = start + chunk_size // 2
+            breakpoint = max(text.rfind(mark, half, end) for mark in ('.', '!', '?', '\n'))
+            if breakpoint == -1:
+                breakpoint = text.rfind(' ', half, end)
+            if breakpoint != -1:
                 end = breakpoint + 1
         else:
-            end = len(text)
+            end = length
+        
+        # Don't include trailing whitespace in the span
+        span_end = end
+        while span_end > start and text[span_end - 1].isspace():
+            span_end -= 1
+        yield start, span_end
         
-        # Add the chunk to our list
-        chunks.append(text[start:end])
+        if end >= length:
+            break
         
-        # Move start position accounting for overlap
-        start = end - overlap if end < len(text) else len(text)
+        # Move start back for the overlap, aligned to the next word, while still
+        # advancing by at least half a chunk so the number of chunks stays linear
+        next_start = max(end - overlap, start + max(1, (end - start) // 2))
+        if overlap > 0:
+            word_break = text.find(' ', next_start, end)
+            if word_break != -1:
+                next_start = word_break + 1
+        start = _skip_whitespace(text, next_start)
+
+def iter_chunks(text: str, chunk_size: int = 1000, overlap: int = 100) -> Iterator[str]:
+    """
+    Lazily yield overlapping chunks of text
     
-    return chunks
+    Args:
+        text: The input text to chunk
+        chunk_size: Maximum size of each chunk in characters
+        overlap: Approximate number of characters to overlap between chunks
+        
+    Yields:
+        Cleaned text chunks
+    """
+    for start, end in iter_chunk_spans(text, chunk_size, overlap):
+        yield clean_text(text[start:end])
+
+def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
+    """
+    Split long text into overlapping chunks of specified size
+    
+    Args:
+        text: The input text to chunk
+        chunk_size: Maximum size of each chunk in characters
+        overlap: Number of characters to overlap between chunks
+        
+    Returns:
+        List of text chunks
+    """
+    return list(iter_chunks(text, chunk_size, overlap))
+
+def _get_encoding(model: str):
+    """Return the (cached) tiktoken encoding for a model"""
+    encoding = _ENCODINGS.get(model)
+    if encoding is None:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Fall back to cl100k_base encoding if model-specific encoding not found
+            encoding = tiktoken.get_encoding("cl100k_base")
+        _ENCODINGS[model] = encoding
+    return encoding
 
 def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     """
@@ -86,13 +164,28 @@ def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     if not text:
         return 0
     
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        # Fall back to cl100k_base encoding if model-specific encoding not found
-        encoding = tiktoken.get_encoding("cl100k_base")
+    return len(_get_encoding(model).encode(text))
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "gpt-3.5-turbo") -> str:
+    """
+    Cut text down to at most max_tokens tokens
+    
+    Args:
+        text: The input text
+        max_tokens: Maximum number of tokens to keep
+        model: The model name to use for tokenization
+        
+    Returns:
+        The text, or its first max_tokens tokens if it is longer
+    """
+    if not text:
+        return ""
     
-    return len(encoding.encode(text))
+    encoding = _get_encoding(model)
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max(0, max_tokens)])
 
 def estimate_tokens_from_messages(messages: List[Dict[str, Any]], model: str = "gpt-3.5-turbo") -> int:
     """
@@ -122,4 +215,54 @@ def estimate_tokens_from_messages(messages: List[Dict[str, Any]], model: str = "
     # Add tokens for the model's reply format (approximately 3 tokens)
     token_count += 3
     
-    return token_count
\ No newline at end of file
+    return token_count
+
+def _streamlit_session_running() -> bool:
+    """Return True when called from a Streamlit script run (never imports Streamlit itself)"""
+    if "streamlit" not in sys.modules:
+        return False
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return False
+    return get_script_run_ctx() is not None
+
+def lazy_cache_data(func: Callable, max_entries: int = MAX_CACHED_RESULTS) -> Callable:
+    """
+    Decorate a function with Streamlit's st.cache_data, but only inside a running Streamlit app
+    
+    Batch runs, job workers and NLP pool processes call the function directly,
+    so they never import Streamlit or keep every result for the life of the process.
+    
+    Args:
+        func: The function to cache
+        max_entries: Maximum number of results st.cache_data keeps
+        
+    Returns:
+        Wrapped function
+    """
+    from .tracing import record_cache
+    
+    cached = None
+    # Set when the cache misses and the wrapped function actually runs
+    state = threading.local()
+    
+    def compute(*args, **kwargs):
+        state.missed = True
+        return func(*args, **kwargs)
+    functools.update_wrapper(compute, func)
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal cached
+        if not _streamlit_session_running():
+            return func(*args, **kwargs)
+        if cached is None:
+            import streamlit as st
+            cached = st.cache_data(compute, max_entries=max_entries)
+        state.missed = False
+        result = cached(*args, **kwargs)
+        record_cache(func.__name__, not state.missed)
+        return result
+    
+    return wrapper
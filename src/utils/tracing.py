@@ -0,0 +1,449 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+"""
+Lightweight tracing and metrics.
+Timing spans around parser and LLM stages, LLM token accounting and cache
+hit/miss counters. Spans are collected into per-request traces (exported as
+JSON) and aggregated into process-wide metrics (exported in Prometheus text
+format to a file or a local HTTP endpoint). Work done in job and NLP worker
+processes is run through capture_telemetry, and its spans and metrics are
+merged back into the calling process with merge_telemetry.
+"""
+
+# Histogram buckets for stage durations, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_current_trace = contextvars.ContextVar("scopeai_trace", default=None)
+
+
+class Trace:
+    """Spans and token counts for a single request."""
+
+    def __init__(self, request_id: Optional[str] = None, **attributes):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.attributes = attributes
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self.tokens = {"prompt": 0, "completion": 0}
+        self._lock = threading.Lock()
+
+    def add_span(self, span: Dict[str, Any]):
+        with self._lock:
+            self.spans.append(span)
+
+    def add_tokens(self, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.tokens["prompt"] += prompt_tokens
+            self.tokens["completion"] += completion_tokens
+
+    def merge(self, telemetry: Dict[str, Any]):
+        """Add the spans and token counts captured in another process (see capture_telemetry)."""
+        for span in telemetry.get("spans", []):
+            self.add_span(span)
+        tokens = telemetry.get("tokens") or {}
+        self.add_tokens(tokens.get("prompt", 0), tokens.get("completion", 0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "request_id": self.request_id,
+                "attributes": dict(self.attributes),
+                "started_at": self.started_at,
+                "tokens": dict(self.tokens),
+                "spans": sorted(self.spans, key=lambda s: s["start"]),
+            }
+
+    def write_json(self, path: str):
+        """Write the trace to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+
+class MetricsRegistry:
+    """Thread-safe process-wide counters and duration histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple], Dict[str, Any]] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> Tuple[str, Tuple]:
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, value: float = 1, help_text: str = "", **labels):
+        """Increment a counter."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._help.setdefault(name, ("counter", help_text))
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, help_text: str = "", **labels):
+        """Record a value in a histogram."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._help.setdefault(name, ("histogram", help_text))
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": [0] * len(DURATION_BUCKETS), "count": 0, "sum": 0.0}
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    hist["buckets"][i] += 1
+            hist["count"] += 1
+            hist["sum"] += value
+
+    def drain(self) -> Dict[str, Any]:
+        """
+        Take every recorded value, leaving the registry empty.
+
+        Returns:
+            JSON-serializable counters and histograms, to be passed to merge()
+            in another process
+        """
+        with self._lock:
+            data = {
+                "help": {name: list(entry) for name, entry in self._help.items()},
+                "counters": [[name, [list(label) for label in labels], value]
+                             for (name, labels), value in self._counters.items()],
+                "histograms": [[name, [list(label) for label in labels], hist]
+                               for (name, labels), hist in self._histograms.items()],
+            }
+            self._counters = {}
+            self._histograms = {}
+        return data
+
+    def merge(self, data: Dict[str, Any]):
+        """Add counters and histograms drained from another registry."""
+        with self._lock:
+            for name, (kind, help_text) in data.get("help", {}).items():
+                self._help.setdefault(name, (kind, help_text))
+            for name, labels, value in data.get("counters", []):
+                key = (name, tuple(tuple(label) for label in labels))
+                self._counters[key] = self._counters.get(key, 0) + value
+            for name, labels, other in data.get("histograms", []):
+                key = (name, tuple(tuple(label) for label in labels))
+                hist = self._histograms.get(key)
+                if hist is None:
+                    hist = self._histograms[key] = {"buckets": [0] * len(DURATION_BUCKETS), "count": 0, "sum": 0.0}
+                hist["buckets"] = [a + b for a, b in zip(hist["buckets"], other["buckets"])]
+                hist["count"] += other["count"]
+                hist["sum"] += other["sum"]
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def cache_hit_rates(self) -> Dict[str, float]:
+        """Hit rate of every cache that recorded at least one lookup."""
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                if name != "scopeai_cache_requests_total":
+                    continue
+                labels = dict(labels)
+                entry = totals.setdefault(labels["cache"], [0, 0])
+                entry[0 if labels["result"] == "hit" else 1] += value
+        return {cache: hits / (hits + misses) for cache, (hits, misses) in totals.items() if hits + misses}
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        def fmt_labels(labels: Tuple, extra: Tuple = ()) -> str:
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in sorted(self._help.items()):
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for (metric, labels), value in sorted(self._counters.items()):
+                        if metric == name:
+                            lines.append(f"{name}{fmt_labels(labels)} {value}")
+                else:
+                    for (metric, labels), hist in sorted(self._histograms.items()):
+                        if metric != name:
+                            continue
+                        for bound, count in zip(DURATION_BUCKETS, hist["buckets"]):
+                            lines.append(f"{name}_bucket{fmt_labels(labels, (('le', str(bound)),))} {count}")
+                        lines.append(f"{name}_bucket{fmt_labels(labels, (('le', '+Inf'),))} {hist['count']}")
+                        lines.append(f"{name}_sum{fmt_labels(labels)} {hist['sum']}")
+                        lines.append(f"{name}_count{fmt_labels(labels)} {hist['count']}")
+
+        hit_rates = self.cache_hit_rates()
+        if hit_rates:
+            lines.append("# HELP scopeai_cache_hit_ratio Fraction of cache lookups that were hits")
+            lines.append("# TYPE scopeai_cache_hit_ratio gauge")
+            for cache, rate in sorted(hit_rates.items()):
+                lines.append(f'scopeai_cache_hit_ratio{{cache="{cache}"}} {rate}')
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+METRICS = MetricsRegistry()
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace active in the current context, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def activate(trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+    """Make trace the active trace for the duration of the block."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def start_trace(request_id: Optional[str] = None, **attributes) -> Iterator[Trace]:
+    """
+    Start a new trace and make it active for the duration of the block.
+
+    Args:
+        request_id: Optional id for the request (random by default)
+        **attributes: Extra attributes stored on the trace (e.g. source type)
+
+    Yields:
+        The new Trace
+    """
+    with activate(Trace(request_id, **attributes)) as trace:
+        yield trace
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Dict[str, Any]]:
+    """
+    Time a block of work as a named stage.
+
+    The duration is added to the scopeai_stage_duration_seconds histogram and,
+    if a trace is active, recorded as a span on it. Attributes can be added to
+    the yielded dict inside the block.
+
+    Args:
+        name: Stage name, e.g. "parser.pdf" or "llm.openai"
+        **attributes: Extra attributes recorded on the span
+
+    Yields:
+        The span's attribute dictionary
+    """
+    start_wall = time.time()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        METRICS.observe("scopeai_stage_duration_seconds", duration,
+                        help_text="Time spent in each pipeline stage", stage=name)
+        if error:
+            METRICS.inc("scopeai_stage_errors_total", help_text="Stage failures", stage=name)
+
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span({
+                "name": name,
+                "start": start_wall,
+                "duration_ms": round(duration * 1000, 3),
+                "thread": threading.current_thread().name,
+                "attributes": attributes,
+                "error": error,
+            })
+
+
+def traced(name: str) -> Callable:
+    """Decorator that wraps every call of a function in a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Bind func to the current context so spans recorded in worker threads
+    attach to the caller's trace.
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Each call needs its own copy: a context can't be entered by two threads at once
+        return ctx.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def capture_telemetry(func: Callable, *args, **kwargs) -> Dict[str, Any]:
+    """
+    Run func in a worker process, capturing what it records for the calling process.
+
+    Only use this in worker processes: it drains the process-wide METRICS, so
+    everything recorded there since the last call (including model loading at
+    worker start) is handed back exactly once.
+
+    Args:
+        func: Function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Dictionary with "result" (or "error", the exception func raised) and
+        "telemetry", the spans, token counts and metrics to pass to merge_telemetry
+    """
+    with start_trace() as trace:
+        try:
+            outcome = {"result": func(*args, **kwargs)}
+        except Exception as e:
+            outcome = {"error": e}
+    data = trace.to_dict()
+    outcome["telemetry"] = {"spans": data["spans"], "tokens": data["tokens"], "metrics": METRICS.drain()}
+    return outcome
+
+
+def merge_telemetry(telemetry: Optional[Dict[str, Any]], trace: Optional[Trace] = None):
+    """
+    Add telemetry captured in a worker process to this process's metrics and trace.
+
+    Args:
+        telemetry: The "telemetry" of a capture_telemetry outcome (None is ignored)
+        trace: Trace the spans and tokens are added to (defaults to the active trace)
+    """
+    if not telemetry:
+        return
+    METRICS.merge(telemetry.get("metrics") or {})
+    trace = trace or _current_trace.get()
+    if trace is not None:
+        trace.merge(telemetry)
+
+
+def unwrap_telemetry(outcome: Dict[str, Any], trace: Optional[Trace] = None) -> Any:
+    """
+    Merge the telemetry of a capture_telemetry outcome and return its result.
+
+    Args:
+        outcome: Value returned by capture_telemetry
+        trace: Trace the spans and tokens are added to (defaults to the active trace)
+
+    Returns:
+        The result of the captured call
+
+    Raises:
+        Exception: The exception the captured call raised
+    """
+    merge_telemetry(outcome["telemetry"], trace)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def record_tokens(stage: str, prompt_tokens: int, completion_tokens: int):
+    """
+    Record LLM token usage for a stage.
+
+    Args:
+        stage: Stage that made the request, e.g. "summarize"
+        prompt_tokens: Tokens sent to the model
+        completion_tokens: Tokens generated by the model
+    """
+    help_text = "LLM tokens by stage and kind"
+    METRICS.inc("scopeai_llm_tokens_total", prompt_tokens, help_text, stage=stage, kind="prompt")
+    METRICS.inc("scopeai_llm_tokens_total", completion_tokens, help_text, stage=stage, kind="completion")
+    METRICS.inc("scopeai_llm_requests_total", help_text="LLM requests by stage", stage=stage)
+
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_tokens(prompt_tokens, completion_tokens)
+
+
+def record_usage(stage: str, response: Any, messages: List[Dict[str, Any]], model: str = "gpt-3.5-turbo"):
+    """
+    Record token usage for an OpenAI chat completion response.
+
+    Uses the response's usage field when present, otherwise estimates the
+    counts with tiktoken.
+
+    Args:
+        stage: Stage that made the request
+        response: Chat completion response
+        messages: Messages sent in the request
+        model: Model name used for estimation
+    """
+    usage = getattr(response, "usage", None)
+    if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+        record_tokens(stage, usage.prompt_tokens, usage.completion_tokens or 0)
+        return
+
+    from .helpers import count_tokens, estimate_tokens_from_messages
+    content = response.choices[0].message.content if getattr(response, "choices", None) else ""
+    record_tokens(stage, estimate_tokens_from_messages(messages, model), count_tokens(content or "", model))
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup as a hit or a miss."""
+    METRICS.inc("scopeai_cache_requests_total", help_text="Cache lookups by result",
+                cache=cache, result="hit" if hit else "miss")
+
+
+def write_prometheus(path: str):
+    """Write the current metrics to a file in Prometheus text format (e.g. for node_exporter's textfile collector)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(METRICS.render_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = METRICS.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_metrics_server(port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve /metrics in Prometheus text format from a background thread.
+
+    Args:
+        port: Port to listen on
+        host: Interface to bind
+
+    Returns:
+        The running HTTP server
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="scopeai-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,12 @@
+import pytest
+
+from src.utils.helpers import count_tokens
+
+
+@pytest.fixture
+def tokenizer():
+    """Skip tests that count tokens when the tiktoken encoding can't be loaded (e.g. offline)."""
+    try:
+        count_tokens("warm up")
+    except Exception as e:
+        pytest.skip(f"tiktoken encoding unavailable: {e}")
@@ -0,0 +1,97 @@
+import pytest
+
+from src.llm.answer_cache import SemanticAnswerCache, _stem, normalize_question, question_terms, similarity
+
+
+@pytest.fixture
+def cache():
+    return SemanticAnswerCache(threshold=0.8)
+
+
+@pytest.mark.parametrize("forms", [
+    ("price", "prices", "priced", "pricing"),
+    ("plan", "plans", "planned", "planning"),
+    ("announce", "announced", "announcing", "announces"),
+    ("policy", "policies"),
+    ("tax", "taxes"),
+])
+def test_stem_is_consistent_across_forms(forms):
+    assert len({_stem(word) for word in forms}) == 1
+
+
+def test_question_terms_keep_question_words_and_negations():
+    assert question_terms("Who announced the budget?") == {"who", _stem("announced"), "budget"}
+    assert "not" in question_terms("Isn't the deal approved?")
+    assert question_terms("Isn't the deal approved?") == question_terms("Is the deal not approved?")
+
+
+def test_normalize_question_keeps_word_order():
+    assert normalize_question("Who  announced the Budget?") == "who announced the budget"
+    assert normalize_question("Who announced the budget?") != normalize_question("The budget announced who?")
+
+
+def test_rewording_hits(cache):
+    cache.store("doc", "What are the prices of the new tickets?", "Ten euros.")
+
+    assert cache.lookup("doc", "What is the price of the new ticket?") == "Ten euros."
+    assert cache.lookup("doc", "what are the prices of the new tickets") == "Ten euros."
+    assert cache.stats()["exact_hits"] == 1
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_different_question_words_do_not_collide(cache):
+    cache.store("doc", "Who announced the budget?", "The mayor.")
+
+    assert cache.lookup("doc", "When was the budget announced?") is None
+    assert cache.lookup("doc", "Who announced the budget?") == "The mayor."
+
+
+def test_negation_does_not_collide(cache):
+    cache.store("doc", "Is the deal approved?", "Yes.")
+
+    assert similarity(question_terms("Is the deal approved?"), question_terms("Is the deal not approved?")) >= 0.8
+    assert cache.lookup("doc", "Is the deal not approved?") is None
+    assert cache.lookup("doc", "Isn't the deal approved?") is None
+
+
+def test_questions_with_same_terms_do_not_overwrite(cache):
+    cache.store("doc", "Who announced the budget?", "The mayor.")
+    cache.store("doc", "When was the budget announced?", "On Monday.")
+
+    assert cache.lookup("doc", "Who announced the budget?") == "The mayor."
+    assert cache.lookup("doc", "When was the budget announced?") == "On Monday."
+    assert cache.stats()["entries"] == 2
+
+
+def test_answers_are_per_document(cache):
+    cache.store("doc-a", "Who announced the budget?", "The mayor.")
+    assert cache.lookup("doc-b", "Who announced the budget?") is None
+
+
+def test_lru_eviction():
+    cache = SemanticAnswerCache(max_documents=2, max_answers_per_document=2)
+    cache.store("a", "Who won?", "A")
+    cache.store("a", "Who lost?", "B")
+    cache.lookup("a", "Who won?")
+    cache.store("a", "Who played?", "C")
+
+    assert cache.lookup("a", "Who lost?") is None
+    assert cache.lookup("a", "Who won?") == "A"
+
+    cache.store("b", "Who won?", "B1")
+    cache.lookup("a", "Who won?")
+    cache.store("c", "Who won?", "C1")
+    assert cache.lookup("b", "Who won?") is None
+    assert cache.lookup("a", "Who won?") == "A"
+
+    stats = cache.stats()
+    assert stats["documents"] == 2
+    assert stats["evictions"] == 2
+    assert 0 < stats["hit_rate"] < 1
+
+
+def test_clear(cache):
+    cache.store("doc", "Who won?", "A")
+    cache.clear()
+    assert cache.lookup("doc", "Who won?") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("tenacity")
+
+from src.llm import answer_followup
+from src.llm.answer_followup import (
+    ANSWER_CACHE, answer_followup_question, answer_followup_questions, document_hash, get_cached_answer,
+)
+
+TEXT = ("The city council approved the new budget on Monday. "
+        "Spending on public transport rises by ten percent. "
+        "The mayor announced the budget at a press conference.")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    ANSWER_CACHE.clear()
+    yield
+    ANSWER_CACHE.clear()
+
+
+def test_answers_are_cached_by_document_id():
+    answer = answer_followup_question("What does spending on public transport do?", TEXT, backend="local")
+
+    assert "public transport" in answer
+    doc_id = document_hash(TEXT)
+    assert get_cached_answer("What does spending on public transport do?", doc_id, backend="local") == answer
+    assert get_cached_answer("What does spending on public transport do?", "0" * 64, backend="local") is None
+
+
+def test_given_doc_id_skips_hashing(monkeypatch):
+    def fail(text):
+        raise AssertionError("document text hashed despite doc_id")
+
+    monkeypatch.setattr(answer_followup, "document_hash", fail)
+    answer_followup_question("Who announced the budget?", TEXT, backend="local", doc_id="abc123")
+    answers = answer_followup_questions(["Who announced the budget?", "When was the budget approved?"], TEXT,
+                                        backend="local", doc_id="abc123")
+    assert set(answers) == {"Who announced the budget?", "When was the budget approved?"}
+
+
+def test_batch_hashes_the_document_once(monkeypatch):
+    calls = []
+
+    def counting_hash(text):
+        calls.append(text)
+        return "feed"
+
+    monkeypatch.setattr(answer_followup, "document_hash", counting_hash)
+    answer_followup_questions(["Who announced the budget?", "How much does transport spending rise?",
+                               "When was the budget approved?"], TEXT, backend="local")
+    assert len(calls) == 1
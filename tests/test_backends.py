@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+pytest.importorskip("tenacity")
+
+from src.llm.backends import AUTO, LOCAL, FallbackBackend, LocalBackend, OpenAIBackend, get_backend
+from src.utils.helpers import count_tokens
+
+TEXT = " ".join(f"Sentence number {i} talks about the harbour budget and the ferry timetable." for i in range(40))
+
+
+class _Primary:
+    name = "primary"
+
+    def __init__(self, error=None):
+        self.error = error
+        self.threads = []
+
+    def answer(self, question, text):
+        self.threads.append(threading.current_thread())
+        if self.error:
+            raise self.error
+        return "from primary"
+
+
+class _Fallback:
+    name = "fallback"
+
+    def answer(self, question, text):
+        return "from fallback"
+
+
+def test_fallback_calls_primary_in_the_caller_thread():
+    primary = _Primary()
+    backend = FallbackBackend(primary, _Fallback())
+    assert backend.answer("q", "t") == "from primary"
+    assert backend.served_by() == "primary"
+    assert primary.threads == [threading.current_thread()]
+
+
+def test_fallback_on_primary_error():
+    primary = _Primary(TimeoutError("Request timed out"))
+    backend = FallbackBackend(primary, _Fallback())
+    assert backend.answer("q", "t") == "from fallback"
+    assert backend.served_by() == "fallback"
+    assert len(primary.threads) == 1
+
+
+def test_fallback_without_primary():
+    backend = FallbackBackend(None, _Fallback())
+    assert backend.answer("q", "t") == "from fallback"
+    assert backend.served_by() == "fallback"
+
+
+def test_local_summary_honors_compression_ratio(tokenizer):
+    backend = LocalBackend(summary_tokens=300)
+    full = backend.summarize(TEXT)
+    short = backend.summarize(TEXT, compression_ratio=0.05)
+    assert count_tokens(short) <= max(1, int(count_tokens(TEXT) * 0.05)) * 2
+    assert len(short) < len(full)
+
+
+def test_auto_primary_does_not_retry(monkeypatch):
+    pytest.importorskip("openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    backend = get_backend(AUTO)
+    assert backend.primary.attempts == 1
+    assert backend.primary.client.max_retries == 0
+    assert backend.primary.client.timeout is not None
+    assert get_backend(LOCAL).name == LOCAL
+
+
+def test_auto_accepts_timeout_and_attempts(monkeypatch):
+    pytest.importorskip("openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    backend = get_backend(AUTO, timeout=5, attempts=2)
+    assert backend.primary.client.timeout == 5
+    assert backend.primary.attempts == 2
+
+
+def test_single_attempt_raises_first_error(monkeypatch):
+    pytest.importorskip("openai")
+    backend = OpenAIBackend(api_key="sk-test", attempts=1)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(backend.client.chat.completions, "create", create)
+    with pytest.raises(ConnectionError):
+        backend.chat([{"role": "user", "content": "hi"}], max_tokens=5, stage="test")
+    assert len(calls) == 1
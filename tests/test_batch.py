@@ -0,0 +1,61 @@
+import json
+import threading
+
+from src.batch import BatchRunner, load_checkpoint
+
+
+class _Backend:
+    def summarize(self, text, compression_ratio=None):
+        return text
+
+
+def _runner(tmp_path, **kwargs):
+    runner = BatchRunner(str(tmp_path / "out.jsonl"), index_path=str(tmp_path / "index.sqlite3"),
+                         workers={stage: 1 for stage in ("extract", "summarize", "analyze", "insights")},
+                         queue_size=1, **kwargs)
+    runner._llm = _Backend()
+    runner._extract = lambda record: record.update(text=record["source"])
+    runner._analyze = lambda record: record.update(entities={"ORG": ["Acme"]})
+    runner._insights = lambda record: record.update(insights={"topics": ["Finance"]})
+    return runner
+
+
+def _run(runner, count):
+    items = [{"id": str(i), "type": "news", "source": f"text {i}"} for i in range(count)]
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(runner.run(items)), daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "batch run did not finish"
+    return result
+
+
+def test_run_writes_and_indexes(tmp_path):
+    runner = _runner(tmp_path)
+    stats = _run(runner, 3)
+    assert stats["written"] == 3 and stats["errors"] == 0 and stats["index_errors"] == 0
+    assert load_checkpoint(runner.checkpoint_path) == {"0", "1", "2"}
+    assert len(runner._index.search(entities=["acme"])) == 3
+
+
+def test_index_failure_does_not_stop_the_writer(tmp_path):
+    runner = _runner(tmp_path)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    runner._index.add_document = fail
+    stats = _run(runner, 5)
+    assert stats["written"] == 5 and stats["index_errors"] == 5
+    with open(runner.output_path, encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 5
+
+
+def test_bad_record_does_not_stop_the_writer(tmp_path):
+    runner = _runner(tmp_path)
+    # A value json can't serialize fails the write of that record only
+    runner._insights = lambda record: record.update(
+        insights={"topics": ["Finance"], "bad": object()} if record["id"] == "1" else {"topics": ["Finance"]})
+    stats = _run(runner, 4)
+    assert stats["written"] == 3 and stats["errors"] == 1
+    assert load_checkpoint(runner.checkpoint_path) == {"0", "2", "3"}
@@ -0,0 +1,60 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.run import _percentile
+from benchmarks.stub_server import StubConfig, StubServer
+
+
+def _post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(10, 0, -1)]
+    assert _percentile(values, 50) == 5.0
+    assert _percentile(values, 90) == 9.0
+    assert _percentile(values, 99) == 10.0
+    assert _percentile(values, 100) == 10.0
+    assert _percentile(values, 0) == 1.0
+    assert _percentile(values, 10) == 1.0
+    assert _percentile(values, 20) == 2.0
+    assert _percentile([3.0], 99) == 3.0
+
+
+def test_stub_completion():
+    with StubServer(StubConfig(latency=0, summary_words=3)) as server:
+        status, body = _post(server.base_url + "/chat/completions",
+                             {"model": "m", "messages": [{"role": "user", "content": "one two three four"}]})
+        assert status == 200
+        assert body["choices"][0]["message"]["content"] == "two three four"
+        assert body["usage"]["completion_tokens"] == 3
+        assert _post(server.url + "/v1/embeddings", {})[0] == 404
+
+
+def test_stub_injects_error_rates():
+    requests = 400
+    config = StubConfig(latency=0, error_rate=0.2, rate_limit_rate=0.1, seed=1)
+    with StubServer(config) as server:
+        statuses = [_post(server.base_url + "/chat/completions", {"messages": []})[0] for _ in range(requests)]
+        stats = server.stats
+
+    assert stats == {"requests": requests, "errors": statuses.count(500), "rate_limited": statuses.count(429)}
+    assert statuses.count(429) / requests == pytest.approx(0.1, abs=0.05)
+    assert statuses.count(500) / requests == pytest.approx(0.2, abs=0.06)
+    assert set(statuses) == {200, 429, 500}
+
+
+def test_stub_serves_fixtures():
+    with StubServer(StubConfig(latency=0)) as server:
+        url = server.add_fixture("article.html", "<html><body>Hello</body></html>")
+        with urllib.request.urlopen(url, timeout=10) as response:
+            assert b"Hello" in response.read()
@@ -0,0 +1,53 @@
+import pytest
+
+from src.utils.corpus_index import ENTITY, TOPIC, CorpusIndex, normalize_term
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = CorpusIndex(str(tmp_path / "index.sqlite3"))
+    index.add_document("a", {"ORG": ["Acme Corp"], "PERSON": ["Jane Doe"]}, ["Finance"], source="a.pdf",
+                       indexed_at=100)
+    index.add_document("b", {"ORG": ["acme  corp"]}, ["Finance", "Technology"], indexed_at=200)
+    index.add_document("c", {"PERSON": ["Jane Doe"]}, ["Sports"], indexed_at=300)
+    return index
+
+
+def test_normalize_term():
+    assert normalize_term("  Acme\n Corp ") == "acme corp"
+
+
+def test_search_intersects_terms(index):
+    assert [d["doc_key"] for d in index.search(entities=["ACME CORP"])] == ["b", "a"]
+    assert [d["doc_key"] for d in index.search(entities=["Acme Corp"], topics=["Technology"])] == ["b"]
+    assert [d["doc_key"] for d in index.search(entities=["Acme Corp", "Jane Doe"])] == ["a"]
+    assert index.search(entities=["Nobody"]) == []
+
+
+def test_search_date_range(index):
+    assert [d["doc_key"] for d in index.search(since=200)] == ["c", "b"]
+    assert [d["doc_key"] for d in index.search(topics=["finance"], until=200)] == ["a"]
+    assert index.search(entities=["Acme Corp"], since=250) == []
+
+
+def test_add_document_replaces_postings(index):
+    index.add_document("a", {"ORG": ["Globex"]}, [], indexed_at=100)
+    assert [d["doc_key"] for d in index.search(entities=["Acme Corp"])] == ["b"]
+    assert [d["doc_key"] for d in index.search(entities=["Globex"])] == ["a"]
+    assert index.stats()["documents"] == 3
+
+
+def test_co_occurrences(index):
+    assert index.co_occurrences("Finance", kind=TOPIC, with_kind=ENTITY) == [
+        (ENTITY, "Acme Corp", 2), (ENTITY, "Jane Doe", 1)]
+    assert index.co_occurrences("Jane Doe", with_kind=TOPIC, since=250) == [(TOPIC, "Sports", 1)]
+    assert index.co_occurrences("Nobody") == []
+
+
+def test_top_terms(index):
+    assert index.top_terms(TOPIC, k=1) == [("Finance", 2)]
+    assert index.top_terms(ENTITY, until=150) == [("Acme Corp", 1), ("Jane Doe", 1)]
+
+
+def test_stats(index):
+    assert index.stats() == {"documents": 3, "terms": 5, "postings": 8}
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from src.utils.dedupe import MinHashLSH, dedupe_chunks, shingle_hashes
+
+
+def paragraph(topic: str, n: int = 60) -> str:
+    return " ".join(f"{topic} word{i}" for i in range(n))
+
+
+SPONSOR = ("This episode is brought to you by Acme VPN. Protect your browsing today "
+           "and get three months free with the code SCOPE at checkout.")
+
+
+def test_shingle_hashes_are_unique_and_case_insensitive():
+    hashes = shingle_hashes("A b c d e A B C D E", shingle_size=5)
+    assert len(hashes) == len(set(hashes.tolist()))
+    assert set(hashes.tolist()) == set(shingle_hashes("a b c d e a b c d e").tolist())
+    assert shingle_hashes("").size == 0
+
+
+def test_signature_of_identical_sets_matches():
+    index = MinHashLSH()
+    hashes = shingle_hashes(paragraph("alpha"))
+    assert np.array_equal(index.signature(hashes), index.signature(hashes.copy()))
+
+
+def test_num_perm_must_divide_into_bands():
+    with pytest.raises(ValueError):
+        MinHashLSH(num_perm=64, bands=10)
+
+
+def test_dedupe_drops_exact_and_near_duplicates():
+    # One word changed in a long chunk keeps most of its shingles
+    near = paragraph("alpha", 100).replace("word50", "wordfifty")
+    chunks = [SPONSOR, paragraph("alpha", 100), near, paragraph("beta"), SPONSOR]
+
+    unique, report = dedupe_chunks(chunks, threshold=0.8)
+
+    assert unique == [SPONSOR, paragraph("alpha", 100), paragraph("beta")]
+    assert report.total_chunks == 5
+    assert report.unique_chunks == 3
+    assert report.duplicate_chunks == 2
+    assert report.duplicates == {2: 1, 4: 0}
+
+
+def test_dedupe_keeps_distinct_and_empty_chunks():
+    chunks = [paragraph("alpha"), "", paragraph("beta"), "  ", paragraph("gamma")]
+
+    unique, report = dedupe_chunks(chunks)
+
+    assert unique == chunks
+    assert report.duplicates == {}
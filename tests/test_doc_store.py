@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from src.utils.doc_store import DocumentStore, document_id
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DocumentStore(str(tmp_path / "docs"), block_chars=1000, cache_blocks=4)
+
+
+def make_text(n: int) -> str:
+    rng = random.Random(n)
+    words = ["alpha", "beta", "gamma", "délta", "ε", "日本", "\n", "."]
+    return " ".join(rng.choice(words) for _ in range(n))
+
+
+def test_round_trip(store):
+    text = make_text(5000)
+    doc_id = store.put(text)
+
+    assert doc_id == document_id(text)
+    assert store.exists(doc_id)
+    assert store.length(doc_id) == len(text)
+    assert store.get(doc_id) == text
+    assert "".join(store.iter_slices(doc_id, size=777)) == text
+
+
+def test_random_slices_match(store):
+    text = make_text(5000)
+    doc_id = store.put(text)
+    rng = random.Random(0)
+
+    for _ in range(200):
+        start = rng.randrange(-10, len(text) + 10)
+        end = rng.randrange(start, len(text) + 20)
+        assert store.read_slice(doc_id, start, end) == text[max(start, 0):end]
+    assert store.read_slice(doc_id, 50, 10) == ""
+
+
+def test_put_is_idempotent_and_content_addressed(store):
+    first = store.put("same text")
+    assert store.put("same text") == first
+    assert store.put("other text") != first
+
+
+def test_preview(store):
+    doc_id = store.put("x" * 50)
+    assert store.preview(doc_id, max_chars=10) == "x" * 10 + "..."
+    assert store.preview(doc_id, max_chars=100) == "x" * 50
+
+
+def test_empty_document(store):
+    doc_id = store.put("")
+    assert store.length(doc_id) == 0
+    assert store.get(doc_id) == ""
+
+
+def test_reads_survive_a_new_store_instance(store):
+    text = make_text(3000)
+    doc_id = store.put(text)
+    assert DocumentStore(store.root).get(doc_id) == text
+
+
+def test_delete(store):
+    doc_id = store.put(make_text(3000))
+    store.get(doc_id)
+    store.delete(doc_id)
+
+    assert not store.exists(doc_id)
+    with pytest.raises(FileNotFoundError):
+        store.get(doc_id)
+    store.delete(doc_id)
+
+
+@pytest.mark.parametrize("doc_id", ["", "../etc/passwd", "ABC"])
+def test_invalid_ids_are_rejected(store, doc_id):
+    with pytest.raises(ValueError):
+        store.exists(doc_id)
@@ -0,0 +1,52 @@
+from src.llm.extractive import compress_text, split_sentences
+
+
+TEXT = " ".join([
+    "The central bank raised interest rates by half a point on Tuesday.",
+    "Um, the weather was mild.",
+    "Higher interest rates make mortgages and business loans more expensive.",
+    "Thanks for listening to the show.",
+    "Analysts expect the bank to raise rates again before the end of the year.",
+    "Thanks for listening to the show.",
+    "Mortgage demand has already fallen as rates climbed.",
+    "A local bakery won a prize.",
+])
+
+
+def test_split_sentences_drops_fillers():
+    assert split_sentences("Um, the bank met. Uh\nRates rose!") == ["the bank met.", "Rates rose!"]
+
+
+def test_compress_text_unchanged_at_full_ratio(tokenizer):
+    result = compress_text(TEXT, ratio=1.0)
+    assert result.text == TEXT
+    assert result.kept_ratio == 1.0
+
+
+def test_compress_text_keeps_short_texts(tokenizer):
+    text = "One sentence. Two sentences. Three sentences."
+    assert compress_text(text, ratio=0.1).text == text
+
+
+def test_compress_text_within_budget_and_in_order(tokenizer):
+    sentences = split_sentences(TEXT)
+    result = compress_text(TEXT, ratio=0.5)
+
+    assert result.original_tokens > 0
+    assert result.kept_tokens <= result.original_tokens * 0.5
+    assert result.total_sentences == len(sentences)
+    assert 0 < result.kept_sentences < len(sentences)
+
+    kept = split_sentences(result.text)
+    positions = [sentences.index(sentence) for sentence in kept]
+    assert positions == sorted(positions)
+
+
+def test_compress_text_drops_repeated_sentences(tokenizer):
+    result = compress_text(TEXT, ratio=0.9)
+    assert result.text.count("Thanks for listening to the show.") <= 1
+
+
+def test_compress_text_budget_tokens_overrides_ratio(tokenizer):
+    result = compress_text(TEXT, ratio=1.0, budget_tokens=20)
+    assert result.kept_tokens < result.original_tokens
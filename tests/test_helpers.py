@@ -0,0 +1,84 @@
+import sys
+
+import pytest
+
+from src.utils.helpers import chunk_text, clean_text, iter_chunk_spans, lazy_cache_data, truncate_tokens
+
+
+TEXT = " ".join(f"Sentence number {i} talks about topic {i % 7}." for i in range(300))
+
+
+def test_spans_cover_text_in_order():
+    spans = list(iter_chunk_spans(TEXT, chunk_size=500, overlap=0))
+
+    assert spans[0][0] == 0
+    assert spans[-1][1] == len(TEXT)
+    for start, end in spans:
+        assert 0 < end - start <= 500
+        assert not TEXT[start].isspace() and not TEXT[end - 1].isspace()
+    # Without overlap, chunks are contiguous apart from the whitespace between them
+    for (_, end), (next_start, _) in zip(spans, spans[1:]):
+        assert TEXT[end:next_start].strip() == ""
+
+
+def test_spans_break_at_sentence_ends():
+    for start, end in list(iter_chunk_spans(TEXT, chunk_size=500, overlap=0))[:-1]:
+        assert TEXT[end - 1] == "."
+
+
+def test_spans_overlap_starts_at_a_word():
+    spans = list(iter_chunk_spans(TEXT, chunk_size=500, overlap=100))
+
+    for (_, end), (next_start, _) in zip(spans, spans[1:]):
+        assert next_start < end
+        assert TEXT[next_start - 1] == " "
+
+
+def test_large_overlap_still_advances():
+    spans = list(iter_chunk_spans(TEXT, chunk_size=500, overlap=499))
+
+    # Every chunk starts at least a quarter chunk after the previous one
+    assert len(spans) <= 4 * len(TEXT) // 500 + 1
+    starts = [start for start, _ in spans]
+    assert starts == sorted(set(starts))
+
+
+@pytest.mark.parametrize("chunk_size, overlap", [(0, 0), (100, -1), (100, 100), (100, 150)])
+def test_invalid_sizes_raise(chunk_size, overlap):
+    with pytest.raises(ValueError):
+        list(iter_chunk_spans(TEXT, chunk_size=chunk_size, overlap=overlap))
+
+
+def test_empty_and_whitespace_input():
+    assert list(iter_chunk_spans("")) == []
+    assert list(iter_chunk_spans(" \n\t ")) == [(0, 0)]
+    assert chunk_text("") == []
+    assert chunk_text("   ") == [""]
+
+
+def test_chunk_text_cleans_each_chunk():
+    chunks = chunk_text("First  line.\n\nSecond   line.", chunk_size=1000, overlap=0)
+    assert chunks == [clean_text("First  line.\n\nSecond   line.")]
+
+
+def test_truncate_tokens(tokenizer):
+    from src.utils.helpers import count_tokens
+
+    assert truncate_tokens("short text", 100) == "short text"
+    assert count_tokens(truncate_tokens(TEXT, 50)) <= 50
+    assert truncate_tokens("", 10) == ""
+
+
+def test_lazy_cache_data_runs_directly_outside_streamlit(monkeypatch):
+    monkeypatch.delitem(sys.modules, "streamlit", raising=False)
+    calls = []
+
+    @lazy_cache_data
+    def double(x):
+        calls.append(x)
+        return 2 * x
+
+    assert double(2) == 4
+    assert double(2) == 4
+    assert calls == [2, 2]
+    assert "streamlit" not in sys.modules
@@ -0,0 +1,178 @@
+import os
+
+import pytest
+
+from src import jobs
+from src.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, run_worker, spool_upload
+from src.utils.doc_store import DocumentStore
+from src.utils.tracing import METRICS, merge_telemetry, span, start_trace
+
+
+@pytest.fixture
+def job_queue(tmp_path, monkeypatch):
+    def echo(payload, report):
+        report({"stage": "echoing"})
+        if payload.get("fail"):
+            raise RuntimeError("boom")
+        return payload["text"]
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "echo", echo)
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_submit_rejects_unknown_kind(job_queue):
+    with pytest.raises(ValueError):
+        job_queue.submit("nope", {})
+
+
+def test_submit_coalesces_in_flight_jobs(job_queue):
+    first = job_queue.submit("echo", {"text": "a"}, key="k")
+    assert job_queue.submit("echo", {"text": "a"}, key="k") == first
+    assert job_queue.submit("echo", {"text": "a"}, key="other") != first
+    assert job_queue.submit("echo", {"text": "a"}) != job_queue.submit("echo", {"text": "a"})
+
+    assert job_queue.claim()["id"] == first
+    assert job_queue.get(first)["status"] == RUNNING
+    assert job_queue.submit("echo", {"text": "a"}, key="k") == first
+
+
+def test_submit_after_job_finishes(job_queue):
+    first = job_queue.submit("echo", {"text": "a"}, key="k")
+    run_worker(job_queue.db_path, max_jobs=1)
+    assert job_queue.get(first)["status"] == DONE
+
+    # A recently finished job is reused when the caller accepts it...
+    assert job_queue.submit("echo", {"text": "a"}, key="k", max_age=60) == first
+    # ...and otherwise a fresh job is queued, so pollers must keep the id they got
+    second = job_queue.submit("echo", {"text": "a"}, key="k")
+    assert second != first
+    assert job_queue.get(second)["status"] == QUEUED
+    assert job_queue.get(first)["status"] == DONE
+
+
+def test_submit_ignores_stale_finished_jobs(job_queue):
+    first = job_queue.submit("echo", {"text": "a"}, key="k")
+    run_worker(job_queue.db_path, max_jobs=1)
+    assert job_queue.submit("echo", {"text": "a"}, key="k", max_age=-1) != first
+
+
+def test_worker_records_results_and_failures(job_queue):
+    ok = job_queue.submit("echo", {"text": "hello"})
+    bad = job_queue.submit("echo", {"fail": True})
+    run_worker(job_queue.db_path, max_jobs=2)
+
+    done = job_queue.get(ok)
+    assert done["status"] == DONE
+    assert done["result"] == "hello"
+    assert done["partial"] == {"stage": "echoing"}
+
+    failed = job_queue.get(bad)
+    assert failed["status"] == FAILED
+    assert failed["error"] == "boom"
+    assert job_queue.get("missing") is None
+
+
+def test_worker_stores_text_results_in_document_store(job_queue, tmp_path):
+    store_dir = str(tmp_path / "docs")
+    job_id = job_queue.submit("echo", {"text": "stored text", "store_dir": store_dir})
+    run_worker(job_queue.db_path, max_jobs=1)
+
+    result = job_queue.get(job_id)["result"]
+    assert DocumentStore(store_dir).get(result["doc_id"]) == "stored text"
+
+
+def test_requeue_running_recovers_orphaned_jobs(job_queue):
+    job_id = job_queue.submit("echo", {"text": "a"})
+    job_queue.claim()
+
+    assert job_queue.requeue_running() == 1
+    assert job_queue.get(job_id)["status"] == QUEUED
+    assert job_queue.claim()["id"] == job_id
+    assert job_queue.claim() is None
+
+
+def test_spool_upload_is_content_addressed(tmp_path):
+    path = spool_upload(b"%PDF-1.4", directory=str(tmp_path), suffix=".pdf")
+    assert path.endswith(".pdf")
+    assert spool_upload(b"%PDF-1.4", directory=str(tmp_path), suffix=".pdf") == path
+    with open(path, "rb") as f:
+        assert f.read() == b"%PDF-1.4"
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_pdf_job_removes_spooled_upload(job_queue, tmp_path, monkeypatch, fail):
+    from src.parser import pdf_parser
+
+    def fake_extract(f):
+        if fail:
+            raise RuntimeError("corrupt pdf")
+        return f.read().decode()
+
+    monkeypatch.setattr(pdf_parser, "extract_pdf_text", fake_extract)
+    spooled = spool_upload(b"pdf text", directory=str(tmp_path / "uploads"), suffix=".pdf")
+    kept = tmp_path / "kept.pdf"
+    kept.write_bytes(b"user file")
+
+    job_queue.submit("parse_pdf", {"path": spooled, "spooled": True})
+    job_queue.submit("parse_pdf", {"path": str(kept)})
+    run_worker(job_queue.db_path, max_jobs=2)
+
+    assert not os.path.exists(spooled)
+    assert kept.exists()
+
+
+def test_reused_pdf_job_does_not_spool_again(job_queue, tmp_path, monkeypatch):
+    from src.parser import pdf_parser
+
+    monkeypatch.setattr(pdf_parser, "extract_pdf_text", lambda f: f.read().decode())
+    uploads = tmp_path / "uploads"
+
+    def payload():
+        return {"path": spool_upload(b"pdf text", directory=str(uploads), suffix=".pdf"), "spooled": True}
+
+    first = job_queue.submit("parse_pdf", payload, key="pdf", max_age=3600)
+    run_worker(job_queue.db_path, max_jobs=1)
+    assert job_queue.get(first)["status"] == DONE
+    assert os.listdir(uploads) == []
+
+    # Another session uploading the same file reuses the finished job without writing it again
+    assert job_queue.submit("parse_pdf", payload, key="pdf", max_age=3600) == first
+    assert os.listdir(uploads) == []
+
+    second = job_queue.submit("parse_pdf", payload, key="pdf")
+    assert second != first and len(os.listdir(uploads)) == 1
+
+
+def test_worker_telemetry_is_taken_once(job_queue, monkeypatch):
+    def traced_echo(payload, report):
+        with span("test.job_stage"):
+            return payload["text"]
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "traced_echo", traced_echo)
+    job_id = job_queue.submit("traced_echo", {"text": "a"})
+    failing_id = job_queue.submit("echo", {"text": "a", "fail": True})
+    run_worker(job_queue.db_path, max_jobs=2)
+
+    assert "telemetry" not in job_queue.get(job_id)
+    telemetry = job_queue.take_telemetry(job_id)
+    assert [s["name"] for s in telemetry["spans"]] == ["test.job_stage"]
+    assert job_queue.take_telemetry(job_id) is None
+    assert job_queue.take_telemetry(failing_id) is not None
+
+    with start_trace() as trace:
+        merge_telemetry(telemetry)
+    assert [s["name"] for s in trace.spans] == ["test.job_stage"]
+    assert 'stage="test.job_stage"' in METRICS.render_prometheus()
+
+
+def test_telemetry_column_added_to_old_databases(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "old.sqlite3")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, key TEXT, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+                     "status TEXT NOT NULL, partial TEXT, result TEXT, error TEXT, "
+                     "created_at REAL NOT NULL, updated_at REAL NOT NULL)")
+    job_queue = JobQueue(path)
+    job_id = job_queue.submit("parse_news", {"url": "http://example.com"})
+    job_queue.complete(job_id, "text", {"spans": [], "tokens": {}, "metrics": {}})
+    assert job_queue.take_telemetry(job_id) == {"spans": [], "tokens": {}, "metrics": {}}
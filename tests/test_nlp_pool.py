@@ -0,0 +1,44 @@
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+pytest.importorskip("spacy")
+pytest.importorskip("textblob")
+pytest.importorskip("vaderSentiment")
+
+from src.llm.nlp_pool import NLPWorkerPool
+
+TEXT = "Apple opened a new office in Berlin. Employees were delighted."
+
+
+def test_warm_up_starts_every_worker():
+    pool = NLPWorkerPool(num_workers=2, warm=False)
+    try:
+        assert len(set(pool.warm_up())) == 2
+        result = pool.analyze_text(TEXT)
+        assert set(result) >= {"entities", "sentiment"}
+    finally:
+        pool.shutdown()
+
+
+def test_pool_recovers_after_a_worker_dies():
+    pool = NLPWorkerPool(num_workers=2, warm=False)
+    try:
+        pids = pool.warm_up()
+        os.kill(pids[0], signal.SIGKILL)
+
+        # Calls racing the crash may fail; once the pool is seen broken it is replaced
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                new_pids = pool.warm_up()
+                break
+            except BrokenProcessPool:
+                assert time.monotonic() < deadline
+        assert len(set(new_pids)) == 2 and set(new_pids).isdisjoint(pids)
+        assert set(pool.analyze_text(TEXT)) >= {"entities", "sentiment"}
+    finally:
+        pool.shutdown()
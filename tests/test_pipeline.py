@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+pytest.importorskip("tenacity")
+
+from src.llm.pipeline import ANALYSIS, INSIGHTS, SUMMARY, StageResult, iter_analysis, run_analysis
+
+
+def _stages(**kwargs):
+    return [(result.stage, result.value, type(result.error)) for result in iter_analysis("raw text", **kwargs)]
+
+
+def test_results_are_yielded_in_completion_order():
+    summary_may_finish = threading.Event()
+
+    def summarize(text):
+        assert summary_may_finish.wait(timeout=10)
+        return "summary of " + text
+
+    def analyze(text):
+        return {"entities": {}, "sentiment": "neutral"}
+
+    results = iter_analysis("raw text", summarize=summarize, analyze=analyze,
+                            insights=lambda summary: {"topics": [summary]})
+    first = next(results)
+    assert first == StageResult(ANALYSIS, {"entities": {}, "sentiment": "neutral"})
+    summary_may_finish.set()
+    assert list(results) == [StageResult(SUMMARY, "summary of raw text"),
+                             StageResult(INSIGHTS, {"topics": ["summary of raw text"]})]
+
+
+def test_insights_start_only_after_a_successful_summary():
+    calls = []
+
+    def insights(summary):
+        calls.append(summary)
+        return {"topics": []}
+
+    results = run_analysis("raw text", summarize=lambda text: "⚠️ API unavailable",
+                           analyze=lambda text: {}, insights=insights)
+    assert set(results) == {SUMMARY, ANALYSIS}
+    assert results[SUMMARY].value == "⚠️ API unavailable"
+    assert calls == []
+
+    results = run_analysis("raw text", summarize=lambda text: "fine", analyze=lambda text: {}, insights=insights)
+    assert results[INSIGHTS].value == {"topics": []}
+    assert calls == ["fine"]
+
+
+def test_failing_stages_yield_errors():
+    def fail(text):
+        raise RuntimeError(f"failed on {text}")
+
+    stages = _stages(summarize=fail, analyze=fail, insights=fail)
+    assert sorted(stages, key=lambda s: s[0]) == [(ANALYSIS, None, RuntimeError), (SUMMARY, None, RuntimeError)]
+
+    stages = _stages(summarize=lambda text: "ok", analyze=lambda text: {}, insights=fail)
+    assert (INSIGHTS, None, RuntimeError) in stages
+    assert (SUMMARY, "ok", type(None)) in stages
+
+
+def test_initializer_runs_in_worker_threads():
+    names = set()
+    results = run_analysis("raw text", summarize=lambda text: "ok", analyze=lambda text: {},
+                           insights=lambda summary: {},
+                           initializer=lambda: names.add(threading.current_thread().name))
+    assert set(results) == {SUMMARY, ANALYSIS, INSIGHTS}
+    assert names and threading.current_thread().name not in names
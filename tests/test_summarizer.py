@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("tenacity")
+
+from src.llm.summarizer import TextSummarizer
+from src.utils.helpers import count_tokens
+
+
+class EchoBackend:
+    """Stand-in for OpenAIBackend that records each request's prompt."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def chat(self, messages, max_tokens, stage, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        return "merged summary."
+
+
+def long_summary(n: int) -> str:
+    return " ".join(f"Section {n} sentence {i} covers budget item number {i} in detail." for i in range(40))
+
+
+def test_group_summaries_respects_budget(tokenizer):
+    summarizer = TextSummarizer(backend=EchoBackend(), max_tokens=400, max_summary_tokens=100)
+    budget = summarizer.max_tokens - summarizer.max_summary_tokens - summarizer.PROMPT_OVERHEAD_TOKENS
+    summaries = [long_summary(n) for n in range(5)]
+    assert all(count_tokens(s) > budget for s in summaries)
+
+    groups = summarizer._group_summaries(summaries)
+
+    assert len(groups) < len(summaries)
+    for group in groups:
+        assert sum(count_tokens(s) for s in group) <= budget
+
+
+def test_group_summaries_keeps_fitting_summaries(tokenizer):
+    summarizer = TextSummarizer(backend=EchoBackend(), max_tokens=4096, max_summary_tokens=1000, reduce_fan_in=3)
+    summaries = [f"Short summary {i}." for i in range(7)]
+
+    groups = summarizer._group_summaries(summaries)
+
+    assert [len(group) for group in groups] == [3, 3, 1]
+    assert [s for group in groups for s in group] == summaries
+
+
+def test_reduce_summaries_terminates_with_oversized_inputs(tokenizer):
+    backend = EchoBackend()
+    summarizer = TextSummarizer(backend=backend, max_tokens=400, max_summary_tokens=100, max_workers=1)
+
+    assert summarizer._reduce_summaries([long_summary(n) for n in range(6)]) == "merged summary."
+    assert backend.prompts
+
+
+def test_compression_report_is_per_call(tokenizer):
+    summarizer = TextSummarizer(backend=EchoBackend(), compression_ratio=0.5, max_workers=1)
+    short = " ".join(f"Point {i} explains how the plan affects budget line {i}." for i in range(20))
+    long = " ".join(f"Point {i} explains how the plan affects budget line {i}." for i in range(40))
+
+    summarizer.summarize(long)
+    long_report = dict(summarizer.compression_report)
+    summarizer.summarize(short)
+
+    assert summarizer.compression_report["total_sentences"] == 20
+    assert long_report["total_sentences"] == 40
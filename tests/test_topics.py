@@ -0,0 +1,96 @@
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("tenacity")
+
+from src.llm import backends, insight_gen
+from src.llm.backends import _parse_topic_scores
+from src.llm.insight_gen import TopicBatcher, classify_topics_batch, keyword_topics
+
+LABELS = ["Finance", "Technology", "Politics"]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    insight_gen._TOPIC_CACHE.clear()
+    yield
+    insight_gen._TOPIC_CACHE.clear()
+
+
+def test_parse_topic_scores():
+    content = "Here you go: " + json.dumps({"results": [
+        {"index": 0, "topics": [{"label": "finance", "confidence": 0.9}, {"label": "Sports", "confidence": 1}]},
+        {"index": 1, "topics": [{"label": "Technology", "confidence": 1.7}]},
+        {"index": 7, "topics": [{"label": "Politics", "confidence": 0.5}]},
+    ]})
+    assert _parse_topic_scores(content, 2, LABELS) == [{"Finance": 0.9}, {"Technology": 1.0}]
+
+
+def test_parse_topic_scores_keeps_complete_items_of_a_truncated_reply():
+    content = ('{"results": [{"index": 0, "topics": [{"label": "Finance", "confidence": 0.8}]}, '
+               '{"index": 1, "topics": [{"label": "Politics", "confidence": 0.7}]}, '
+               '{"index": 2, "topics": [{"label": "Tech')
+    assert _parse_topic_scores(content, 3, LABELS) == [{"Finance": 0.8}, {"Politics": 0.7}, {}]
+
+
+def test_parse_topic_scores_skips_malformed_items():
+    content = json.dumps({"results": [
+        "nonsense",
+        {"index": 0, "topics": "Finance"},
+        {"index": 1, "topics": ["Finance", {"label": "Politics", "confidence": "high"},
+                                {"label": "Technology", "confidence": 0.6}]},
+    ]})
+    assert _parse_topic_scores(content, 2, LABELS) == [{}, {"Technology": 0.6}]
+    assert _parse_topic_scores("no json here", 1, LABELS) == [{}]
+
+
+class _Backend:
+    name = "openai"
+
+    def __init__(self):
+        self.requests = []
+
+    def classify_topics(self, texts, labels):
+        self.requests.append(list(texts))
+        return [{"Finance": 0.9} if "budget" in text else {} for text in texts]
+
+    def served_by(self):
+        return self.name
+
+
+def test_empty_scores_are_not_cached(monkeypatch):
+    llm = _Backend()
+    monkeypatch.setattr(backends, "get_backend", lambda name: llm)
+    texts = ["The budget passed.", "The election software was updated."]
+
+    assert classify_topics_batch(texts, backend="openai") == [["Finance"], ["Technology", "Politics"]]
+    assert classify_topics_batch(texts, backend="openai") == [["Finance"], ["Technology", "Politics"]]
+    assert llm.requests == [texts, texts[1:]]
+
+
+def test_topic_batcher_with_local_backend():
+    texts = ["Revenue and profit rose.", "The new algorithm runs on any computer.", "Nothing to see here."]
+    batcher = TopicBatcher(backend="local", batch_size=3, max_wait=5)
+    results = {}
+    threads = [threading.Thread(target=lambda t=text: results.update({t: batcher.classify(t)})) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    batcher.close()
+    assert results == {text: keyword_topics(text) for text in texts}
+
+
+def test_topic_batcher_after_close():
+    batcher = TopicBatcher(backend="local", max_wait=0.01)
+    batcher.close()
+    batcher.close()
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(topics=batcher.classify("Revenue and profit rose.")),
+                              daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "classify blocked after close"
+    assert result["topics"] == keyword_topics("Revenue and profit rose.")
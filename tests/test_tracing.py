@@ -0,0 +1,190 @@
+import json
+import multiprocessing
+import threading
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.tracing import (
+    METRICS, MetricsRegistry, Trace, activate, capture_telemetry, current_trace, merge_telemetry, propagate,
+    record_cache, record_tokens, record_usage, span, start_metrics_server, start_trace, traced, unwrap_telemetry,
+    write_prometheus,
+)
+
+
+def test_spans_attach_to_active_trace():
+    with start_trace(source="test") as trace:
+        assert current_trace() is trace
+        with span("outer", size=3) as attributes:
+            attributes["extra"] = True
+            with span("inner"):
+                pass
+    assert current_trace() is None
+
+    data = trace.to_dict()
+    assert data["attributes"] == {"source": "test"}
+    assert {s["name"] for s in data["spans"]} == {"outer", "inner"}
+    outer = next(s for s in data["spans"] if s["name"] == "outer")
+    assert outer["attributes"] == {"size": 3, "extra": True}
+    assert outer["error"] is None
+    assert outer["duration_ms"] >= 0
+
+
+def test_span_records_errors():
+    with start_trace() as trace:
+        with pytest.raises(ValueError):
+            with span("test.failing"):
+                raise ValueError("bad input")
+
+    assert trace.spans[0]["error"] == "ValueError: bad input"
+    assert METRICS.counter_value("scopeai_stage_errors_total", stage="test.failing") >= 1
+
+
+def test_traced_decorator():
+    @traced("test.decorated")
+    def add(a, b):
+        return a + b
+
+    with start_trace() as trace:
+        assert add(1, 2) == 3
+    assert [s["name"] for s in trace.spans] == ["test.decorated"]
+
+
+def test_propagate_keeps_trace_in_worker_threads():
+    def work(i):
+        with span("test.worker", i=i):
+            return threading.current_thread().name
+
+    with start_trace() as trace:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            names = list(executor.map(propagate(work), range(6)))
+        # Without propagate, spans recorded in other threads are lost
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(work, 99).result()
+
+    assert len(trace.spans) == 6
+    assert any(name != threading.current_thread().name for name in names)
+
+
+def test_activate_none_detaches():
+    trace = Trace("req")
+    with activate(trace):
+        with activate(None):
+            with span("test.detached"):
+                pass
+    assert trace.spans == []
+
+
+def test_record_tokens_and_usage():
+    before = METRICS.counter_value("scopeai_llm_tokens_total", stage="test", kind="prompt")
+    with start_trace() as trace:
+        record_tokens("test", 10, 5)
+        usage = SimpleNamespace(prompt_tokens=7, completion_tokens=3)
+        record_usage("test", SimpleNamespace(usage=usage, choices=[]), [])
+
+    assert trace.tokens == {"prompt": 17, "completion": 8}
+    assert METRICS.counter_value("scopeai_llm_tokens_total", stage="test", kind="prompt") == before + 17
+
+
+def test_histogram_and_prometheus_rendering():
+    registry = MetricsRegistry()
+    registry.observe("duration_seconds", 0.02, "Durations", stage="a")
+    registry.observe("duration_seconds", 3.0, "Durations", stage="a")
+    registry.inc("requests_total", help_text="Requests", path='x"y')
+
+    text = registry.render_prometheus()
+    assert "# TYPE duration_seconds histogram" in text
+    assert 'duration_seconds_bucket{stage="a",le="0.05"} 1' in text
+    assert 'duration_seconds_bucket{stage="a",le="+Inf"} 2' in text
+    assert 'duration_seconds_count{stage="a"} 2' in text
+    assert 'requests_total{path="x\\"y"} 1' in text
+
+
+def test_cache_hit_rates():
+    record_cache("test_cache", True)
+    record_cache("test_cache", True)
+    record_cache("test_cache", False)
+    rates = METRICS.cache_hit_rates()
+    assert rates["test_cache"] == pytest.approx(2 / 3)
+
+
+def test_trace_and_metrics_export(tmp_path):
+    with start_trace("req-1") as trace:
+        with span("test.export"):
+            pass
+    path = tmp_path / "trace.json"
+    trace.write_json(str(path))
+    assert json.loads(path.read_text())["request_id"] == "req-1"
+
+    metrics_path = tmp_path / "metrics.prom"
+    write_prometheus(str(metrics_path))
+    assert 'stage="test.export"' in metrics_path.read_text()
+
+
+def test_metrics_server():
+    with span("test.served"):
+        pass
+    server = start_metrics_server(port=0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert b'stage="test.served"' in response.read()
+    finally:
+        server.shutdown()
+
+
+def test_drain_and_merge():
+    worker = MetricsRegistry()
+    worker.observe("duration_seconds", 0.02, "Durations", stage="a")
+    worker.inc("requests_total", 2, "Requests", path="x")
+    data = json.loads(json.dumps(worker.drain()))
+    assert worker.counter_value("requests_total", path="x") == 0
+    assert "duration_seconds_count" not in worker.render_prometheus()
+
+    parent = MetricsRegistry()
+    parent.inc("requests_total", 1, "Requests", path="x")
+    parent.merge(data)
+    parent.merge(data)
+    assert parent.counter_value("requests_total", path="x") == 5
+    assert 'duration_seconds_count{stage="a"} 2' in parent.render_prometheus()
+
+
+def _worker_stage(name, fail=False):
+    with span(name):
+        record_tokens("test_worker", 4, 2)
+        if fail:
+            raise ValueError("worker failed")
+    return multiprocessing.current_process().pid
+
+
+def test_worker_process_spans_reach_parent_export(tmp_path):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        ok = executor.submit(capture_telemetry, _worker_stage, "test.worker_process").result()
+        failed = executor.submit(capture_telemetry, _worker_stage, "test.worker_failed", True).result()
+
+    assert 'stage="test.worker_process"' not in METRICS.render_prometheus()
+    with start_trace() as trace:
+        assert unwrap_telemetry(ok) != multiprocessing.current_process().pid
+        with pytest.raises(ValueError, match="worker failed"):
+            unwrap_telemetry(failed)
+
+    assert [s["name"] for s in trace.spans] == ["test.worker_process", "test.worker_failed"]
+    assert trace.tokens == {"prompt": 8, "completion": 4}
+    assert METRICS.counter_value("scopeai_stage_errors_total", stage="test.worker_failed") == 1
+
+    metrics_path = tmp_path / "metrics.prom"
+    write_prometheus(str(metrics_path))
+    text = metrics_path.read_text()
+    assert 'scopeai_stage_duration_seconds_count{stage="test.worker_process"} 1' in text
+    assert 'scopeai_llm_tokens_total{kind="prompt",stage="test_worker"} 8' in text
+
+
+def test_merge_telemetry_into_given_trace():
+    trace = Trace("req")
+    merge_telemetry({"spans": [{"name": "remote", "start": 1.0}], "tokens": {"prompt": 1, "completion": 2},
+                     "metrics": {}}, trace)
+    merge_telemetry(None, trace)
+    assert [s["name"] for s in trace.spans] == ["remote"]
+    assert trace.tokens == {"prompt": 1, "completion": 2}
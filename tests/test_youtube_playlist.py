@@ -0,0 +1,194 @@
+import json
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from src.parser import youtube_parser, youtube_playlist
+from src.parser.youtube_playlist import DOWNLOAD, TRANSCRIBE, PlaylistIngester, expand_playlist
+
+PLAYLIST = "https://www.youtube.com/playlist?list=PL1"
+CHANNEL = "https://www.youtube.com/@channel"
+
+
+@pytest.fixture
+def fake_yt_dlp(monkeypatch):
+    infos = {}
+
+    class YoutubeDL:
+        def __init__(self, opts):
+            assert opts["skip_download"] and opts["extract_flat"] == "in_playlist"
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download=True):
+            assert not download
+            return infos.get(url)
+
+    monkeypatch.setitem(sys.modules, "yt_dlp", types.SimpleNamespace(YoutubeDL=YoutubeDL))
+    return infos
+
+
+def test_expand_flat_playlist(fake_yt_dlp):
+    fake_yt_dlp[PLAYLIST] = {"entries": [
+        {"id": "a", "url": "https://www.youtube.com/watch?v=a", "title": "A"},
+        {"id": "b", "url": "b"},  # Flat entries may only carry the video id as url
+        None,
+        {"id": "a", "url": "https://www.youtube.com/watch?v=a"},
+        {"title": "no id"},
+        {"entries": [{"id": "c", "webpage_url": "https://www.youtube.com/watch?v=c", "title": "C"}]},
+    ]}
+    assert expand_playlist(PLAYLIST) == [
+        {"id": "a", "url": "https://www.youtube.com/watch?v=a", "title": "A"},
+        {"id": "b", "url": "https://www.youtube.com/watch?v=b", "title": ""},
+        {"id": "c", "url": "https://www.youtube.com/watch?v=c", "title": "C"},
+    ]
+
+
+def test_expand_channel_tabs(fake_yt_dlp):
+    fake_yt_dlp[CHANNEL] = {"entries": [
+        {"_type": "url", "ie_key": "YoutubeTab", "url": CHANNEL + "/videos"},
+        {"_type": "playlist", "url": CHANNEL + "/shorts"},
+    ]}
+    fake_yt_dlp[CHANNEL + "/videos"] = {"entries": [{"id": "v1"}, {"id": "v2"}]}
+    fake_yt_dlp[CHANNEL + "/shorts"] = {"entries": [{"id": "s1"}, {"id": "v1"}]}
+    assert [video["id"] for video in expand_playlist(CHANNEL)] == ["v1", "v2", "s1"]
+
+
+def test_expand_single_video_and_missing(fake_yt_dlp):
+    fake_yt_dlp["https://youtu.be/x"] = {"id": "x", "webpage_url": "https://www.youtube.com/watch?v=x", "title": "X"}
+    assert expand_playlist("https://youtu.be/x") == [
+        {"id": "x", "url": "https://www.youtube.com/watch?v=x", "title": "X"}]
+    assert expand_playlist("https://youtu.be/missing") == []
+
+
+class _Pipeline:
+    """Stub downloads and transcriptions; ids starting with a failure mode make that stage fail."""
+
+    def __init__(self, monkeypatch, transcribe_delay=0.0):
+        self.downloaded = []
+        self.lock = threading.Lock()
+        self.max_waiting = 0
+        self.waiting = 0
+        pipeline = self
+
+        def download_audio(url, output_path, quiet=False):
+            video_id = url.rsplit("=", 1)[-1]
+            with pipeline.lock:
+                pipeline.downloaded.append(video_id)
+            if video_id.startswith("nodownload"):
+                raise RuntimeError("HTTP Error 403")
+            if video_id.startswith("nofile"):
+                return output_path
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(video_id)
+            with pipeline.lock:
+                pipeline.waiting += 1
+                pipeline.max_waiting = max(pipeline.max_waiting, pipeline.waiting)
+            return output_path
+
+        class Parser:
+            def __init__(self, whisper_model_size, shared_model=True):
+                pass
+
+            def transcribe_audio(self, audio_path):
+                with pipeline.lock:
+                    pipeline.waiting -= 1
+                time.sleep(transcribe_delay)
+                with open(audio_path, encoding="utf-8") as f:
+                    video_id = f.read()
+                if video_id.startswith("empty"):
+                    return "  "
+                if video_id.startswith("broken"):
+                    raise RuntimeError("ffmpeg failed")
+                return f"transcript of {video_id}"
+
+        monkeypatch.setattr(youtube_parser, "download_audio", download_audio)
+        monkeypatch.setattr(youtube_parser, "YouTubeParser", Parser)
+
+    @staticmethod
+    def playlist(monkeypatch, ids):
+        videos = [{"id": i, "url": f"https://www.youtube.com/watch?v={i}", "title": i.upper()} for i in ids]
+        monkeypatch.setattr(youtube_playlist, "expand_playlist", lambda url: videos)
+
+
+def _run(ingester):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(ingester.run(PLAYLIST)), daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "playlist ingestion did not finish"
+    return result
+
+
+def test_failures_are_counted_per_stage(tmp_path, monkeypatch):
+    pipeline = _Pipeline(monkeypatch)
+    _Pipeline.playlist(monkeypatch, ["ok1", "nodownload", "nofile", "empty", "broken", "ok2"])
+    stats = _run(PlaylistIngester(str(tmp_path), download_workers=3, transcribe_workers=2))
+
+    assert stats["total"] == 6 and stats["skipped"] == 0
+    assert (stats[DOWNLOAD]["done"], stats[DOWNLOAD]["failed"]) == (4, 2)
+    assert (stats[TRANSCRIBE]["done"], stats[TRANSCRIBE]["failed"]) == (2, 2)
+    assert sorted(video["id"] for video in stats["transcribed"]) == ["ok1", "ok2"]
+    assert (tmp_path / "ok1.txt").read_text(encoding="utf-8") == "transcript of ok1"
+    assert not (tmp_path / "empty.txt").exists()
+
+    with open(tmp_path / "transcripts.jsonl", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(record["id"] for record in records) == ["ok1", "ok2"]
+    assert all(record["chars"] == len(f"transcript of {record['id']}") for record in records)
+    # Audio is removed after transcription, whether it succeeded or not
+    assert os.listdir(tmp_path / "audio") == []
+    assert len(pipeline.downloaded) == 6
+
+
+def test_resume_skips_transcribed_videos(tmp_path, monkeypatch):
+    pipeline = _Pipeline(monkeypatch)
+    _Pipeline.playlist(monkeypatch, ["done1", "new1", "done2"])
+    for video_id in ("done1", "done2"):
+        (tmp_path / f"{video_id}.txt").write_text("earlier run", encoding="utf-8")
+
+    stats = _run(PlaylistIngester(str(tmp_path)))
+    assert stats["total"] == 3 and stats["skipped"] == 2
+    assert pipeline.downloaded == ["new1"]
+    assert (tmp_path / "done1.txt").read_text(encoding="utf-8") == "earlier run"
+
+    stats = _run(PlaylistIngester(str(tmp_path)))
+    assert stats["skipped"] == 3 and stats["transcribed"] == []
+    assert pipeline.downloaded == ["new1"]
+
+
+def test_keep_audio(tmp_path, monkeypatch):
+    _Pipeline(monkeypatch)
+    _Pipeline.playlist(monkeypatch, ["a", "broken"])
+    _run(PlaylistIngester(str(tmp_path), keep_audio=True))
+    assert sorted(os.listdir(tmp_path / "audio")) == ["a.mp3", "broken.mp3"]
+
+
+def test_pending_queue_is_bounded_and_drains(tmp_path, monkeypatch):
+    pipeline = _Pipeline(monkeypatch, transcribe_delay=0.02)
+    _Pipeline.playlist(monkeypatch, [f"v{i}" for i in range(12)])
+    stats = _run(PlaylistIngester(str(tmp_path), download_workers=4, transcribe_workers=1, max_pending=1))
+
+    assert stats[TRANSCRIBE]["done"] == 12
+    # Queued files, plus one held by each blocked download and the one being transcribed
+    assert pipeline.max_waiting <= 1 + 4 + 1
+    assert not any(thread.name.startswith("transcribe-") for thread in threading.enumerate())
+
+
+def test_failing_progress_callback_does_not_hang(tmp_path, monkeypatch):
+    _Pipeline(monkeypatch)
+    _Pipeline.playlist(monkeypatch, [f"v{i}" for i in range(6)])
+
+    def progress(snapshot):
+        raise ValueError("display closed")
+
+    stats = _run(PlaylistIngester(str(tmp_path), download_workers=2, max_pending=1, progress=progress))
+    assert stats[TRANSCRIBE]["done"] == 6